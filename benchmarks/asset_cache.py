@@ -0,0 +1,65 @@
+"""
+Compare loading palette-swapped animations with `FrameAnimation.from_spritesheet` with and without
+an `AssetCache`.
+
+Usage:
+    python benchmarks/asset_cache.py
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import numpy
+import pygame
+from pygame import Surface
+
+from robingame.image import AssetCache, FrameAnimation
+
+PALETTE = [(0, 0, 0, 0)] + [(i * 20, 255 - i * 20, 100, 255) for i in range(12)]
+N_ANIMATIONS = 100
+N_FRAMES = 8
+FRAME_SIZE = (32, 32)
+SCALE = 3
+
+
+def make_spritesheet(filename: Path):
+    rng = numpy.random.default_rng(0)
+    width, height = FRAME_SIZE
+    sheet = Surface((width * N_FRAMES, height), pygame.SRCALPHA)
+    indices = rng.integers(len(PALETTE), size=sheet.get_size())
+    rgba = numpy.array(PALETTE, dtype=numpy.uint8)[indices]
+    pygame.surfarray.pixels3d(sheet)[...] = rgba[..., :3]
+    pygame.surfarray.pixels_alpha(sheet)[...] = rgba[..., 3]
+    pygame.image.save(sheet, filename)
+
+
+def load_all(filename: Path, cache: AssetCache = None) -> float:
+    t = time.perf_counter()
+    for ii in range(N_ANIMATIONS):
+        # a different palette swap for every animation
+        colormap = {color: (ii, jj * 20, 255 - ii, 255) for jj, color in enumerate(PALETTE[1:])}
+        FrameAnimation.from_spritesheet(
+            filename, image_size=FRAME_SIZE, scale=SCALE, colormap=colormap, cache=cache
+        )
+    return time.perf_counter() - t
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        filename = directory / "sheet.png"
+        make_spritesheet(filename)
+        cache = AssetCache(directory / "cache")
+        FrameAnimation.from_spritesheet(filename, image_size=FRAME_SIZE)  # warm up
+        uncached = load_all(filename)
+        cold = load_all(filename, cache)
+        warm = load_all(filename, cache)
+    print(f"{N_ANIMATIONS} animations of {N_FRAMES} frames, scaled x{SCALE} and recolored:")
+    print(f"  no cache:   {uncached * 1000:.0f} ms")
+    print(f"  cold cache: {cold * 1000:.0f} ms")
+    print(f"  warm cache: {warm * 1000:.0f} ms ({uncached / warm:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
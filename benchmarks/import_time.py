@@ -0,0 +1,54 @@
+"""
+Measure how long it takes to import robingame's modules, on top of pygame and numpy (which
+robingame can't do anything about).
+
+Each import runs in a fresh interpreter, so nothing is cached between runs.
+
+Usage:
+    python benchmarks/import_time.py
+"""
+
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "robingame.image",
+    "robingame.text.fonts",
+    "robingame.input",
+    "robingame.objects",
+    "robingame.recording",
+]
+BASELINE = "pygame, numpy"
+
+
+def time_import(module: str, repeat: int) -> float:
+    """Median time (in seconds) to import `module` in a fresh interpreter."""
+    code = (
+        f"import {BASELINE}\n"
+        "import time\n"
+        "t = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - t)\n"
+    )
+    times = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=dict(PYGAME_HIDE_SUPPORT_PROMPT="1", SDL_VIDEODRIVER="dummy"),
+        )
+        times.append(float(result.stdout.split()[-1]))
+    return statistics.median(times)
+
+
+def main():
+    for module in MODULES:
+        seconds = time_import(module, repeat=7)
+        print(f"import {module}: {seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
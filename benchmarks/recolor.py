@@ -0,0 +1,67 @@
+"""
+Compare the vectorized `recolor_image` with the original per-pixel implementation.
+
+Usage:
+    python benchmarks/recolor.py
+"""
+
+import timeit
+
+import numpy
+import pygame
+from pygame import Color, Surface
+
+from robingame.image import manipulation
+
+
+def recolor_image_per_pixel(surface: Surface, color_mapping: dict) -> Surface:
+    """The original implementation of recolor_image, which uses get_at/set_at on every pixel."""
+    color_mapping = {
+        manipulation.pad_alpha(k): manipulation.pad_alpha(v) for k, v in color_mapping.items()
+    }
+    new_surface = surface.copy()
+    for x in range(surface.get_width()):
+        for y in range(surface.get_height()):
+            color = surface.get_at((x, y))[:]
+            new_color = color_mapping.get(color)
+            if new_color:
+                new_surface.set_at((x, y), Color(*new_color))
+            else:
+                new_surface.set_at((x, y), Color(*color))
+    return new_surface
+
+
+def random_sprite(size: tuple[int, int], palette: list[tuple]) -> Surface:
+    rng = numpy.random.default_rng(0)
+    surface = Surface(size, pygame.SRCALPHA)
+    indices = rng.integers(len(palette), size=size)
+    rgba = numpy.array(palette, dtype=numpy.uint8)[indices]
+    pixels = pygame.surfarray.pixels3d(surface)
+    pixels[...] = rgba[..., :3]
+    del pixels
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    alpha[...] = rgba[..., 3]
+    del alpha
+    return surface
+
+
+def main():
+    palette = [(0, 0, 0, 0)] + [(i * 20, 255 - i * 20, 100, 255) for i in range(12)]
+    colormap = {color: (color[1], color[0], color[2]) for color in palette[1:8]}
+    for size in [(32, 32), (64, 64), (256, 256)]:
+        sprite = random_sprite(size, palette)
+        expected = recolor_image_per_pixel(sprite, colormap)
+        actual = manipulation.recolor_image(sprite, colormap)
+        assert pygame.image.tobytes(expected, "RGBA") == pygame.image.tobytes(actual, "RGBA")
+
+        number = 3 if size[0] > 100 else 20
+        old = timeit.timeit(lambda: recolor_image_per_pixel(sprite, colormap), number=number)
+        new = timeit.timeit(lambda: manipulation.recolor_image(sprite, colormap), number=number)
+        print(
+            f"{size[0]}x{size[1]}: per-pixel {old / number * 1000:.2f} ms, "
+            f"vectorized {new / number * 1000:.2f} ms ({old / new:.0f}x faster)"
+        )
+
+
+if __name__ == "__main__":
+    main()
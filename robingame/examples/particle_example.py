@@ -1,7 +1,8 @@
+import numpy
 import pygame
 from pygame import Color
 
-from robingame.objects import Game, Group, Particle
+from robingame.objects import Game, Group, ParticleSystem
 from robingame.utils import random_float
 
 
@@ -13,49 +14,43 @@ class ParticleExample(Game):
 
     def __init__(self):
         super().__init__()
-        self.particles = Group()
-        self.child_groups = [self.particles]
+        self.particles = ParticleSystem()
+        self.child_groups = [Group(self.particles)]
 
     def print_debug_info(self):
-        print(f"{len(self.particles)=}")
+        print(f"{self.particles.count=}")
 
     def update(self):
         super().update()
         left, middle, right = pygame.mouse.get_pressed()
         x, y = pygame.mouse.get_pos()
         if left:
-            self.particles.add(
-                Particle(
-                    x=x,
-                    y=y,
-                    radius=30,
-                    color=Color("white"),
-                    decay=0.1,
-                )
+            self.particles.emit(
+                x=x,
+                y=y,
+                radius=30,
+                color=Color("white"),
+                decay=0.1,
             )
         if middle:
-            self.particles.add(
-                Particle(
-                    x=x,
-                    y=y,
-                    v=random_float(-15, -10),
-                    radius=random_float(20, 30),
-                    decay=random_float(0.2, 0.5),
-                    gravity=0.5,
-                    color=Color("blue"),
-                )
-                for _ in range(10)
+            n = 10
+            self.particles.emit(
+                x=x,
+                y=y,
+                v=numpy.random.uniform(-15, -10, n),
+                radius=numpy.random.uniform(20, 30, n),
+                decay=numpy.random.uniform(0.2, 0.5, n),
+                gravity=0.5,
+                color=Color("blue"),
             )
         if right:
-            self.particles.add(
-                Particle(
-                    x=x,
-                    y=y,
-                    radius=random_float(5, 30),
-                    decay=random_float(0.2, 0.5),
-                    gravity=random_float(0.1, 1),
-                    color=Color("yellow"),
-                )
+            self.particles.emit(
+                x=x,
+                y=y,
+                radius=random_float(5, 30),
+                decay=random_float(0.2, 0.5),
+                gravity=random_float(0.1, 1),
+                color=Color("yellow"),
             )
 
 
@@ -96,24 +96,29 @@ class Button(Entity):
         self._on_unfocus(self)
 
     # =============================================================================================
-    # courtesy methods to make switching states easy
+    # courtesy methods to make switching states easy. Each state looks different, so they also
+    # mark the button as dirty (see `Entity.mark_dirty`).
     # =============================================================================================
 
     def press(self):
         self.on_press()
         self.state = self.state_press
+        self.mark_dirty()
 
     def focus(self):
         self.on_focus()
         self.state = self.state_focus
+        self.mark_dirty()
 
     def release(self):
         self.on_release()
         self.state = self.state_focus if self.is_focused else self.state_idle
+        self.mark_dirty()
 
     def unfocus(self):
         self.on_unfocus()
         self.state = self.state_idle
+        self.mark_dirty()
 
 
 class ColoredButton(Button):
@@ -125,6 +130,7 @@ class ColoredButton(Button):
     def state_idle(self):
         super().state_idle()
         self.color = (pulsing_value(self.tick, 80, 150, 0.03), 30, 75)
+        self.mark_dirty()  # the colour pulses every tick
 
     def state_focus(self):
         super().state_focus()
@@ -133,6 +139,7 @@ class ColoredButton(Button):
             pulsing_value(self.tick, 100, 163, 0.3),
             0,
         )
+        self.mark_dirty()
 
     def state_press(self):
         super().state_press()
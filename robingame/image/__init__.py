@@ -1,3 +1,6 @@
+from .atlas import TextureAtlas
+from .cache import AssetCache
 from .frame_animation import FrameAnimation
+from .loader import AssetLoader
 from .loading import *
 from .manipulation import *
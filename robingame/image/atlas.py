@@ -0,0 +1,181 @@
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pygame
+from pygame import Rect, Surface
+
+from robingame.image.loading import load_image
+from robingame.image.manipulation import convert_alpha
+
+if TYPE_CHECKING:
+    from robingame.image.frame_animation import FrameAnimation
+    from robingame.text.font import Font, LazyFont
+
+Region = tuple[int, int, int, int, int]  # page, x, y, width, height
+
+
+class TextureAtlas:
+    """
+    Packs lots of small images (animation frames, font glyphs) into a few big Surfaces ("pages"),
+    and hands back subsurfaces of the pages in their place.
+
+    The subsurfaces look like normal Surfaces, but they share the pixels of their page, so there
+    are far fewer separate blocks of pixel data, and images that are drawn together are close
+    together in memory.
+
+    Images are packed onto shelves: rows across the page, as tall as the tallest image on them.
+    Each batch of images is sorted tallest first, so that images of similar heights share shelves.
+
+    Example:
+        ```
+        atlas = TextureAtlas()
+        atlas.add_animation("hero_run", hero_run)  # replaces the frames with views into the atlas
+        atlas.add_font("cellphone", fonts.cellphone_black)
+        atlas.save("atlas.json")  # writes atlas.json, atlas_0.png, ...
+
+        # next time
+        atlas = TextureAtlas.load("atlas.json")
+        hero_run = FrameAnimation(atlas.get("hero_run"))
+        ```
+    """
+
+    page_size: tuple[int, int] = (1024, 1024)
+    padding: int = 1  # empty pixels between images, so that they don't bleed into each other
+
+    def __init__(self, page_size: tuple[int, int] = None, padding: int = None):
+        """
+        Args:
+            page_size: size of each page (default = `cls.page_size`). Images bigger than this get a
+                page of their own.
+            padding: see `padding`
+        """
+        self.page_size = page_size or self.page_size
+        self.padding = self.padding if padding is None else padding
+        self.pages: list[Surface] = []
+        self.index: dict[str, list[Region]] = dict()
+        self.keys: dict[str, list[str]] = dict()  # for entries added as dicts
+        self._page: int | None = None  # the page that's being filled
+        self._shelves: list[list[int]] = []  # [y, height, next free x] on that page
+        self._next_y = 0
+
+    def add(self, name: str, images: list[Surface] | dict[str, Surface]):
+        """
+        Copy `images` into the atlas.
+
+        Args:
+            name: name to store the images under (see `get()`)
+            images: a list of images, or a dict of them (e.g. a font's letters)
+
+        Returns:
+            views into the atlas, in the same form as `images`
+        """
+        if name in self.index:
+            raise ValueError(f"There's already an entry called {name!r} in the atlas")
+        keys = list(images) if isinstance(images, dict) else None
+        images = list(images.values()) if isinstance(images, dict) else list(images)
+        regions: list[Region | None] = [None] * len(images)
+        tallest_first = sorted(range(len(images)), key=lambda ii: -images[ii].get_height())
+        for ii in tallest_first:
+            page, x, y = self._place(images[ii].get_size())
+            self.pages[page].blit(images[ii], (x, y))
+            regions[ii] = (page, x, y, *images[ii].get_size())
+        self.index[name] = regions
+        if keys is not None:
+            self.keys[name] = keys
+        return self.get(name)
+
+    def get(self, name: str) -> list[Surface] | dict[str, Surface]:
+        """
+        Get the images stored under `name`, as views into the atlas.
+
+        Returns:
+            a list of Surfaces, or a dict if the images were added as a dict
+        """
+        views = [
+            self.pages[page].subsurface(Rect(x, y, width, height))
+            for page, x, y, width, height in self.index[name]
+        ]
+        if name in self.keys:
+            return dict(zip(self.keys[name], views))
+        return views
+
+    def add_animation(self, name: str, animation: "FrameAnimation") -> "FrameAnimation":
+        """Copy the frames of `animation` into the atlas, and replace them with the views."""
+        animation[:] = self.add(name, list(animation))
+        return animation
+
+    def add_font(self, name: str, font: "Font | LazyFont") -> "Font | LazyFont":
+        """Copy the glyphs of `font` into the atlas, and replace them with the views."""
+        font.letters.update(self.add(name, font.letters))
+        font.clear_cache()  # the cached scaled glyphs were made from the old images
+        return font
+
+    def save(self, filename: str | Path):
+        """
+        Save the atlas as a JSON index (`filename`) plus one PNG per page, next to it.
+        """
+        filename = Path(filename)
+        page_files = []
+        for ii, page in enumerate(self.pages):
+            page_file = filename.with_name(f"{filename.stem}_{ii}.png")
+            pygame.image.save(page, page_file)
+            page_files.append(page_file.name)
+        index = dict(
+            page_size=self.page_size,
+            padding=self.padding,
+            pages=page_files,
+            index=self.index,
+            keys=self.keys,
+        )
+        filename.write_text(json.dumps(index))
+
+    @classmethod
+    def load(cls, filename: str | Path) -> "TextureAtlas":
+        """
+        Load an atlas written by `save()`. Images added to it afterwards go on new pages.
+        """
+        filename = Path(filename)
+        data = json.loads(filename.read_text())
+        atlas = cls(page_size=tuple(data["page_size"]), padding=data["padding"])
+        atlas.pages = [load_image(filename.with_name(page_file)) for page_file in data["pages"]]
+        atlas.index = {
+            name: [tuple(region) for region in regions] for name, regions in data["index"].items()
+        }
+        atlas.keys = data["keys"]
+        return atlas
+
+    def _place(self, size: tuple[int, int]) -> tuple[int, int, int]:
+        """Find a free spot for an image of this size. Returns the page and position."""
+        width, height = size
+        padded_width, padded_height = width + self.padding, height + self.padding
+        page_width, page_height = self.page_size
+        if padded_width > page_width or padded_height > page_height:
+            # too big for a normal page: give it a page of its own
+            self.pages.append(self._new_page(size))
+            return len(self.pages) - 1, 0, 0
+        if self._page is not None:
+            for shelf in self._shelves:
+                y, shelf_height, x = shelf
+                if height <= shelf_height and x + padded_width <= page_width:
+                    shelf[2] += padded_width
+                    return self._page, x, y
+            if self._next_y + padded_height <= page_height:
+                return self._page, 0, self._new_shelf(height, padded_width)
+        self.pages.append(self._new_page(self.page_size))
+        self._page = len(self.pages) - 1
+        self._shelves = []
+        self._next_y = 0
+        return self._page, 0, self._new_shelf(height, padded_width)
+
+    def _new_shelf(self, height: int, used_width: int) -> int:
+        y = self._next_y
+        self._shelves.append([y, height, used_width])
+        self._next_y += height + self.padding
+        return y
+
+    @staticmethod
+    def _new_page(size: tuple[int, int]) -> Surface:
+        # in the display's pixel format if possible, for faster blitting. It's transparent, so
+        # blitting onto it copies the pixels exactly.
+        return convert_alpha(Surface(size, pygame.SRCALPHA))
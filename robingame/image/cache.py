@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy
+import pygame
+from pygame import Color, Surface
+
+from robingame.image.manipulation import convert_alpha
+
+CACHE_VERSION = 2  # bump this if the processing or the storage of cached images changes
+# byte order of the stored pixels: the same as `convert_alpha()`ed surfaces, so that blitting
+# cached images takes the fast path
+PIXEL_FORMAT = "BGRA"
+
+
+class AssetCache:
+    """
+    Persistent, content-addressed cache of processed images (e.g. the frames of a recolored,
+    scaled animation), so that they don't have to be processed again every time the game starts.
+
+    Each entry is stored as two files in `directory`:
+
+    - `<key>.rgba`: the raw pixels of all the images, one after the other
+    - `<key>.json`: the size of each image
+
+    Cached images are memory-mapped back into Surfaces with `pygame.image.frombuffer`, so loading
+    them costs very little. The mapping is copy-on-write: drawing on a cached image doesn't
+    change the file. The pixels are stored in the same layout as `convert_alpha()` produces, so
+    the loaded images are as fast to blit as freshly loaded ones. (If the display uses a different
+    layout, they're converted when they're loaded.)
+
+    Keys are made from a hash of the source file's contents, plus the parameters that were used to
+    process it (see `key()`), so editing the source file or changing a parameter automatically
+    misses the cache. Old entries are never deleted; use `clear()` for that.
+
+    Example:
+        ```
+        cache = AssetCache("~/.cache/mygame")
+        key = cache.key("hero.png", scale=3, colormap=palette)
+        frames = cache.get(key, lambda: expensive_processing("hero.png", 3, palette))
+        ```
+    """
+
+    def __init__(self, directory: str | Path):
+        """
+        Args:
+            directory: where to store the cache (created if it doesn't exist)
+        """
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, filename: str | Path, **params: Any) -> str:
+        """
+        Make a cache key for the result of processing `filename` with `params`.
+
+        Args:
+            filename: the source image
+            params: everything that affects the result. Colors (and dicts/lists of them) are
+                normalised, so `"red"`, `(255, 0, 0)` and `Color(255, 0, 0)` give the same key.
+
+        Returns:
+            a hex string
+        """
+        digest = hashlib.sha256(Path(filename).read_bytes())
+        description = json.dumps(
+            dict(version=CACHE_VERSION, params=_normalise(params)), sort_keys=True
+        )
+        digest.update(description.encode())
+        return digest.hexdigest()
+
+    def load(self, key: str) -> list[Surface] | None:
+        """
+        Load the images stored under `key`.
+
+        Returns:
+            the images, or None if there's no such entry
+        """
+        try:
+            index = json.loads((self.directory / f"{key}.json").read_text())
+        except FileNotFoundError:
+            return None
+        if not index["sizes"]:
+            return []
+        pixels = numpy.memmap(self.directory / f"{key}.rgba", dtype=numpy.uint8, mode="c")
+        images = []
+        offset = 0
+        for width, height in index["sizes"]:
+            n_bytes = width * height * 4
+            view = pixels[offset : offset + n_bytes]
+            images.append(pygame.image.frombuffer(view, (width, height), PIXEL_FORMAT))
+            offset += n_bytes
+        if images[0].get_masks() != convert_alpha(Surface((1, 1))).get_masks():
+            images = [convert_alpha(image) for image in images]
+        return images
+
+    def save(self, key: str, images: list[Surface]):
+        """
+        Store `images` under `key`. The files are written under temporary names and then renamed,
+        so other processes never see half-written entries.
+        """
+        sizes = []
+        # unique temporary names, in case several threads/processes save the same entry at once
+        tmp = f"{os.getpid()}.{threading.get_ident()}.tmp"
+        rgba = self.directory / f"{key}.rgba"
+        with open(rgba.with_suffix(f".rgba.{tmp}"), "wb") as file:
+            for image in images:
+                if not image.get_flags() & pygame.SRCALPHA:
+                    image = convert_alpha(image)
+                file.write(pygame.image.tobytes(image, PIXEL_FORMAT))
+                sizes.append(image.get_size())
+        os.replace(rgba.with_suffix(f".rgba.{tmp}"), rgba)
+        index = self.directory / f"{key}.json"
+        index.with_suffix(f".json.{tmp}").write_text(json.dumps(dict(sizes=sizes)))
+        # written last, because load() treats the existence of the index as "the entry is there"
+        os.replace(index.with_suffix(f".json.{tmp}"), index)
+
+    def get(self, key: str, factory: Callable[[], list[Surface]]) -> list[Surface]:
+        """
+        Return the images stored under `key`. If there aren't any, create them by calling
+        `factory()`, and store them.
+        """
+        images = self.load(key)
+        if images is not None:
+            self.hits += 1
+            return images
+        self.misses += 1
+        images = factory()
+        self.save(key, images)
+        return images
+
+    def clear(self):
+        """Delete all the cached entries."""
+        for path in self.directory.iterdir():
+            if path.suffix in (".rgba", ".json", ".tmp"):
+                path.unlink()
+
+
+def _normalise(value: Any) -> Any:
+    """Turn `value` into something JSON can serialise, that is the same for equivalent inputs."""
+    if isinstance(value, Color):
+        return list(value)
+    if isinstance(value, str):
+        try:
+            return list(Color(value))
+        except ValueError:
+            return value  # not a colour name
+    if isinstance(value, Path):
+        return value.as_posix()
+    if isinstance(value, dict):
+        items = [[_normalise(k), _normalise(v)] for k, v in value.items()]
+        return sorted(items, key=json.dumps)
+    if isinstance(value, (list, tuple)):
+        if len(value) in (3, 4) and all(isinstance(c, int) and 0 <= c <= 255 for c in value):
+            return list(Color(*value))  # an RGB(A) tuple
+        return [_normalise(item) for item in value]
+    return value
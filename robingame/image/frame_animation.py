@@ -1,8 +1,11 @@
 from pathlib import Path
 
 from pygame import Surface, Color
+from pygame.mask import Mask
 from typing import Sequence
 from robingame.image import manipulation, loading
+from robingame.image.cache import AssetCache
+from robingame.utils import maskFromSurface
 
 
 class FrameAnimation(list):
@@ -11,8 +14,15 @@ class FrameAnimation(list):
     Handles loading from various formats (spritesheet, multiple image files, single image file).
     Adds basic frame-by-frame animation functions to play the image sequence once, or loop it.
     Can scale, flip, and recolor itself.
+    Keeps a cache of collision masks for its frames.
+
+    Set `disk_cache` to an `AssetCache` to keep the processed frames loaded by `from_spritesheet`
+    on disk, so that they don't have to be sliced, scaled, flipped and recolored again next time
+    the game starts.
     """
 
+    disk_cache: AssetCache | None = None  # used by from_spritesheet, unless it's given one
+
     # =================== instantiation ===================
 
     def __init__(
@@ -22,6 +32,7 @@ class FrameAnimation(list):
         flip_x: bool = False,
         flip_y: bool = False,
         colormap: dict[Color:Color] = None,
+        masks: bool = False,
     ):
         """
         Args:
@@ -30,14 +41,19 @@ class FrameAnimation(list):
             flip_x: flip all images horizontally if True
             flip_y: flip all images vertically if True
             colormap: used to recolor images. It is a mapping of old colours to new colours
+            masks: if True, compute the collision masks of all frames now (at load time) instead
+                of on first use
         """
         super().__init__(images)
+        self._masks = dict()
         if scale:
             self.scale_in_place(scale)
         if flip_x or flip_y:
             self.flip_in_place(flip_x, flip_y)
         if colormap:
             self.recolor_in_place(colormap)
+        if masks:
+            self.compute_masks()
 
     @classmethod
     def from_spritesheet(
@@ -50,6 +66,8 @@ class FrameAnimation(list):
         flip_x: bool = False,
         flip_y: bool = False,
         colormap: dict = None,
+        masks: bool = False,
+        cache: AssetCache = None,
     ) -> "FrameAnimation":
         """
         Load from a spritesheet.
@@ -63,14 +81,59 @@ class FrameAnimation(list):
             flip_x: see __init__
             flip_y: see __init__
             colormap: see __init__
+            masks: see __init__
+            cache: keep the processed frames in this `AssetCache` (default = `cls.disk_cache`)
 
         Returns:
             a new instance
         """
+        cache = cache or cls.disk_cache
+        if cache is None:
+            return cls._load_spritesheet(
+                filename, image_size, colorkey, num_images, scale, flip_x, flip_y, colormap, masks
+            )
+        key = cache.key(
+            filename,
+            image_size=image_size,
+            colorkey=colorkey,
+            num_images=num_images,
+            scale=scale,
+            flip_x=flip_x,
+            flip_y=flip_y,
+            colormap=colormap,
+        )
+        images = cache.get(
+            key,
+            lambda: cls._load_spritesheet(
+                filename, image_size, colorkey, num_images, scale, flip_x, flip_y, colormap
+            ),
+        )
+        return cls(images=images, masks=masks)
+
+    @classmethod
+    def _load_spritesheet(
+        cls,
+        filename: Path | str,
+        image_size: (int, int),
+        colorkey=None,
+        num_images: int = 0,
+        scale: float = None,
+        flip_x: bool = False,
+        flip_y: bool = False,
+        colormap: dict = None,
+        masks: bool = False,
+    ) -> "FrameAnimation":
         images = loading.load_spritesheet(
             filename=filename, image_size=image_size, colorkey=colorkey, num_images=num_images
         )
-        return cls(images=images, scale=scale, flip_x=flip_x, flip_y=flip_y, colormap=colormap)
+        return cls(
+            images=images,
+            scale=scale,
+            flip_x=flip_x,
+            flip_y=flip_y,
+            colormap=colormap,
+            masks=masks,
+        )
 
     @classmethod
     def from_images(
@@ -82,6 +145,7 @@ class FrameAnimation(list):
         flip_x: bool = False,
         flip_y: bool = False,
         colormap: dict = None,
+        masks: bool = False,
     ) -> "FrameAnimation":
         """
         Load from a sequence of images in a folder.
@@ -94,6 +158,7 @@ class FrameAnimation(list):
             flip_x: see __init__
             flip_y: see __init__
             colormap: see __init__
+            masks: see __init__
 
         Returns:
             a new instance
@@ -101,7 +166,14 @@ class FrameAnimation(list):
         images = loading.load_image_sequence(
             pattern=pattern, colorkey=colorkey, num_images=num_images
         )
-        return cls(images=images, scale=scale, flip_x=flip_x, flip_y=flip_y, colormap=colormap)
+        return cls(
+            images=images,
+            scale=scale,
+            flip_x=flip_x,
+            flip_y=flip_y,
+            colormap=colormap,
+            masks=masks,
+        )
 
     # =================== playback ===================
 
@@ -135,6 +207,44 @@ class FrameAnimation(list):
         """
         return self.play(n % len(self))
 
+    # =================== collision masks ===================
+
+    def get_mask(self, n: int) -> Mask:
+        """
+        Get the collision mask of a frame. Masks are cached, and recomputed only if the frame has
+        been replaced (e.g. by `flip_in_place`).
+
+        Args:
+            n: index of the frame
+
+        Returns:
+            a Mask of the solid pixels of the frame (see `robingame.utils.maskFromSurface`)
+        """
+        n = range(len(self))[n]  # normalise negative indices
+        image = self[n]
+        try:
+            cached_image, mask = self._masks[n]
+            if cached_image is image:
+                return mask
+        except KeyError:
+            pass
+        mask = maskFromSurface(image)
+        self._masks[n] = (image, mask)
+        return mask
+
+    def compute_masks(self):
+        """
+        Compute (and cache) the collision masks of all frames, so that this doesn't have to happen
+        during the game loop.
+        """
+        for n in range(len(self)):
+            self.get_mask(n)
+
+    @property
+    def masks(self) -> list[Mask]:
+        """The collision masks of all frames."""
+        return [self.get_mask(n) for n in range(len(self))]
+
     # =================== image manipulation ===================
 
     def flip(self, x=False, y=False) -> "FrameAnimation":
@@ -0,0 +1,289 @@
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import pygame
+from pygame import Surface
+
+from robingame.image import loading
+from robingame.image.cache import AssetCache
+from robingame.image.frame_animation import FrameAnimation
+from robingame.image.manipulation import convert_alpha
+
+
+class AssetLoader:
+    """
+    Loads lots of images and animations concurrently, so that loading a level doesn't block the
+    game loop for seconds at a time.
+
+    Each `image()` / `image_sequence()` / `animation()` call queues a job on a pool of workers
+    and immediately returns a Future. Decoding, scaling, flipping and recoloring all happen in the
+    workers. `results()` returns everything in the order it was requested, no matter which job
+    finished first.
+
+    By default the workers are threads, which works well because pygame releases the GIL while
+    decoding and scaling images. With `processes=True` they're processes instead, which also
+    parallelises the Python parts (e.g. recoloring), at the cost of sending the pixels back to
+    the main process.
+
+    Example:
+        ```
+        class LoadingScreen(Entity):
+            def __init__(self, loader: AssetLoader):
+                super().__init__()
+                self.loader = loader
+
+            def update(self):
+                if self.loader.finished:
+                    self.kill()  # and start the level
+
+            def draw(self, surface, debug=False):
+                width = surface.get_width() * self.loader.progress
+                surface.fill(Color("white"), (0, 0, width, 10))
+
+        loader = AssetLoader()
+        hero = loader.animation("hero.png", image_size=(32, 32), scale=3)
+        tiles = loader.image_sequence("tiles/*.png")
+        # ... later, once loader.finished:
+        hero.result()
+        ```
+    """
+
+    max_workers: int = None  # default = number of CPUs
+
+    def __init__(self, max_workers: int = None, processes: bool = False):
+        """
+        Args:
+            max_workers: number of workers (default = `cls.max_workers`)
+            processes: use worker processes instead of threads
+        """
+        self.max_workers = max_workers or self.max_workers or os.cpu_count()
+        self.processes = processes
+        self.futures: list[Future] = []  # one per request, in the order they were made
+        self.total = 0  # number of jobs queued
+        self.done = 0  # number of jobs finished
+        self._jobs: list[Future] = []  # one per job: an image_sequence is several jobs
+        self._lock = threading.Lock()
+        self._executor: Executor | None = None
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the queued jobs that have finished (1 if there are none)."""
+        return self.done / self.total if self.total else 1.0
+
+    @property
+    def finished(self) -> bool:
+        return self.done == self.total
+
+    def image(self, filename: str | Path, colorkey=None) -> "Future[Surface]":
+        """Queue `loading.load_image(filename, colorkey)`."""
+        future = self._submit(_load_image, filename, colorkey)
+        self._count(future)
+        self.futures.append(future)
+        return future
+
+    def image_sequence(
+        self, pattern: str | Path, colorkey=None, num_images: int = 0
+    ) -> "Future[list[Surface]]":
+        """
+        Like `loading.load_image_sequence`, but the images are loaded in parallel (one job per
+        file). They're returned in the same order as `load_image_sequence` would return them.
+        """
+        files = loading.find_image_sequence(pattern)
+        if num_images:
+            files = files[:num_images]
+        jobs = [self._submit(_load_image, file, colorkey) for file in files]
+        future = _gather(jobs)
+        for job in jobs:
+            self._count(job)  # after _gather, so the last job counts once `future` has its result
+        self.futures.append(future)
+        return future
+
+    def animation(
+        self,
+        filename: str | Path,
+        image_size: tuple[int, int],
+        colorkey=None,
+        num_images: int = 0,
+        scale: float = None,
+        flip_x: bool = False,
+        flip_y: bool = False,
+        colormap: dict = None,
+        masks: bool = False,
+        cache: AssetCache = None,
+        cls: type[FrameAnimation] = FrameAnimation,
+    ) -> "Future[FrameAnimation]":
+        """
+        Queue `cls.from_spritesheet(...)` (see `FrameAnimation.from_spritesheet` for the other
+        arguments). Once the frames are loaded, the animation (and its collision masks, if
+        `masks` is True) is created by whichever thread finished the job: a worker thread, or with
+        `processes=True`, the process pool's result thread.
+
+        Args:
+            cls: the `FrameAnimation` subclass to create
+        """
+        kwargs = dict(
+            filename=filename,
+            image_size=image_size,
+            colorkey=colorkey,
+            num_images=num_images,
+            scale=scale,
+            flip_x=flip_x,
+            flip_y=flip_y,
+            colormap=colormap,
+            cache=cache,
+        )
+        frames = self._submit(_load_animation_frames, cls, kwargs)
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        def make_animation(frames: Future):
+            try:
+                future.set_result(cls(images=frames.result(), masks=masks))
+            except Exception as exception:
+                future.set_exception(exception)
+
+        frames.add_done_callback(make_animation)
+        self._count(frames)  # after make_animation, so it counts once `future` has its result
+        self.futures.append(future)
+        return future
+
+    def results(self) -> list[Any]:
+        """
+        Wait for all the jobs to finish.
+
+        Returns:
+            the result of every request, in the order the requests were made
+        """
+        return [future.result() for future in self.futures]
+
+    def iter_progress(self) -> Iterator[float]:
+        """
+        Yield the progress (from 0 to 1) every time a job finishes, until they're all finished.
+        Useful for a loading screen that redraws whenever there's progress, instead of every tick.
+        """
+        condition = threading.Condition()
+        last = -1
+
+        def notify(_):
+            with condition:
+                condition.notify_all()
+
+        for future in self._jobs:
+            future.add_done_callback(notify)
+        while True:
+            with condition:
+                condition.wait_for(lambda: self.done != last)
+                last = self.done
+            yield self.progress
+            if last == self.total:
+                return
+
+    def shutdown(self):
+        """Wait for all the jobs to finish, and stop the workers."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    def _submit(self, func: Callable, *args) -> Future:
+        if self._executor is None:
+            if self.processes:
+                self._executor = ProcessPoolExecutor(self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(self.max_workers)
+        if self.processes:
+            job = _decode(self._executor.submit(_in_process, func, *args))
+        else:
+            job = self._executor.submit(func, *args)
+        with self._lock:
+            self.total += 1
+        return job
+
+    def _count(self, job: Future):
+        """
+        Count `job` as done when it finishes. Callbacks run in the order they're added, so this
+        has to be called after adding any callbacks that produce the request's result.
+        """
+        job.add_done_callback(self._job_done)
+        self._jobs.append(job)
+
+    def _job_done(self, _: Future):
+        with self._lock:
+            self.done += 1
+
+
+def _load_image(filename: str | Path, colorkey) -> Surface:
+    return loading.load_image(filename, colorkey)
+
+
+def _load_animation_frames(cls: type[FrameAnimation], kwargs: dict) -> list[Surface]:
+    return list(cls.from_spritesheet(**kwargs))
+
+
+def _in_process(func: Callable, *args) -> Any:
+    """Run `func` in a worker process, and turn any Surfaces it returns into picklable bytes."""
+    return _to_bytes(func(*args))
+
+
+def _to_bytes(result: Any) -> Any:
+    if isinstance(result, Surface):
+        return ("surface", pygame.image.tobytes(result, "RGBA"), result.get_size())
+    if isinstance(result, list):
+        return [_to_bytes(item) for item in result]
+    return result
+
+
+def _from_bytes(result: Any) -> Any:
+    if isinstance(result, tuple) and result and result[0] == "surface":
+        _, pixels, size = result
+        return convert_alpha(pygame.image.frombytes(pixels, size, "RGBA"))
+    if isinstance(result, list):
+        return [_from_bytes(item) for item in result]
+    return result
+
+
+def _decode(job: Future) -> Future:
+    """A Future for the result of `job`, with the bytes turned back into Surfaces."""
+    future = Future()
+    future.set_running_or_notify_cancel()
+
+    def decode(job: Future):
+        try:
+            future.set_result(_from_bytes(job.result()))
+        except Exception as exception:
+            future.set_exception(exception)
+
+    job.add_done_callback(decode)
+    return future
+
+
+def _gather(futures: list[Future]) -> Future:
+    """A Future for the list of the results of `futures` (in the same order)."""
+    combined = Future()
+    combined.set_running_or_notify_cancel()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def done(_: Future):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        try:
+            combined.set_result([future.result() for future in futures])
+        except Exception as exception:
+            combined.set_exception(exception)
+
+    if not futures:
+        combined.set_result([])
+    for future in futures:
+        future.add_done_callback(done)
+    return combined
@@ -1,21 +1,40 @@
 import glob
+import os
 from pathlib import Path
 
 import pygame
 
-from robingame.image.manipulation import not_empty
+from robingame.image.manipulation import convert_alpha, not_empty
+
+
+def init_video():
+    """
+    Make sure pygame's video system is initialised, without opening a window. This is all that's
+    needed to use the event queue.
+    On machines without a screen (e.g. CI servers) this falls back to SDL's "dummy" video driver.
+    """
+    if not pygame.display.get_init():
+        try:
+            pygame.display.init()
+        except pygame.error:
+            # no video device available: we can still load and draw images offscreen
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            pygame.display.init()
 
 
 def init_display() -> pygame.Surface:
     """
-    Make sure the pygame display is initialised (required for loading images).
-    If the display already exists, return it. If not, generate a new 1x1 pixel display.
+    Make sure the pygame display is initialised. If the display already exists, return it. If
+    not, generate a new 1x1 pixel display.
+
+    Loading images doesn't require this, but converting them to the display's pixel format (which
+    makes blitting them faster) only happens if a display exists when they're loaded.
 
     Returns:
         the pygame display
     """
     if not pygame.display.get_init():
-        pygame.display.init()
+        init_video()
         return pygame.display.set_mode((1, 1))
     else:
         return pygame.display.get_surface()
@@ -25,6 +44,9 @@ def load_image(filename: str | Path, colorkey: pygame.Color | int = None) -> pyg
     """
     Load an image. Abstracts away some of the pygame pitfalls.
 
+    This doesn't need a display: if there isn't one, the image is still converted to a surface
+    with per-pixel alpha (see `convert_alpha`).
+
     Args:
         filename: path to the image file
         colorkey: sets the color to treat as transparent (like the green in greenscreen).
@@ -33,21 +55,20 @@ def load_image(filename: str | Path, colorkey: pygame.Color | int = None) -> pyg
     Returns:
         the loaded image
     """
-    init_display()
     try:
         image = pygame.image.load(filename)
     except pygame.error:
         print("Unable to load image:", filename)
         raise
 
-    # colorkey needs to be set before .convert_alpha() is called, because Surfaces with a
+    # colorkey needs to be set before convert_alpha() is called, because Surfaces with a
     # per-pixel transparency (i.e. after convert_alpha) ignore colorkey.
     if colorkey is not None:
         if colorkey == -1:
             colorkey = image.get_at((0, 0))
         image.set_colorkey(colorkey, pygame.RLEACCEL)
 
-    image = image.convert_alpha()
+    image = convert_alpha(image)
     return image
 
 
@@ -58,8 +79,7 @@ def load_spritesheet(
     num_images: int = 0,
 ) -> [pygame.Surface]:
     """
-    Load the image file. Don't call this until pygame.display has been initiated. Split the
-    spritesheet into images and return a list of images.
+    Load the image file, split the spritesheet into images, and return a list of images.
 
     If image_size is None, load the whole spritesheet as one sprite.
 
@@ -101,7 +121,7 @@ def load_image_sequence(
     num_images: int = 0,
 ) -> [pygame.Surface]:
     """
-    Load a sequence of images.
+    Load a sequence of images, sorted by filename.
 
     Args:
         pattern: glob pattern for the image sequence. E.g. if your folder of image contains
@@ -113,11 +133,23 @@ def load_image_sequence(
     Returns:
         a list of images
     """
-    pattern = Path(pattern).as_posix()
-    files = glob.glob(pattern)
-    if not files:
-        raise FileNotFoundError(f"Couldn't find any images matching pattern '{pattern}'")
+    files = find_image_sequence(pattern)
     images = [load_image(file, colorkey) for file in files]
     if num_images:
         images = images[:num_images]
     return images
+
+
+def find_image_sequence(pattern: Path | str) -> list[str]:
+    """
+    Find the files of an image sequence (see `load_image_sequence`).
+
+    Returns:
+        the filenames, in the order they'll be loaded (sorted, because the order `glob` finds them
+        in depends on the filesystem)
+    """
+    pattern = Path(pattern).as_posix()
+    files = glob.glob(pattern)
+    if not files:
+        raise FileNotFoundError(f"Couldn't find any images matching pattern '{pattern}'")
+    return sorted(files)
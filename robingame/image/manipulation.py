@@ -1,16 +1,49 @@
+import numpy
 import pygame
 
 from robingame.utils import limit_value
 
 
+def convert_alpha(surface: pygame.Surface) -> pygame.Surface:
+    """
+    Like `surface.convert_alpha()`, but also works when no display has been set up (e.g. in
+    headless tools, or in worker processes that only load assets).
+
+    If there is a display, this is the same as `surface.convert_alpha()`, which converts to the
+    display's pixel format so that blitting is as fast as possible. If there isn't, the pixels are
+    copied into a 32 bit surface with per-pixel alpha instead. Either way, pixels matching the
+    colorkey (if any) become transparent.
+
+    Args:
+        surface: the surface to convert
+
+    Returns:
+        a new surface with per-pixel alpha
+    """
+    if pygame.display.get_surface() is not None:
+        return surface.convert_alpha()
+    converted = pygame.Surface(surface.get_size(), pygame.SRCALPHA, 32)
+    if surface.get_width() and surface.get_height():
+        # copy the channels instead of blitting, to match what convert_alpha does: pixels whose
+        # RGB matches the colorkey become transparent, but keep their RGB
+        rgb = pygame.surfarray.array3d(surface)
+        alpha = pygame.surfarray.array_alpha(surface)  # all opaque if there's no per-pixel alpha
+        colorkey = surface.get_colorkey()
+        if colorkey is not None:
+            alpha[(rgb == colorkey[:3]).all(axis=-1)] = 0
+        pygame.surfarray.pixels3d(converted)[...] = rgb
+        pygame.surfarray.pixels_alpha(converted)[...] = alpha
+    return converted
+
+
 def empty_image(*args, **kwargs) -> pygame.Surface:
     """
-    Generate an empty Surface with `.convert_alpha()` already called.
+    Generate an empty Surface with `convert_alpha()` already called.
 
     Returns:
         an empty Surface
     """
-    img = pygame.Surface(*args, **kwargs).convert_alpha()
+    img = convert_alpha(pygame.Surface(*args, **kwargs))
     img.fill((0, 0, 0, 0))
     return img
 
@@ -63,29 +96,30 @@ def brighten_color(color: pygame.Color | tuple, amount: int) -> pygame.Color:
     return pygame.Color(r, g, b, color.a)
 
 
-def brighten_image(image: pygame.Surface, amount: int) -> pygame.Surface:
+def brighten_image(image: pygame.Surface, amount: int, in_place: bool = False) -> pygame.Surface:
     """
-    Use `brighten_color` to brighten all pixels in an image by `amount`.
+    Brighten all pixels in an image by `amount`, with the same result as applying
+    `brighten_color` to every pixel: the RGB channels saturate at 0 and 255, and the alpha
+    channel and colorkey are left alone.
+
+    This uses a single `Surface.fill` with the `BLEND_RGB_ADD` (or `BLEND_RGB_SUB` for negative
+    amounts) blend mode, so it's cheap enough to do every frame (e.g. for hover effects).
 
     Args:
         image: the input image
-        amount: how much to increase brightness
+        amount: how much to increase brightness (negative values darken the image)
+        in_place: if True, modify `image` instead of making a copy
 
     Returns:
-        a new image
+        the brightened image (`image` itself if `in_place` is True; otherwise a new image)
     """
-    width, height = image.get_size()
     # surface.copy() inherits surface's colorkey; preserving transparency
-    new_image = image.copy()
-
-    # iterate over all the pixels in the old surface, and write a pixel to the new surface in the
-    # corresponding position. If the colour of the present pixel has an entry in the
-    # color_mapping dict, then write the new colour instead of the old one.
-    for x in range(width):
-        for y in range(height):
-            color = image.get_at((x, y))[:]
-            new_color = brighten_color(color, amount)
-            new_image.set_at((x, y), pygame.Color(*new_color))
+    new_image = image if in_place else image.copy()
+    value = min(abs(int(amount)), 255)
+    if amount > 0:
+        new_image.fill((value, value, value), special_flags=pygame.BLEND_RGB_ADD)
+    elif amount < 0:
+        new_image.fill((value, value, value), special_flags=pygame.BLEND_RGB_SUB)
     return new_image
 
 
@@ -124,6 +158,10 @@ def recolor_image(surface: pygame.Surface, color_mapping: dict) -> pygame.Surfac
     """
     Return a recolored copy of an image.
 
+    The pixels are processed as numpy arrays: each RGBA pixel is packed into a uint32 and looked
+    up in the sorted old colours with `numpy.searchsorted`, and only the matching pixels are
+    written to the copy.
+
     Args:
         surface: input image
         color_mapping: dictionary of old colors (keys) to new colors (values).
@@ -135,20 +173,67 @@ def recolor_image(surface: pygame.Surface, color_mapping: dict) -> pygame.Surfac
     """
     # make sure the colourmap has alpha channel on all colours
     color_mapping = {pad_alpha(k): pad_alpha(v) for k, v in color_mapping.items()}
-    width, height = surface.get_size()
     # surface.copy() inherits surface's colorkey; preserving transparency
     new_surface = surface.copy()
+    if not color_mapping or 0 in surface.get_size():
+        return new_surface
+
+    old_colors = pack_rgba(numpy.array(list(color_mapping.keys()), dtype=numpy.uint8))
+    new_colors = numpy.array(list(color_mapping.values()), dtype=numpy.uint8)
+    order = numpy.argsort(old_colors)
+    old_colors = old_colors[order]
+    new_colors = new_colors[order]
+
+    pixels = pack_rgba(rgba_array(surface))
+    index = numpy.searchsorted(old_colors, pixels).clip(max=len(old_colors) - 1)
+    matched = old_colors[index] == pixels
+    if not matched.any():
+        return new_surface
+    try:
+        # map the new colours to the surface's pixel format; then we can write whole pixels
+        mapped_colors = numpy.array([new_surface.map_rgb(color) for color in new_colors.tolist()])
+        target = pygame.surfarray.pixels2d(new_surface)
+    except ValueError:
+        # 24-bit surfaces can't be referenced as a 2d array
+        replacements = new_colors[index[matched]]
+        rgb = pygame.surfarray.pixels3d(new_surface)
+        rgb[matched] = replacements[:, :3]
+        del rgb  # unlock the surface
+        return new_surface
+    target[matched] = mapped_colors[index[matched]].astype(target.dtype)
+    del target  # unlock the surface
+    return new_surface
 
-    # iterate over all the pixels in the old surface, and write a pixel to the new surface in the
-    # corresponding position. If the colour of the present pixel has an entry in the
-    # color_mapping dict, then write the new colour instead of the old one.
-    for x in range(width):
-        for y in range(height):
-            color = surface.get_at((x, y))[:]
-            new_color = color_mapping.get(color)
-            if new_color:
-                new_surface.set_at((x, y), pygame.Color(*new_color))
-            else:
-                new_surface.set_at((x, y), pygame.Color(*color))
 
-    return new_surface
+def rgba_array(surface: pygame.Surface) -> numpy.ndarray:
+    """
+    Copy the pixels of any Surface into an array of shape (width, height, 4), with the same
+    values that `Surface.get_at` would return (surfaces without per-pixel alpha are opaque).
+
+    Args:
+        surface: input image
+
+    Returns:
+        uint8 RGBA array
+    """
+    width, height = surface.get_size()
+    rgba = numpy.empty((width, height, 4), dtype=numpy.uint8)
+    rgba[..., :3] = pygame.surfarray.array3d(surface)
+    rgba[..., 3] = pygame.surfarray.array_alpha(surface)
+    return rgba
+
+
+def pack_rgba(rgba: numpy.ndarray) -> numpy.ndarray:
+    """
+    Pack an array of RGBA values (last axis of length 4) into one uint32 per colour, so that
+    colours can be compared and sorted as single numbers. This reinterprets the 4 bytes of each
+    colour as one number (in the machine's byte order), so it doesn't copy if it doesn't have to.
+
+    Args:
+        rgba: uint8 array of shape (..., 4)
+
+    Returns:
+        uint32 array of shape (...)
+    """
+    rgba = numpy.ascontiguousarray(rgba, dtype=numpy.uint8)
+    return rgba.view(numpy.uint32)[..., 0]
@@ -0,0 +1,199 @@
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+import numpy
+import pygame
+from pygame import Color, Surface
+
+from robingame.utils import circle_surf, arrow_coords, rotation_matrix
+
+
+class SurfaceCache:
+    """
+    Least-recently-used cache of Surfaces, bounded by the total number of bytes of pixel data.
+
+    Surfaces returned by the cache are shared between all callers, so don't draw on them. If you
+    need a Surface you can modify, `.copy()` it.
+
+    Example:
+        ```
+        cache = SurfaceCache(max_bytes=1024 * 1024)
+        surf = cache.get(("my_shape", 10), lambda: expensive_drawing_function(10))
+        print(cache.hits, cache.misses)
+        ```
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, enabled: bool = True):
+        """
+        Args:
+            max_bytes: upper limit for the summed pixel data of all the cached Surfaces
+            enabled: if False, every `get` calls the factory and nothing is stored (opt-out)
+        """
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.entries: OrderedDict[Hashable, Surface] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, factory: Callable[[], Surface]) -> Surface:
+        """
+        Return the Surface stored under `key`. If there isn't one, create it by calling
+        `factory()`, store it, and evict the least recently used entries until the cache is
+        within its byte budget.
+
+        Args:
+            key: hashable description of the Surface (geometry, colour, flags, ...)
+            factory: function that creates the Surface
+
+        Returns:
+            the (shared) Surface
+        """
+        if not self.enabled:
+            return factory()
+        try:
+            surface = self.entries[key]
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surface
+
+        surface = factory()
+        size = self.surface_bytes(surface)
+        if size <= self.max_bytes:
+            self.entries[key] = surface
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= self.surface_bytes(evicted)
+                self.evictions += 1
+        return surface
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        self.entries.clear()
+        self.bytes = self.hits = self.misses = self.evictions = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hit/miss counters and current memory usage."""
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=len(self.entries),
+            bytes=self.bytes,
+            max_bytes=self.max_bytes,
+        )
+
+    @staticmethod
+    def surface_bytes(surface: Surface) -> int:
+        """Size of the Surface's pixel data in bytes."""
+        width, height = surface.get_size()
+        return width * height * surface.get_bytesize()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# default cache used by the shape functions below
+shape_cache = SurfaceCache()
+
+
+def _color_key(color) -> tuple:
+    """pygame.Color is unhashable, so we use its RGBA tuple in the cache keys."""
+    return tuple(Color(color))
+
+
+def circle(radius: int, color, cache: SurfaceCache = None) -> Surface:
+    """
+    Cached equivalent of `robingame.utils.circle_surf`.
+
+    Args:
+        radius: radius of the circle (in pixels)
+        color: colour of the circle
+        cache: cache to use (default = `shape_cache`)
+
+    Returns:
+        a colorkeyed Surface of size `(2 * radius, 2 * radius)` with the circle drawn on it
+    """
+    cache = shape_cache if cache is None else cache
+    radius = int(radius)
+    key = ("circle", radius, _color_key(color))
+    return cache.get(key, lambda: circle_surf(radius, color))
+
+
+def rect(
+    size: tuple[int, int],
+    color,
+    width: int = 0,
+    border_radius: int = 0,
+    cache: SurfaceCache = None,
+) -> Surface:
+    """
+    Cached Surface with a (optionally rounded, optionally hollow) rectangle drawn on it.
+    The rest of the Surface is transparent, so the colour's alpha channel is respected.
+
+    Args:
+        size: xy size of the rectangle
+        color: colour of the rectangle
+        width: line thickness (0 = filled), as in `pygame.draw.rect`
+        border_radius: radius of the rounded corners (0 = square corners)
+        cache: cache to use (default = `shape_cache`)
+
+    Returns:
+        a per-pixel alpha Surface of size `size`
+    """
+    cache = shape_cache if cache is None else cache
+    size = tuple(int(s) for s in size)
+    key = ("rect", size, _color_key(color), width, border_radius)
+
+    def factory():
+        surf = Surface(size, pygame.SRCALPHA)
+        pygame.draw.rect(surf, color, surf.get_rect(), width, border_radius)
+        return surf
+
+    return cache.get(key, factory)
+
+
+def arrow(
+    angle_deg: float,
+    color,
+    length: int = 50,
+    width: int = 2,
+    cache: SurfaceCache = None,
+) -> Surface:
+    """
+    Cached Surface with the same arrow that `robingame.utils.draw_arrow` draws.
+    The origin of the arrow is at the center of the Surface, so to draw it at `origin` do:
+
+    ```
+    image = arrow(angle_deg, color)
+    surface.blit(image, image.get_rect(center=origin))
+    ```
+
+    Args:
+        angle_deg: direction of the arrow (in degrees)
+        color: colour of the arrow
+        length: length of the arrow (in pixels)
+        width: line thickness
+        cache: cache to use (default = `shape_cache`)
+
+    Returns:
+        a per-pixel alpha Surface of size `(2 * (length + width), 2 * (length + width))`
+    """
+    cache = shape_cache if cache is None else cache
+    key = ("arrow", angle_deg, _color_key(color), length, width)
+
+    def factory():
+        half = length + width
+        surf = Surface((2 * half, 2 * half), pygame.SRCALPHA)
+        arrow_xy = arrow_coords(length, length // 10, length // 4)
+        arrow_xy = arrow_xy.dot(rotation_matrix(angle_deg)) + numpy.array((half, half))
+        pygame.draw.polygon(surf, color, arrow_xy, width)
+        return surf
+
+    return cache.get(key, factory)
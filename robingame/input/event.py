@@ -4,9 +4,7 @@ from typing import Union
 import pygame
 from pygame.event import EventType, Event as PygameEvent
 
-from robingame.image import init_display
-
-init_display()
+from robingame.image import init_video
 
 
 class EventQueue:
@@ -35,6 +33,7 @@ class EventQueue:
         """
         if is_dataclass(event):
             event = PygameEvent(event.type, **asdict(event))
+        init_video()  # pygame's event queue belongs to the video system
         pygame.event.post(event)
 
     @classmethod
@@ -43,6 +42,7 @@ class EventQueue:
         Read all the events from pygame's event queue into cls.events
         (also clears pygame's event queue)
         """
+        init_video()
         cls.events = pygame.event.get()
 
     @classmethod
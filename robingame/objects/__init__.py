@@ -1,5 +1,7 @@
 from .group import Group
 from .entity import Entity
 from .game import Game
-from .helpers import FpsTracker
-from .particles import Particle
+from .helpers import FpsTracker, ProfilerOverlay
+from .particles import Particle, ParticleSystem
+from .spatial import SpatialHash, SpatialGroup
+from .profiling import Profiler, profiler
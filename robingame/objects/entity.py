@@ -1,7 +1,7 @@
 from typing import Callable, Iterable
 
 import pygame
-from pygame import Surface
+from pygame import Rect, Surface
 
 from robingame.objects.group import Group
 
@@ -75,6 +75,36 @@ class Entity(pygame.sprite.Sprite):
         for group in self.child_groups:
             group.draw(surface, debug)
 
+    def mark_dirty(self, *rects: Rect):
+        """
+        Report areas of the screen that need to be redrawn because this entity changed (it moved,
+        its image changed, etc). This only matters if the Game is in dirty-rect mode
+        (`Game.dirty_rect_mode = True`); otherwise the whole screen is redrawn every frame anyway.
+
+        Call this from `update()`. If the entity moved, mark both the old and the new position:
+        ```
+        old_rect = self.rect.copy()
+        self.rect.move_ip(self.velocity)
+        self.mark_dirty(old_rect, self.rect)
+        ```
+
+        Args:
+            rects: areas of the screen that have changed (default = `self.rect`)
+        """
+        rects = rects or (self.rect,)
+        for group in self.groups():
+            if hasattr(group, "mark_dirty"):  # plain pygame Groups don't track dirty rects
+                group.mark_dirty(*rects)
+
+    def pop_dirty_rects(self) -> list[Rect]:
+        """
+        Collect and reset the dirty rects of all child groups (recursively).
+        """
+        rects = []
+        for group in self.child_groups:
+            rects += group.pop_dirty_rects()
+        return rects
+
     def kill(self):
         """Removes self from all groups."""
         for group in self.child_groups:
@@ -1,12 +1,18 @@
+import os
 import sys
+import time
+from contextlib import contextmanager
 
 import pygame
+from pygame import Rect
 from pygame.color import Color
 from pygame.surface import Surface
 
 from robingame.input import EventQueue
 from robingame.objects.entity import Entity
-from robingame.objects.helpers import FpsTracker
+from robingame.objects.helpers import FpsTracker, ProfilerOverlay
+from robingame.objects.profiling import profiler
+from robingame.utils import merge_rects
 
 
 class Game(Entity):
@@ -20,7 +26,48 @@ class Game(Entity):
     - doing `clock.tick()` every iteration and enforcing the framerate
     - filling the screen with `self.screen_color` every iteration
     - updating the EventQueue with new events
-    - maintaining the FPS tracker (and drawing it in debug mode)
+    - maintaining the FPS tracker and timing the phases of each frame (and drawing them in debug
+      mode)
+    - profiling the update and draw of the object tree (if `profile = True`), and drawing the
+      profiler's flame graph in debug mode
+
+    Fixed timestep mode:
+
+    By default the game does one update per frame, so a slow frame slows down the simulation.
+    Set `update_hz` to simulate at a constant rate instead, independent of the framerate. Each
+    frame runs as many updates as needed to catch up with real time (at most
+    `max_updates_per_frame`), and `fps` only limits how often we draw. Entities can smooth out
+    their movement using `game.interpolation`: the fraction of an update step that has elapsed
+    since the last update (always 1 outside fixed timestep mode). Entities that need it should
+    keep a reference to the game, for example:
+    ```
+    class Ball(Entity):
+        def __init__(self, game: Game):
+            super().__init__()
+            self.game = game
+
+        def draw(self, surface, debug=False):
+            x = self.previous_x + (self.x - self.previous_x) * self.game.interpolation
+            ...
+    ```
+
+    Headless mode:
+
+    Set `headless = True` to run the simulation without a window, e.g. for AI training or tests
+    on a machine without a screen. SDL's "dummy" video driver is used (if the display hasn't been
+    initialised yet), the framerate isn't capped, fixed timestep mode is ignored (every frame is
+    one update), and nothing is drawn unless `headless_draw = True`, in which case we draw onto an
+    offscreen `self.window` surface. Use `run(ticks)` to simulate a number of ticks and return.
+
+    Dirty-rect mode:
+
+    By default the whole screen is cleared, redrawn and sent to the display every frame. For
+    mostly static scenes (menus etc) set `dirty_rect_mode = True`. Then only the areas reported
+    by `Entity.mark_dirty()` (plus entities being added to / removed from groups) are cleared,
+    redrawn and updated. Each dirty region is a separate pass over the object tree, so if there
+    are more than `dirty_rect_max_regions` of them, their bounding box is redrawn in a single pass
+    instead. If the area to redraw is more than `dirty_rect_threshold` of the screen, or in debug
+    mode, the whole screen is redrawn as usual. Call `redraw()` to force a full redraw.
     """
 
     fps: int = 60
@@ -30,34 +77,82 @@ class Game(Entity):
     screen_color = Color("black")
     debug: bool = False  # draw / print debug info?
     running: bool  # is the main game loop running
+    dirty_rect_mode: bool = False  # only redraw the parts of the screen that have changed?
+    dirty_rect_threshold: float = 0.5  # fraction of the screen past which we redraw all of it
+    dirty_rect_max_regions: int = 8  # past this many dirty regions, redraw their bounding box
+    update_hz: int | None = None  # fixed timestep mode: updates per second (None = once per frame)
+    max_updates_per_frame: int = 5  # in fixed timestep mode, give up catching up past this
+    headless: bool = False  # run without a window, as fast as possible?
+    headless_draw: bool = False  # in headless mode, still draw onto the offscreen `self.window`?
+    profile: bool = False  # enable the profiler (see `robingame.objects.profiling`)?
+    interpolation: float = 1.0  # fixed timestep mode: progress towards the next update
 
     def __init__(self):
         """
         Handles a lot of the boilerplate pygame setup.
-        Creates the display (`self.window`).
+        Creates the display (`self.window`), or an offscreen surface in headless mode.
         """
         super().__init__()
+        if self.headless and not pygame.display.get_init():
+            with _dummy_video_driver():
+                pygame.display.init()
         pygame.init()
         self.fps_tracker = FpsTracker()
-        self.window = pygame.display.set_mode((self.window_width, self.window_height))
-        pygame.display.set_caption(self.window_caption)
+        self.profiler_overlay = ProfilerOverlay()
+        if self.profile:
+            profiler.enabled = True
+        if self.headless:
+            self.window = Surface((self.window_width, self.window_height))
+        else:
+            self.window = pygame.display.set_mode((self.window_width, self.window_height))
+            pygame.display.set_caption(self.window_caption)
         self.clock = pygame.time.Clock()
+        self._dirty_rects = []
+        self._full_redraw = True
+        self._drew_debug = False
+        self._accumulator = 0.0  # simulation time owed to the fixed timestep loop (seconds)
+        self._last_frame_time = None
 
     def main(self):
         """
         Contains the main game loop.
-        Calls `self._update()` and `self._draw()` on every iteration of the game loop.
+        Calls `self._update()` (or `self._fixed_update()` in fixed timestep mode) and
+        `self._draw()` on every iteration of the game loop.
         """
-        self.running = True
-        while self.running:
-            self._update()
-            self._draw(self.window, debug=self.debug)
+        self.run()
         pygame.quit()
         sys.exit()
 
+    def run(self, ticks: int = None):
+        """
+        Run the game loop until `self.running` is set to False, or for a number of ticks. Unlike
+        `main()`, this returns to the caller afterwards and doesn't quit pygame, so it can be used
+        to simulate games in headless mode:
+        ```
+        game = MyHeadlessGame()
+        game.run(ticks=10_000)
+        print(game.score)
+        ```
+
+        Args:
+            ticks: number of iterations of the game loop to run (default = no limit)
+        """
+        self.running = True
+        tick = 0
+        while self.running and (ticks is None or tick < ticks):
+            if self.update_hz and not self.headless:
+                self._fixed_update()
+            else:
+                self._update()
+            if not self.headless or self.headless_draw:
+                self._draw(self.window, debug=self.debug)
+            if profiler.enabled:
+                profiler.end_frame()
+            tick += 1
+
     def read_inputs(self):
         """
-        Called by `self._update()`, before `super().update()` updates the children.
+        Called by `self._simulate()`, before `super().update()` updates the children.
 
         Any code that polls external joysticks/controllers should go here.
         """
@@ -73,27 +168,147 @@ class Game(Entity):
             if event.type == pygame.KEYDOWN and event.key == pygame.K_F1:
                 self.debug = not self.debug
 
+    def mark_dirty(self, *rects: Rect):
+        """
+        Report areas of the screen that need to be redrawn (default = the whole window).
+        See `Entity.mark_dirty()`.
+        """
+        rects = rects or (self.window.get_rect(),)
+        self._dirty_rects.extend(Rect(rect) for rect in rects)
+
+    def pop_dirty_rects(self) -> list[Rect]:
+        rects, self._dirty_rects = self._dirty_rects, []
+        return rects + super().pop_dirty_rects()
+
+    def redraw(self):
+        """
+        Redraw the whole screen on the next frame, even in dirty-rect mode. Call this after
+        changing something that isn't tracked with `mark_dirty()`, like `screen_color`.
+        """
+        self._full_redraw = True
+
     def print_debug_info(self):
         """
         Override this if you want to print any debug info.
         """
         pass
 
-    def _update(self):
+    def _simulate(self):
         """
+        One simulation step:
         1. read inputs
         2. update
         """
-        self.read_inputs()
+        with profiler.section("input"), self.fps_tracker.phase("input"):
+            self.read_inputs()
         if self.debug:
             self.print_debug_info()
-        self.update()
+        with profiler.section("update"), self.fps_tracker.phase("update"):
+            self.update()
+
+    def _update(self):
+        """
+        Do one simulation step per frame, and enforce the framerate.
+        """
+        self._simulate()
+        self.fps_tracker.update()
+        if self.fps and not self.headless:
+            self.clock.tick(self.fps)
+
+    def _fixed_update(self):
+        """
+        Do as many simulation steps as fit in the time elapsed since the last frame, at a rate of
+        `update_hz`. Leftover time is carried over to the next frame, and the fraction of a step
+        it represents is stored in `self.interpolation` for interpolating in `draw()`.
+        """
+        step = 1 / self.update_hz
+        now = time.perf_counter()
+        if self._last_frame_time is None:
+            self._accumulator = step  # always simulate at least once before the first draw
+        else:
+            self._accumulator += now - self._last_frame_time
+        self._last_frame_time = now
+
+        steps = 0
+        while self._accumulator >= step:
+            if steps == self.max_updates_per_frame:
+                # we can't keep up; slow the simulation down rather than spiral out of control
+                self._accumulator %= step
+                break
+            self._simulate()
+            self._accumulator -= step
+            steps += 1
+        self.interpolation = self._accumulator / step
+
         self.fps_tracker.update()
         if self.fps:
             self.clock.tick(self.fps)
 
     def _draw(self, surface: Surface, debug: bool = False):
+        with profiler.section("draw"), self.fps_tracker.phase("draw"):
+            rects = self._draw_frame(surface, debug)
+        if not self.headless:
+            with profiler.section("present"), self.fps_tracker.phase("present"):
+                if rects is None:
+                    pygame.display.update()  # print to screen
+                else:
+                    pygame.display.update(rects)
+
+    def _draw_frame(self, surface: Surface, debug: bool) -> list[Rect] | None:
+        """
+        Draw everything onto the surface. Returns the regions of the surface that were redrawn,
+        or None if it was redrawn completely.
+        """
+        if self.dirty_rect_mode and surface is self.window and not self.headless:
+            rects = self._get_dirty_regions(surface, debug)
+            if rects is not None:
+                for rect in rects:
+                    surface.set_clip(rect)  # filling and drawing both respect the clip area
+                    surface.fill(self.screen_color)
+                    self.draw(surface, debug)
+                surface.set_clip(None)
+                return rects
+
+        self._dirty_rects = []  # everything is being redrawn anyway (groups reset theirs in draw)
         surface.fill(self.screen_color)  # clear the screen
         self.draw(surface, debug)
         self.fps_tracker.draw(surface, debug)
-        pygame.display.update()  # print to screen
+        self.profiler_overlay.draw(surface, debug)
+        return None
+
+    def _get_dirty_regions(self, surface: Surface, debug: bool) -> list[Rect] | None:
+        """
+        Collect the dirty rects from the whole object tree and merge them into non-overlapping
+        regions. Returns None if the whole screen should be redrawn instead.
+        """
+        dirty = self.pop_dirty_rects()
+        # debug drawing isn't tracked, and has to be erased the frame after debug is turned off
+        if self._full_redraw or debug or self._drew_debug:
+            self._full_redraw = False
+            self._drew_debug = debug
+            return None
+        screen = surface.get_rect()
+        regions = merge_rects(rect.clip(screen) for rect in dirty)
+        if len(regions) > self.dirty_rect_max_regions:
+            # each region costs a traversal of the whole tree; one big region is cheaper
+            regions = [regions[0].unionall(regions[1:])]
+        dirty_area = sum(rect.width * rect.height for rect in regions)
+        if dirty_area > self.dirty_rect_threshold * screen.width * screen.height:
+            return None
+        return regions
+
+
+@contextmanager
+def _dummy_video_driver():
+    """
+    Use SDL's "dummy" video driver inside this block, unless a driver has been chosen already.
+    The environment is restored afterwards, so it doesn't leak into later Games or subprocesses.
+    """
+    previous = os.environ.get("SDL_VIDEODRIVER")
+    if previous is None:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop("SDL_VIDEODRIVER", None)
@@ -1,6 +1,9 @@
 import pygame
+from pygame import Rect
 from typing import TYPE_CHECKING
 
+from robingame.objects.profiling import profiler
+
 if TYPE_CHECKING:
     from robingame.objects.entity import Entity
 
@@ -8,6 +11,21 @@ if TYPE_CHECKING:
 class Group(pygame.sprite.Group):
     """Container for multiple Entities."""
 
+    name: str | None = None  # label for the profiler (default = the class name)
+    max_dirty_rects: int = 32  # collapse dirty rects into their union past this many
+    dirty_rects: list[Rect]  # areas of the screen that members have changed since the last draw
+
+    def __init__(self, *entities: "Entity", name: str = None):
+        """
+        Args:
+            entities: initial members
+            name: label for the profiler, e.g. "buttons"
+        """
+        self.dirty_rects = []
+        if name is not None:
+            self.name = name
+        super().__init__(*entities)
+
     def add(self, *entities: "Entity") -> None:
         """
         Does the same thing as pygame's `Group.add()`.
@@ -19,7 +37,20 @@ class Group(pygame.sprite.Group):
         """
         Call `.update()` on all member Entities.
         """
-        super().update(*args)
+        if not profiler.enabled:
+            super().update(*args)
+            return
+        # try/finally keeps the profiler's stack balanced if an entity raises
+        profiler.start(self.name or type(self).__name__)
+        try:
+            for entity in self.sprites():
+                profiler.start(type(entity).__name__)
+                try:
+                    entity.update(*args)
+                finally:
+                    profiler.stop()
+        finally:
+            profiler.stop()
 
     def draw(self, surface: pygame.Surface, debug: bool = False):
         """
@@ -30,9 +61,58 @@ class Group(pygame.sprite.Group):
         Entity's `.image` onto the surface.
         """
         entities = self.sprites()
-        for entity in entities:
-            entity.draw(surface, debug)
+        if profiler.enabled:
+            profiler.start(self.name or type(self).__name__)
+            try:
+                for entity in entities:
+                    profiler.start(type(entity).__name__)
+                    try:
+                        entity.draw(surface, debug)
+                    finally:
+                        profiler.stop()
+            finally:
+                profiler.stop()
+        else:
+            for entity in entities:
+                entity.draw(surface, debug)
         self.lostsprites = []
+        self.dirty_rects = []
+
+    def add_internal(self, entity: "Entity", layer=None):
+        super().add_internal(entity, layer)
+        self._entity_changed(entity)
+
+    def remove_internal(self, entity: "Entity"):
+        super().remove_internal(entity)
+        self._entity_changed(entity)
+
+    def mark_dirty(self, *rects: Rect):
+        """
+        Record areas of the screen that need to be redrawn. Called by `Entity.mark_dirty()`.
+
+        Args:
+            rects: areas of the screen that have changed
+        """
+        self.dirty_rects.extend(Rect(rect) for rect in rects)
+        if len(self.dirty_rects) > self.max_dirty_rects:
+            # lots of small changes: one big rect is cheaper, and keeps memory bounded for
+            # groups that are never drawn
+            self.dirty_rects = [self.dirty_rects[0].unionall(self.dirty_rects[1:])]
+
+    def pop_dirty_rects(self) -> list[Rect]:
+        """
+        Collect and reset the dirty rects of this group and all of its members (recursively).
+        """
+        rects, self.dirty_rects = self.dirty_rects, []
+        for entity in self.sprites():
+            rects += entity.pop_dirty_rects()
+        return rects
+
+    def _entity_changed(self, entity: "Entity"):
+        # an entity appearing or disappearing changes the screen wherever it is
+        rect = getattr(entity, "rect", None)
+        if rect is not None:
+            self.mark_dirty(rect)
 
     def kill(self):
         """
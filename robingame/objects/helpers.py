@@ -1,32 +1,122 @@
+import csv
 import time
-from collections import deque
+import zlib
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
 
+import numpy
+
+from pygame import Rect
 from pygame.color import Color
 from pygame.surface import Surface
 
 from robingame.objects.entity import Entity
+from robingame.objects.profiling import profiler, SectionPath
 from robingame.text import fonts
 
 
 class FpsTracker(Entity):
     """
-    Displays a little number in the top right of the window if debug=True
+    Keeps track of the framerate and of how long each frame takes.
+
+    Every frame is split into phases ("input", "update", "draw", "present"), which `Game` times
+    with `phase()`. `stats()` summarises the frame times over the last `history_length` frames
+    with percentiles, which show stutter much better than the average FPS does, and
+    `export_csv()` saves the raw timings for offline analysis.
+
+    If debug=True, displays the FPS in the top right of the window, with a graph of the recent
+    frame times underneath it (one column per frame, split into the phases).
     """
 
     buffer_length = 60
+    history_length = 600  # number of frames to keep timings for
+    phases = ("input", "update", "draw", "present")
+    phase_colors = dict(
+        input=Color("purple"),
+        update=Color("dodgerblue"),
+        draw=Color("orange"),
+        present=Color("forestgreen"),
+    )
+    graph_size = (100, 40)
+    graph_max_ms = 1000 / 30  # frame time at the top of the graph
+    graph_target_ms = 1000 / 60  # frame time marked with a line on the graph
     font = fonts.cellphone_black
-    fps: int
+    fps: int = 0
 
     def __init__(self, *groups) -> None:
         super().__init__(*groups)
         self.queue = deque(maxlen=self.buffer_length)
+        self.frame_times = deque(maxlen=self.history_length)  # seconds
+        self.phase_times = {phase: deque(maxlen=self.history_length) for phase in self.phases}
+        self._current_phases = dict.fromkeys(self.phases, 0.0)
 
     def update(self):
+        """
+        Called once per iteration of the game loop. Records the time since the last call as the
+        frame time, along with the phase timings recorded since then.
+        """
         t = time.perf_counter()
+        if self.queue:
+            self.frame_times.append(t - self.queue[-1])
+            for phase, seconds in self._current_phases.items():
+                self.phase_times[phase].append(seconds)
+        self._current_phases = dict.fromkeys(self.phases, 0.0)
         self.queue.append(t)
         seconds = self.queue[-1] - self.queue[0]
         self.fps = int(self.buffer_length / seconds) if seconds else 0
 
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Context manager that adds the time spent inside it to one of the `phases` of the current
+        frame.
+
+        Example:
+            ```
+            with self.fps_tracker.phase("draw"):
+                self.draw(surface)
+            ```
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._current_phases[name] += time.perf_counter() - start
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """
+        Percentiles of the frame times, and of the time spent in each phase, over the last
+        `history_length` frames.
+
+        Returns:
+            a dict like `{"frame": {"p50": 16.7, "p95": 17.1, "p99": 25.0, "worst": 40.2},
+            "input": {...}, "update": {...}, ...}`, with all the times in milliseconds
+        """
+        columns = dict(frame=self.frame_times, **self.phase_times)
+        stats = dict()
+        for name, seconds in columns.items():
+            ms = numpy.array(seconds, dtype=float) * 1000
+            if not len(ms):
+                ms = numpy.zeros(1)
+            p50, p95, p99 = numpy.percentile(ms, [50, 95, 99])
+            stats[name] = dict(
+                p50=float(p50), p95=float(p95), p99=float(p99), worst=float(ms.max())
+            )
+        return stats
+
+    def export_csv(self, filename: str | Path):
+        """
+        Write the frame timings (in milliseconds) to a CSV file, one row per frame, with columns
+        "frame", "frame_ms", and "<phase>_ms" for each phase.
+        """
+        with open(filename, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame", "frame_ms"] + [f"{phase}_ms" for phase in self.phases])
+            columns = [self.frame_times] + [self.phase_times[phase] for phase in self.phases]
+            for ii, row in enumerate(zip(*columns)):
+                writer.writerow([ii] + [f"{1000 * seconds:.4f}" for seconds in row])
+
     def draw(self, surface: Surface, debug: bool = False):
         if debug:
             scale = 2
@@ -38,3 +128,86 @@ class FpsTracker(Entity):
             rect.right = surface.get_rect().right - 10
             rect.top = surface.get_rect().top + 10
             surface.blit(surf, rect)
+
+            graph = self.draw_graph()
+            surface.blit(graph, graph.get_rect(topright=(rect.right, rect.bottom + 5)))
+
+    def draw_graph(self) -> Surface:
+        """
+        Draw a graph of the most recent frame times: one column per frame (newest on the right),
+        with the phases stacked from the bottom in `phase_colors`, and the remainder of the frame
+        (e.g. waiting for the next tick) in grey.
+        """
+        width, height = self.graph_size
+        graph = Surface(self.graph_size)
+        graph.fill(Color("white"))
+        px_per_ms = height / self.graph_max_ms
+        n_frames = min(width, len(self.frame_times))
+        start = len(self.frame_times) - n_frames
+        for ii in range(n_frames):
+            x = width - n_frames + ii
+            bottom = height
+            frame_px = round(1000 * self.frame_times[start + ii] * px_per_ms)
+            graph.fill(Color("grey"), (x, height - frame_px, 1, frame_px))
+            for phase in self.phases:
+                px = round(1000 * self.phase_times[phase][start + ii] * px_per_ms)
+                graph.fill(self.phase_colors[phase], (x, bottom - px, 1, px))
+                bottom -= px
+        target_y = height - round(self.graph_target_ms * px_per_ms)
+        graph.fill(Color("red"), (0, target_y, width, 1))
+        return graph
+
+
+class ProfilerOverlay(Entity):
+    """
+    Draws a flame graph of the `profiler` timings along the bottom of the window if debug=True
+    and the profiler is enabled. Each row is one level of nesting (update/draw > groups > entity
+    classes > ...) and the width of each bar is its share of the frame time.
+    """
+
+    row_height = 11
+    margin = 10
+    font = fonts.cellphone_black
+
+    def draw(self, surface: Surface, debug: bool = False):
+        if not (debug and profiler.enabled):
+            return
+        means = profiler.mean_times()
+        if not means:
+            return
+        children = defaultdict(list)
+        for path in sorted(means):
+            children[path[:-1]].append(path)
+        area = surface.get_rect()
+        total = sum(means[path] for path in children[()])
+        scale = (area.width - 2 * self.margin) / total if total else 0
+        y = area.bottom - self.margin - self.row_height
+        self._draw_children(surface, children, means, (), self.margin, y, scale)
+
+    def _draw_children(
+        self,
+        surface: Surface,
+        children: dict[SectionPath, list[SectionPath]],
+        means: dict[SectionPath, float],
+        parent: SectionPath,
+        x: float,
+        y: int,
+        scale: float,
+    ):
+        for path in children[parent]:
+            width = means[path] * scale
+            rect = Rect(round(x), y, max(round(width), 1), self.row_height - 1)
+            surface.fill(self._color(path[-1]), rect)
+            label = self.font.layout(f"{path[-1]} {1000 * means[path]:.2f}ms")
+            if label.rect.width <= rect.width - 4:
+                label.draw(surface, rect.x + 2, rect.y + 1)
+            # children are stacked on top of their parent, like a flame
+            self._draw_children(surface, children, means, path, x, y - self.row_height, scale)
+            x += width
+
+    @staticmethod
+    def _color(name: str) -> Color:
+        # crc32 instead of hash() so that the colours don't change between runs
+        color = Color(0)
+        color.hsva = (zlib.crc32(name.encode()) % 360, 50, 100, 100)
+        return color
@@ -1,8 +1,33 @@
+import numpy
 import pygame
 from pygame.color import Color
+from pygame.surface import Surface
 
 from robingame.objects.entity import Entity
-from robingame.utils import circle_surf
+from robingame.image import shapes
+
+
+def blit_batch(surface: Surface, sprites: list[Surface], positions: list, special_flags: int = 0):
+    """
+    Submit all the blits in one call. Uses `Surface.fblits` where available (pygame-ce), and
+    falls back to `Surface.blits`.
+
+    Args:
+        surface: destination surface
+        sprites: the images to blit
+        positions: the destination of each image
+        special_flags: blend mode applied to every blit
+    """
+    if hasattr(surface, "fblits"):
+        surface.fblits(list(zip(sprites, positions)), special_flags)
+    else:
+        surface.blits(
+            [
+                (sprite, position, None, special_flags)
+                for sprite, position in zip(sprites, positions)
+            ],
+            doreturn=False,
+        )
 
 
 class Particle(Entity):
@@ -50,7 +75,7 @@ class Particle(Entity):
             self.kill()
 
     def draw(self, surface, debug=False):
-        surf = circle_surf(round(self.radius), self.color)
+        surf = shapes.circle(round(self.radius), self.color)
         image_rect = surf.get_rect()
         image_rect.center = self.x, self.y
         surface.blit(surf, image_rect, special_flags=self.blit_flag)
@@ -72,3 +97,191 @@ class Particle(Entity):
     @property
     def death_condition(self):
         return self.radius <= 0
+
+
+class ParticleSystem(Entity):
+    """
+    Manages a large number of particles as a single Entity.
+
+    Instead of one `Particle` Entity per particle, the particle properties are stored in
+    structure-of-arrays numpy buffers. `update` advances all the particles in one vectorized step
+    (using the same physics as `Particle.update`) and removes the dead ones in bulk.
+
+    Example:
+        ```
+        particles = ParticleSystem()
+        particles.emit(x=100, y=100, v=numpy.random.uniform(-15, -10, 50), radius=20, decay=0.3)
+        ```
+    """
+
+    blit_flag = pygame.BLEND_RGB_ADD
+    gravity: float = 0.0
+    friction: float = 0.0
+    decay: float = 0.0
+    radius: float = 1
+    color: Color = Color("white")
+    debug_color = Color("red")
+    initial_capacity: int = 1024
+
+    # names of the float buffers; one array per property
+    fields = ("x", "y", "u", "v", "radius", "decay", "gravity", "friction")
+
+    def __init__(self, groups=(), blit_flag=None):
+        """
+        Args:
+            groups: passed to `Entity.__init__`
+            blit_flag: special_flags used to blit all the particles (default=`BLEND_RGB_ADD`)
+        """
+        super().__init__(groups)
+        self.blit_flag = self.blit_flag if blit_flag is None else blit_flag
+        self.count = 0  # number of live particles; only the first `count` entries are valid
+        self.capacity = self.initial_capacity
+        self.arrays = {name: numpy.zeros(self.capacity) for name in self.fields}
+        self.colors = numpy.zeros((self.capacity, 4), dtype=numpy.uint8)
+
+    def emit(
+        self,
+        x,
+        y,
+        u=0,
+        v=0,
+        radius=None,
+        color=None,
+        gravity=None,
+        friction=None,
+        decay=None,
+    ):
+        """
+        Add new particles. All the arguments can be scalars or sequences; they are broadcast
+        against each other, so `emit(x=10, y=10, u=[1, 2, 3])` adds 3 particles.
+
+        Args:
+            x: x-position
+            y: y-position
+            u: x-velocity
+            v: y-velocity
+            radius: initial radius (default = `self.radius`)
+            color: a single colour or a sequence of colours (default = `self.color`)
+            gravity: added to the y-velocity every tick (default = `self.gravity`)
+            friction: fraction of velocity lost every tick (default = `self.friction`)
+            decay: amount by which the radius shrinks every tick (default = `self.decay`)
+        """
+        values = numpy.broadcast_arrays(
+            *(
+                numpy.asarray(value, dtype=float)
+                for value in (
+                    x,
+                    y,
+                    u,
+                    v,
+                    self.radius if radius is None else radius,
+                    self.decay if decay is None else decay,
+                    self.gravity if gravity is None else gravity,
+                    self.friction if friction is None else friction,
+                )
+            )
+        )
+        n = values[0].size
+        if not n:
+            return
+        self._reserve(self.count + n)
+        new = slice(self.count, self.count + n)
+        for name, value in zip(self.fields, values):
+            self.arrays[name][new] = value.ravel()
+        self.colors[new] = self._color_array(self.color if color is None else color)
+        self.count += n
+
+    def update(self):
+        """
+        Advance all particles by one tick and remove the dead ones.
+        """
+        super().update()
+        n = self.count
+        if not n:
+            return
+        x, y, u, v, radius, decay, gravity, friction = (
+            self.arrays[name][:n] for name in self.fields
+        )
+        x += u
+        y += v
+        v += gravity
+        u *= 1 - friction
+        v *= 1 - friction
+        radius -= decay
+        self._compact(~self.death_condition)
+
+    def draw(self, surface, debug=False):
+        """
+        Draw all the particles in one batched blit. Each particle's circle sprite is fetched from
+        the shape cache, so only one sprite is rendered per unique (radius, colour).
+        """
+        super().draw(surface, debug)
+        n = self.count
+        if not n:
+            return
+        radii = numpy.rint(self.arrays["radius"][:n]).astype(numpy.int64)
+        packed_colors = self.colors[:n].copy().view(numpy.uint32).ravel()
+        _, index, inverse = numpy.unique(
+            (radii << 32) | packed_colors, return_index=True, return_inverse=True
+        )
+        sprites = [shapes.circle(radii[ii], tuple(self.colors[ii])) for ii in index]
+        # same as setting `rect.center = x, y` (pygame rounds floats half away from zero)
+        x, y = self.arrays["x"][:n], self.arrays["y"][:n]
+        lefts = (numpy.sign(x) * numpy.floor(numpy.abs(x) + 0.5)).astype(numpy.int64) - radii
+        tops = (numpy.sign(y) * numpy.floor(numpy.abs(y) + 0.5)).astype(numpy.int64) - radii
+        positions = list(zip(lefts.tolist(), tops.tolist()))
+        blit_batch(surface, [sprites[ii] for ii in inverse.ravel()], positions, self.blit_flag)
+        if debug:
+            diameters = (2 * radii).tolist()
+            for (left, top), diameter in zip(positions, diameters):
+                pygame.draw.rect(
+                    surface, color=self.debug_color, rect=(left, top, diameter, diameter), width=1
+                )
+
+    @property
+    def death_condition(self) -> numpy.ndarray:
+        """
+        Boolean array which is True for the particles that should be removed.
+        """
+        return self.arrays["radius"][: self.count] <= 0
+
+    def clear(self):
+        """Remove all particles."""
+        self.count = 0
+
+    def _compact(self, alive: numpy.ndarray):
+        """
+        Move the surviving particles to the front of the buffers.
+        """
+        if alive.all():
+            return
+        keep = numpy.flatnonzero(alive)
+        n = keep.size
+        for array in self.arrays.values():
+            array[:n] = array[keep]
+        self.colors[:n] = self.colors[keep]
+        self.count = n
+
+    def _reserve(self, size: int):
+        """
+        Grow the buffers (by doubling) until they can hold `size` particles.
+        """
+        if size <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < size:
+            capacity *= 2
+        for name, array in self.arrays.items():
+            self.arrays[name] = numpy.resize(array, capacity)
+        self.colors = numpy.resize(self.colors, (capacity, 4))
+        self.capacity = capacity
+
+    @staticmethod
+    def _color_array(color) -> numpy.ndarray:
+        """
+        Convert a colour, or a sequence of colours, to an (n, 4) array of RGBA values.
+        """
+        try:
+            return numpy.array(tuple(Color(color)), dtype=numpy.uint8)
+        except (ValueError, TypeError):
+            return numpy.array([tuple(Color(c)) for c in color], dtype=numpy.uint8)
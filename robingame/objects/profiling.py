@@ -0,0 +1,138 @@
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+SectionPath = tuple[str, ...]  # e.g. ("update", "scenes", "MainMenu", "buttons", "Button")
+
+
+class Profiler:
+    """
+    Records how much wall time is spent in each part of the Entity tree.
+
+    Timings are stored per "path" of nested sections. `Game` opens the "update" and "draw"
+    sections, and every `Group` opens a section with its `name`, and one per class of its members.
+    So all the Buttons in a menu's `buttons` group end up in one section, and the timings show
+    where the frame time goes, per entity class and per group.
+
+    Timings are aggregated over a rolling window of the last `window` frames.
+
+    Profiling adds overhead, so it's off by default. Switch it on with `profiler.enabled = True`
+    (or `Game.profile = True`).
+
+    Example:
+        ```
+        profiler.enabled = True
+        game.run(ticks=600)
+        profiler.dump("profile.json")
+        ```
+    """
+
+    def __init__(self, window: int = 120, enabled: bool = False):
+        """
+        Args:
+            window: number of frames to aggregate over
+            enabled: start recording straight away?
+        """
+        self.enabled = enabled
+        self.frames: deque[dict[SectionPath, tuple[float, int]]] = deque(maxlen=window)
+        self.totals: dict[SectionPath, float] = dict()  # summed over the frames in the window
+        self.calls: dict[SectionPath, int] = dict()
+        self.current: dict[SectionPath, tuple[float, int]] = dict()  # the frame being recorded
+        self._stack: list[tuple[SectionPath, float]] = []
+
+    def start(self, name: str):
+        """Open a section, nested inside the currently open section (if any)."""
+        path = self._stack[-1][0] + (name,) if self._stack else (name,)
+        self._stack.append((path, time.perf_counter()))
+
+    def stop(self):
+        """Close the most recently opened section."""
+        path, start = self._stack.pop()
+        seconds, calls = self.current.get(path, (0.0, 0))
+        self.current[path] = (seconds + time.perf_counter() - start, calls + 1)
+
+    @contextmanager
+    def section(self, name: str):
+        """
+        Context manager version of `start()` / `stop()`. Does nothing if the profiler is disabled.
+        """
+        if not self.enabled:
+            yield
+            return
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def end_frame(self):
+        """
+        Add the timings recorded since the last call to the rolling window. `Game` calls this
+        once per iteration of the game loop.
+        """
+        if len(self.frames) == self.frames.maxlen:
+            for path, (seconds, calls) in self.frames[0].items():
+                self.totals[path] -= seconds
+                self.calls[path] -= calls
+                if not self.calls[path]:
+                    del self.totals[path], self.calls[path]
+        frame, self.current = self.current, dict()
+        self.frames.append(frame)
+        for path, (seconds, calls) in frame.items():
+            self.totals[path] = self.totals.get(path, 0.0) + seconds
+            self.calls[path] = self.calls.get(path, 0) + calls
+
+    def mean_times(self) -> dict[SectionPath, float]:
+        """Mean time per frame (in seconds) spent in each section, over the rolling window."""
+        n_frames = len(self.frames) or 1
+        return {path: seconds / n_frames for path, seconds in self.totals.items()}
+
+    def stats(self) -> list[dict]:
+        """
+        Summary of every section over the rolling window, slowest first.
+
+        Returns:
+            a list of dicts with keys:
+            - path: the section names joined by "/"
+            - mean_ms: mean time per frame
+            - max_ms: time in the slowest frame
+            - self_ms: mean time per frame not spent in nested sections
+            - calls: mean number of calls per frame
+        """
+        n_frames = len(self.frames) or 1
+        means = self.mean_times()
+        child_means = dict()
+        for path, mean in means.items():
+            if len(path) > 1:
+                child_means[path[:-1]] = child_means.get(path[:-1], 0.0) + mean
+        stats = []
+        for path, mean in means.items():
+            stats.append(
+                dict(
+                    path="/".join(path),
+                    mean_ms=1000 * mean,
+                    max_ms=1000 * max(frame.get(path, (0.0, 0))[0] for frame in self.frames),
+                    self_ms=1000 * (mean - child_means.get(path, 0.0)),
+                    calls=self.calls[path] / n_frames,
+                )
+            )
+        return sorted(stats, key=lambda stat: stat["mean_ms"], reverse=True)
+
+    def dump(self, filename: str | Path):
+        """Write `stats()` to a JSON file."""
+        with open(filename, "w") as file:
+            json.dump(dict(frames=len(self.frames), sections=self.stats()), file, indent=2)
+
+    def reset(self):
+        """Forget all the recorded timings."""
+        self.frames.clear()
+        self.totals.clear()
+        self.calls.clear()
+        self.current.clear()
+        self._stack.clear()
+
+
+# the profiler used by Game and Group
+profiler = Profiler()
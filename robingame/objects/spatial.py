@@ -0,0 +1,283 @@
+import itertools
+from collections import defaultdict
+from typing import TYPE_CHECKING, Callable, Iterable
+
+import numpy
+from pygame import Rect
+
+from robingame.objects.group import Group
+
+if TYPE_CHECKING:
+    from robingame.objects.entity import Entity
+
+CellRange = tuple[int, int, int, int]  # x0, y0, x1, y1 (inclusive)
+
+
+class SpatialHash:
+    """
+    Uniform grid broad-phase collision index.
+
+    Every entity is stored in all the grid cells that its rect overlaps. Entities which don't
+    share a cell can't be touching, so instead of testing every pair of entities (O(n²)) you only
+    need to test the candidates returned by `query()` or `candidate_pairs()` with a narrow-phase
+    function like `robingame.utils.touching`.
+
+    The index is incremental: call `move()` after an entity has moved. If it hasn't left its
+    cells, this costs almost nothing.
+
+    Pick a `cell_size` roughly the size of a typical entity.
+    """
+
+    def __init__(self, cell_size: int = 64, rect_attribute: str = "rect"):
+        """
+        Args:
+            cell_size: width and height of the grid cells (in pixels)
+            rect_attribute: name of the entity attribute that holds its Rect (e.g. "touchbox")
+        """
+        self.cell_size = cell_size
+        self.rect_attribute = rect_attribute
+        self.cells: defaultdict[tuple[int, int], set["Entity"]] = defaultdict(set)
+        self.entity_cells: dict["Entity", CellRange] = dict()
+        self._last_batch = None  # (entities, cell ranges) from the last call to move_many
+
+    def insert(self, entity: "Entity"):
+        """Add an entity to the index (or re-index it if it's already there)."""
+        self.move(entity)
+
+    def remove(self, entity: "Entity"):
+        """Remove an entity from the index. Does nothing if it isn't there."""
+        cell_range = self.entity_cells.pop(entity, None)
+        if cell_range is None:
+            return
+        self._last_batch = None
+        for cell in self._cells_in(cell_range):
+            self._discard(cell, entity)
+
+    def move(self, entity: "Entity"):
+        """
+        Update the index after an entity has moved. Only touches the grid if the entity's rect
+        now overlaps a different set of cells.
+        """
+        old_range = self.entity_cells.get(entity)
+        new_range = self._cell_range(getattr(entity, self.rect_attribute))
+        if new_range != old_range:
+            self._relocate(entity, old_range, new_range)
+
+    def move_many(self, entities: Iterable["Entity"]):
+        """
+        Same as calling `move()` for each entity, but the cell ranges are calculated in one go
+        with numpy, which is several times faster for large numbers of entities.
+        """
+        entities = list(entities)
+        if not entities:
+            return
+        rects = numpy.fromiter(
+            itertools.chain.from_iterable(getattr(e, self.rect_attribute) for e in entities),
+            dtype=numpy.int64,
+            count=4 * len(entities),
+        ).reshape(-1, 4)
+        left, top, width, height = rects.T
+        size = self.cell_size
+        ranges = numpy.stack(
+            (
+                left // size,
+                top // size,
+                (left + numpy.maximum(width, 1) - 1) // size,
+                (top + numpy.maximum(height, 1) - 1) // size,
+            ),
+            axis=1,
+        )
+        changed = range(len(entities))
+        if self._last_batch is not None:
+            last_entities, last_ranges = self._last_batch
+            if last_entities == entities:  # same entities in the same order: the usual case
+                changed = numpy.flatnonzero((ranges != last_ranges).any(axis=1)).tolist()
+        for ii in changed:
+            entity = entities[ii]
+            new_range = tuple(ranges[ii].tolist())
+            old_range = self.entity_cells.get(entity)
+            if new_range != old_range:
+                self._relocate(entity, old_range, new_range)
+        self._last_batch = (entities, ranges)
+
+    def query(self, rect: Rect) -> set["Entity"]:
+        """
+        Get the entities that share a cell with `rect`. These are candidates; they don't
+        necessarily overlap `rect`.
+        """
+        candidates = set()
+        for cell in self._cells_in(self._cell_range(rect)):
+            entities = self.cells.get(cell)
+            if entities:
+                candidates |= entities
+        return candidates
+
+    def candidate_pairs(self) -> set[tuple["Entity", "Entity"]]:
+        """
+        Get all the pairs of entities that share at least one cell. Each pair appears once.
+        """
+        pairs = set()
+        add = pairs.add
+        for entities in self.cells.values():
+            if len(entities) == 2:  # by far the most common case, so skip itertools
+                a, b = entities
+                add((a, b) if id(a) < id(b) else (b, a))
+            elif len(entities) > 2:
+                for a, b in itertools.combinations(entities, 2):
+                    add((a, b) if id(a) < id(b) else (b, a))
+        return pairs
+
+    def clear(self):
+        """Remove all entities."""
+        self.cells.clear()
+        self.entity_cells.clear()
+        self._last_batch = None
+
+    def _cell_range(self, rect: Rect) -> CellRange:
+        size = self.cell_size
+        left, top, width, height = rect
+        # right/bottom edges are exclusive, but a zero-size rect still occupies one cell
+        right = left + width - 1 if width > 0 else left
+        bottom = top + height - 1 if height > 0 else top
+        return left // size, top // size, right // size, bottom // size
+
+    def _relocate(self, entity: "Entity", old_range: CellRange | None, new_range: CellRange):
+        self._last_batch = None
+        cells = self.cells
+        x0, y0, x1, y1 = new_range
+        if old_range is None:
+            old_range = (0, 0, -1, -1)  # empty
+        else:
+            # small moves usually keep some of the cells; leave those alone
+            for cell in self._cells_in(old_range):
+                x, y = cell
+                if not (x0 <= x <= x1 and y0 <= y <= y1):
+                    self._discard(cell, entity)
+        ox0, oy0, ox1, oy1 = old_range
+        for cell in self._cells_in(new_range):
+            x, y = cell
+            if not (ox0 <= x <= ox1 and oy0 <= y <= oy1):
+                cells[cell].add(entity)
+        self.entity_cells[entity] = new_range
+
+    @staticmethod
+    def _cells_in(cell_range: CellRange) -> list[tuple[int, int]]:
+        x0, y0, x1, y1 = cell_range
+        return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+    def _discard(self, cell: tuple[int, int], entity: "Entity"):
+        entities = self.cells[cell]
+        entities.discard(entity)
+        if not entities:
+            del self.cells[cell]  # don't let empty cells pile up as entities move around
+
+    def __contains__(self, entity: "Entity") -> bool:
+        return entity in self.entity_cells
+
+    def __len__(self) -> int:
+        return len(self.entity_cells)
+
+
+def rects_collide(entity1: "Entity", entity2: "Entity") -> bool:
+    """Default narrow-phase test: do the entities' rects overlap?"""
+    return entity1.rect.colliderect(entity2.rect)
+
+
+class SpatialGroup(Group):
+    """
+    Group that keeps a `SpatialHash` of its members up to date. Entities are indexed when they
+    are added, removed when they leave the group (e.g. when they are killed), and re-indexed
+    after every `update()`.
+
+    Members must have a `.rect` (or whatever `rect_attribute` is set to).
+
+    Example:
+        ```
+        walls = SpatialGroup()
+        ...
+        for wall in walls.collide(player, narrow=touching):
+            un_overlap(player, wall)
+        ```
+    """
+
+    cell_size: int = 64
+    rect_attribute: str = "rect"
+
+    def __init__(
+        self,
+        *entities: "Entity",
+        cell_size: int = None,
+        rect_attribute: str = None,
+        name: str = None,
+    ):
+        """
+        Args:
+            entities: initial members
+            cell_size: see `SpatialHash`
+            rect_attribute: see `SpatialHash`
+            name: see `Group`
+        """
+        self.index = SpatialHash(
+            cell_size=cell_size or self.cell_size,
+            rect_attribute=rect_attribute or self.rect_attribute,
+        )
+        super().__init__(*entities, name=name)
+
+    def add_internal(self, entity: "Entity", layer=None):
+        super().add_internal(entity, layer)
+        self.index.insert(entity)
+
+    def remove_internal(self, entity: "Entity"):
+        super().remove_internal(entity)
+        self.index.remove(entity)
+
+    def update(self, *args):
+        """
+        Call `.update()` on all member Entities, then re-index the ones that moved.
+        """
+        super().update(*args)
+        self.reindex()
+
+    def reindex(self, entities: Iterable["Entity"] = None):
+        """
+        Update the index for entities that may have moved (default = all members). Call this if
+        you move entities outside of `update()`.
+        """
+        self.index.move_many(self.sprites() if entities is None else entities)
+
+    def collide(
+        self,
+        entity: "Entity",
+        narrow: Callable[["Entity", "Entity"], bool] = rects_collide,
+    ) -> list["Entity"]:
+        """
+        Get the members of this group that collide with `entity`.
+
+        Args:
+            entity: the entity to test (doesn't need to be a member of this group)
+            narrow: narrow-phase test, called as `narrow(entity, member)`, e.g. `touching`
+
+        Returns:
+            the colliding members (not including `entity` itself)
+        """
+        rect = getattr(entity, self.index.rect_attribute)
+        return [
+            member
+            for member in self.index.query(rect)
+            if member is not entity and narrow(entity, member)
+        ]
+
+    def collisions(
+        self,
+        narrow: Callable[["Entity", "Entity"], bool] = rects_collide,
+    ) -> list[tuple["Entity", "Entity"]]:
+        """
+        Get all pairs of members that collide with each other.
+
+        Args:
+            narrow: narrow-phase test, called as `narrow(a, b)` for each candidate pair
+
+        Returns:
+            list of colliding pairs
+        """
+        return [(a, b) for a, b in self.index.candidate_pairs() if narrow(a, b)]
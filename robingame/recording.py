@@ -3,12 +3,20 @@ import functools
 import glob
 import multiprocessing
 import os
+import queue
+import struct
 import subprocess
 import sys
+import threading
 import time
+import zlib
 from collections import deque
+from contextlib import contextmanager
+from multiprocessing.shared_memory import SharedMemory
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 
+import numpy
 import pygame
 from pygame import Surface
 from robingame.objects import Game
@@ -28,63 +36,359 @@ def clean_empty_recordings_dir(output_dir: Path):
         os.remove(file)
 
 
+IMAGE_FORMATS = ("png", "bmp", "tga")
+
+
 def save_image_async(filename, img_string: bytes, size: tuple[int, int], output_dir: Path):
-    image = pygame.image.fromstring(img_string, size, "RGBA")
-    pygame.image.save(image, str(output_dir / f"{filename}.png"))
+    """Save RGBA pixels (as returned by `pygame.image.tobytes`) as `output_dir/<filename>.png`."""
+    _save_image(img_string, size, output_dir / f"{filename}.png", "png", png_compression=None)
 
 
-def save_images_async(images: list[Surface], output_dir: Path, processes: int):
-    stringified = (
-        (
-            pygame.image.tostring(image, "RGBA"),
-            image.get_size(),
-        )
-        for image in images
+def save_images_async(
+    images: Iterable[Surface],
+    output_dir: Path,
+    processes: int,
+    image_format: str = "png",
+    png_compression: int = None,
+    chunk_size: int = 1,
+) -> list[Path]:
+    """
+    Save the images as `0.png`, `1.png`, ... using a `SharedMemoryImageWriter`.
+
+    Returns:
+        the saved files, in order
+    """
+    writer = SharedMemoryImageWriter(
+        output_dir,
+        processes=processes,
+        image_format=image_format,
+        png_compression=png_compression,
+        chunk_size=chunk_size,
     )
-    with multiprocessing.Pool(processes=processes) as pool:
-        result = pool.starmap(
-            func=save_image_async,
-            iterable=(
-                (ii, string, size, output_dir) for ii, (string, size) in enumerate(stringified)
-            ),
-        )
-    return result
+    for image in images:
+        writer.capture(image)
+    writer.close()
+    return [Path(output_dir) / f"{ii}.{image_format}" for ii in range(writer.frames)]
 
 
-def create_videos(output_dir: Path, filename: str):
-    mp4_file = output_dir / f"{filename}.mp4"
-    gif_file = output_dir / f"{filename}.gif"
-    subprocess.run(
+def encode_png(pixels: bytes | memoryview, size: tuple[int, int], level: int = 1) -> bytes:
+    """
+    Encode RGBA pixels as an RGB PNG, with a configurable zlib compression level.
+
+    `pygame.image.save` always uses the default compression level, which is slow; level 1 is
+    about 4x faster for typical game frames, and the files are still ~10x smaller than BMP. The
+    alpha channel is dropped, because video frames are opaque.
+
+    Args:
+        pixels: RGBA bytes, row by row
+        size: (width, height) of the image
+        level: zlib compression level (0 = none, 1 = fastest, 9 = smallest)
+    """
+    width, height = size
+    rgb = numpy.frombuffer(pixels, dtype=numpy.uint8).reshape(height, width, 4)[:, :, :3]
+    scanlines = numpy.zeros((height, 1 + width * 3), dtype=numpy.uint8)  # filter byte 0 = none
+    scanlines[:, 1:] = rgb.reshape(height, width * 3)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)  # 8 bit RGB
+    return b"".join(
         [
-            "ffmpeg",
-            "-r",
-            "60",
-            "-i",
-            str(output_dir / "%d.png"),
-            "-r",
-            "60",
-            str(mp4_file),
-        ],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.STDOUT,
+            b"\x89PNG\r\n\x1a\n",
+            _png_chunk(b"IHDR", header),
+            _png_chunk(b"IDAT", zlib.compress(scanlines.tobytes(), level)),
+            _png_chunk(b"IEND", b""),
+        ]
     )
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def encode_tga(pixels: bytes | memoryview, size: tuple[int, int]) -> bytes:
+    """
+    Encode RGBA pixels as an uncompressed 24 bit TGA. This is little more than a copy, so it's
+    the fastest format to write, but also the biggest.
+
+    (`pygame.image.save` can write TGAs too, but it RLE compresses them, and it never releases
+    surfaces created with `pygame.image.frombuffer`.)
+    """
+    width, height = size
+    rgb = numpy.frombuffer(pixels, dtype=numpy.uint8).reshape(height, width, 4)[:, :, 2::-1]
+    # uncompressed true colour, 24 bits per pixel, rows stored top to bottom
+    header = struct.pack("<BBBHHBHHHHBB", 0, 0, 2, 0, 0, 0, 0, 0, width, height, 24, 0x20)
+    return header + rgb.tobytes()
+
+
+def _image_worker(
+    shm_name: str,
+    size: tuple[int, int],
+    output_dir: Path,
+    jobs: multiprocessing.Queue,
+    free_slots: multiprocessing.Queue,
+    image_format: str,
+    png_compression: int | None,
+):
+    """Save the frames in the shared memory slots listed in `jobs` as image files."""
+    # attach by name rather than using the writer's SharedMemory object: a forked worker would
+    # inherit the writer's views of that buffer, and then it could never be closed
+    shm = SharedMemory(name=shm_name)
+    slot_bytes = size[0] * size[1] * 4
+    while (chunk := jobs.get()) is not None:
+        for index, slot in chunk:
+            view = shm.buf[slot * slot_bytes : (slot + 1) * slot_bytes]
+            filename = output_dir / f"{index}.{image_format}"
+            _save_image(view, size, filename, image_format, png_compression)
+            view.release()
+            free_slots.put(slot)
+    shm.close()
+
+
+def _save_image(
+    pixels: bytes | memoryview,
+    size: tuple[int, int],
+    filename: Path,
+    image_format: str,
+    png_compression: int | None,
+):
+    if image_format == "png" and png_compression is not None:
+        filename.write_bytes(encode_png(pixels, size, level=png_compression))
+    elif image_format == "tga":
+        filename.write_bytes(encode_tga(pixels, size))
+    else:
+        image = pygame.image.frombuffer(pixels, size, "RGBA")  # no copy
+        pygame.image.save(image, str(filename))
+        del image  # the surface has to let go of the buffer before it can be released
+
+
+class SharedMemoryImageWriter:
+    """
+    Saves frames as numbered images (`0.png`, `1.png`, ...) using a pool of worker processes.
+
+    Frames are copied (with a single blit) into the slots of a ring buffer in shared memory, and
+    the workers encode them straight from there, so the pixels are never pickled or copied
+    between processes. If the workers fall behind and all the slots are full, `capture()` blocks
+    until one is free (backpressure), so memory use is bounded by `n_slots` frames.
+
+    The format is a tradeoff between CPU time and disk space: BMP and (uncompressed) TGA are
+    several times faster to write than PNG, but much bigger. PNG with `png_compression=1` is in
+    between.
+
+    Example:
+        ```
+        writer = SharedMemoryImageWriter(output_dir, processes=4, image_format="tga")
+        for frame in frames:
+            writer.capture(frame)
+        writer.close()
+        ```
+    """
+
+    poll_interval: float = 1.0  # how often (in seconds) to check on the workers while waiting
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        n_slots: int = 8,
+        processes: int = 4,
+        image_format: str = "png",
+        png_compression: int = None,
+        chunk_size: int = 1,
+        clean: bool = False,
+    ):
+        """
+        Args:
+            output_dir: where to save the images
+            n_slots: number of frames that can be waiting to be encoded
+            processes: number of worker processes
+            image_format: one of `IMAGE_FORMATS`
+            png_compression: zlib compression level for PNGs (0-9). If None, PNGs are saved by
+                pygame with its default compression.
+            chunk_size: number of frames handed to a worker at a time. Bigger chunks mean less
+                inter-process communication per frame.
+            clean: delete the old files in `output_dir` when the first frame arrives
+        """
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format: {image_format}")
+        self.output_dir = Path(output_dir)
+        self.n_slots = n_slots
+        self.processes = processes
+        self.image_format = image_format
+        self.png_compression = png_compression
+        self.chunk_size = chunk_size
+        self.clean = clean
+        self.size: tuple[int, int] | None = None
+        self.frames = 0
+        self.shm: SharedMemory | None = None
+        self.slots: list[Surface] = []  # views of the shared memory
+        self.jobs = multiprocessing.Queue()
+        self.free_slots = multiprocessing.Queue()
+        self.workers: list[multiprocessing.Process] = []
+        self._chunk: list[tuple[int, int]] = []
+
+    def capture(self, surface: Surface):
+        """Queue a frame to be saved."""
+        slot = self._get_slot(surface.get_size())
+        # the slot still holds an old frame, and blitting alpha-blends onto it. Blitting onto
+        # transparent pixels copies the source exactly.
+        self.slots[slot].fill((0, 0, 0, 0))
+        self.slots[slot].blit(surface, (0, 0))
+        self._submit(slot)
+
+    def write(self, pixels: bytes, size: tuple[int, int]):
+        """Queue raw RGBA pixels to be saved."""
+        slot = self._get_slot(size)
+        slot_bytes = len(pixels)
+        self.shm.buf[slot * slot_bytes : (slot + 1) * slot_bytes] = pixels
+        self._submit(slot)
+
+    def close(self):
+        """Wait for the workers to save all the queued frames, and free the shared memory."""
+        if self.shm is None:
+            return
+        self._flush()
+        for _ in self.workers:
+            self.jobs.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.slots.clear()
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+    def _get_slot(self, size: tuple[int, int]) -> int:
+        if self.shm is None:
+            self._start(size)
+        elif size != self.size:
+            raise ValueError(f"Frame size {size} doesn't match the first frame's size {self.size}")
+        try:
+            return self.free_slots.get_nowait()
+        except queue.Empty:
+            # all the slots are taken; make sure the half-filled chunk gets encoded, or we'd be
+            # waiting for ourselves
+            self._flush()
+        while True:
+            try:
+                return self.free_slots.get(timeout=self.poll_interval)  # the workers are behind
+            except queue.Empty:
+                # if a worker has died, the slots it was holding will never be freed
+                dead = [worker for worker in self.workers if not worker.is_alive()]
+                if dead:
+                    raise RuntimeError(
+                        f"Image worker process died (exit code {dead[0].exitcode}); "
+                        f"frames can't be saved"
+                    )
+
+    def _submit(self, slot: int):
+        self._chunk.append((self.frames, slot))
+        self.frames += 1
+        if len(self._chunk) >= self.chunk_size:
+            self._flush()
+
+    def _flush(self):
+        if self._chunk:
+            self.jobs.put(self._chunk)
+            self._chunk = []
+
+    def _start(self, size: tuple[int, int]):
+        self.size = size
+        slot_bytes = size[0] * size[1] * 4
+        self.shm = SharedMemory(create=True, size=slot_bytes * self.n_slots)
+        self.slots = [
+            pygame.image.frombuffer(
+                self.shm.buf[slot * slot_bytes : (slot + 1) * slot_bytes], size, "RGBA"
+            )
+            for slot in range(self.n_slots)
+        ]
+        for slot in range(self.n_slots):
+            self.free_slots.put(slot)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.clean:
+            clean_empty_recordings_dir(self.output_dir)
+        args = (self.shm.name, size, self.output_dir, self.jobs, self.free_slots)
+        self.workers = [
+            multiprocessing.Process(
+                target=_image_worker,
+                args=args + (self.image_format, self.png_compression),
+                daemon=True,
+            )
+            for _ in range(self.processes)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+
+@contextmanager
+def timed(stage: str, timings: dict[str, float]):
+    """Add the time spent inside the context manager to `timings[stage]` (in seconds)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+def print_timings(timings: dict[str, float]):
+    """Print how long each stage of an export took, so that pipelines can be compared."""
+    total = sum(timings.values())
+    for stage, seconds in timings.items():
+        print(f"{stage:>12}: {seconds:8.3f}s")
+    print(f"{'total':>12}: {total:8.3f}s")
+
+
+# credit: https://superuser.com/questions/1049606/reduce-generated-gif-size-using-ffmpeg
+GIF_FILTER = (
+    "fps=30,"
+    "scale=1080:-1:flags=lanczos,"
+    "split[s0][s1];[s0]"
+    "palettegen=max_colors=32[p];[s1][p]"
+    "paletteuse=dither=bayer"
+)
+
+
+def create_videos(
+    output_dir: Path, filename: str, image_format: str = "png", timings: dict[str, float] = None
+):
+    """
+    Stitch the numbered images in `output_dir` into an mp4 and a gif.
+
+    Args:
+        output_dir: where the images are, and where the videos will be saved
+        filename: name of the video files (without suffix)
+        image_format: file extension of the images
+        timings: if given, the time taken by each video is added to this dict
+    """
+    timings = dict() if timings is None else timings
+    mp4_file = output_dir / f"{filename}.mp4"
+    gif_file = output_dir / f"{filename}.gif"
+    with timed("mp4", timings):
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-r",
+                "60",
+                "-i",
+                str(output_dir / f"%d.{image_format}"),
+                "-r",
+                "60",
+                str(mp4_file),
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.STDOUT,
+        )
     print(f"Created {mp4_file}")
+    with timed("gif", timings):
+        create_gif(input_file=output_dir / f"%d.{image_format}", gif_file=gif_file)
+
+
+def create_gif(input_file: Path, gif_file: Path):
     subprocess.run(
         [
             "ffmpeg",
+            "-y",
             "-r",
             "60",
             "-i",
-            str(output_dir / "%d.png"),
+            str(input_file),
             "-filter_complex",
-            # credit: https://superuser.com/questions/1049606/reduce-generated-gif-size-using-ffmpeg
-            (
-                "fps=30,"
-                "scale=1080:-1:flags=lanczos,"
-                "split[s0][s1];[s0]"
-                "palettegen=max_colors=32[p];[s1][p]"
-                "paletteuse=dither=bayer"
-            ),
+            GIF_FILTER,
             str(gif_file),
         ],
         stdout=subprocess.DEVNULL,
@@ -93,37 +397,317 @@ def create_videos(output_dir: Path, filename: str):
     print(f"Created {gif_file}")
 
 
+class FfmpegStream:
+    """
+    Encodes frames into a video while the game is running, by piping raw RGBA pixels to an
+    ffmpeg subprocess. The pixels are written by a background thread, so the game loop only pays
+    for copying the frame. At most `max_queue` frames are waiting at any time; if ffmpeg can't
+    keep up, `capture()` blocks until there is room (so memory use stays bounded).
+
+    Example:
+        ```
+        stream = FfmpegStream("out.mp4", fps=60)
+        for frame in frames:
+            stream.capture(frame)
+        stream.close()
+        ```
+    """
+
+    def __init__(self, filename: str | Path, fps: int = 60, max_queue: int = 30):
+        """
+        Args:
+            filename: output video file; the container/codec is chosen by ffmpeg from the suffix
+            fps: framerate of the video
+            max_queue: maximum number of frames waiting to be written
+        """
+        self.filename = Path(filename)
+        self.fps = fps
+        self.queue: queue.Queue[bytes | None] = queue.Queue(maxsize=max_queue)
+        self.process: subprocess.Popen | None = None
+        self.thread: threading.Thread | None = None
+        self.size: tuple[int, int] | None = None
+        self.frames = 0
+
+    def command(self, size: tuple[int, int]) -> list[str]:
+        """The ffmpeg command line, reading raw frames of `size` from stdin."""
+        width, height = size
+        return [
+            "ffmpeg",
+            "-y",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgba",
+            "-s",
+            f"{width}x{height}",
+            "-r",
+            str(self.fps),
+            "-i",
+            "-",
+            "-pix_fmt",
+            "yuv420p",
+            str(self.filename),
+        ]
+
+    def capture(self, surface: Surface):
+        """Queue a copy of the surface's pixels for encoding."""
+        self.write(pygame.image.tobytes(surface, "RGBA"), surface.get_size())
+
+    def write(self, pixels: bytes, size: tuple[int, int]):
+        """
+        Queue raw RGBA pixels for encoding. The size of the video is fixed by the first frame.
+        """
+        if self.process is None:
+            self._start(size)
+        elif size != self.size:
+            raise ValueError(f"Frame size {size} doesn't match video size {self.size}")
+        self.queue.put(pixels)
+        self.frames += 1
+
+    def close(self):
+        """Wait for all the queued frames to be written, and for ffmpeg to finish."""
+        if self.process is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.process.stdin.close()
+        self.process.wait()
+        self.process = None
+
+    def _start(self, size: tuple[int, int]):
+        self.size = size
+        self.process = subprocess.Popen(
+            self.command(size),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.thread = threading.Thread(target=self._write_frames, daemon=True)
+        self.thread.start()
+
+    def _write_frames(self):
+        while (pixels := self.queue.get()) is not None:
+            try:
+                self.process.stdin.write(pixels)
+            except BrokenPipeError:
+                logger.error(f"ffmpeg exited early; {self.filename} will be incomplete")
+                # keep draining the queue so that the game doesn't block forever
+                while self.queue.get() is not None:
+                    pass
+                return
+
+
+class RingBuffer:
+    """
+    Keeps the raw pixels of the last `n_frames` frames (like a dashcam) and only passes them on to
+    `target` when it is closed. Memory use is bounded by `n_frames`.
+    """
+
+    def __init__(self, n_frames: int, target: "FfmpegStream | SharedMemoryImageWriter"):
+        """
+        Args:
+            n_frames: number of frames to keep, e.g. `seconds * fps`
+            target: where to write the frames when the buffer is closed
+        """
+        self.frames: deque[tuple[bytes, tuple[int, int]]] = deque(maxlen=n_frames)
+        self.target = target
+
+    def capture(self, surface: Surface):
+        """Store a copy of the surface's pixels, discarding the oldest frame if the buffer is full."""
+        self.frames.append((pygame.image.tobytes(surface, "RGBA"), surface.get_size()))
+
+    def close(self):
+        """Write the buffered frames to the target and close it."""
+        while self.frames:
+            self.target.write(*self.frames.popleft())
+        self.target.close()
+
+
+class CompressedFrameStore:
+    """
+    Compact in-memory store of recorded frames. Game frames usually differ very little from the
+    previous frame, so each frame is stored as the XOR of its pixels with the previous frame's
+    (mostly zeros), compressed with zlib. Every `keyframe_interval` frames a whole frame is
+    stored instead, so that old frames can be dropped without decoding the rest.
+
+    Compressing a 1080p frame takes tens of milliseconds, which is more than a 60 fps frame
+    budget, so it happens in a background thread. `capture()` only copies the pixels and queues
+    them. At most `max_queue` frames wait to be compressed; if the thread can't keep up,
+    `capture()` blocks until there is room (so memory use stays bounded).
+
+    Frames are only decompressed when you iterate over the store.
+
+    Example:
+        ```
+        store = CompressedFrameStore(max_frames=600)
+        for frame in frames:
+            store.capture(frame)
+        for surface in store:
+            ...
+        ```
+    """
+
+    def __init__(
+        self,
+        max_frames: int = None,
+        keyframe_interval: int = 60,
+        level: int = 1,
+        max_queue: int = 30,
+    ):
+        """
+        Args:
+            max_frames: only keep the last `max_frames` frames (default = keep everything)
+            keyframe_interval: store a complete frame every this many frames
+            level: zlib compression level (1 = fastest, 9 = smallest)
+            max_queue: maximum number of frames waiting to be compressed
+        """
+        self.max_frames = max_frames
+        self.keyframe_interval = keyframe_interval
+        self.level = level
+        self.size: tuple[int, int] | None = None
+        # groups of frames, each starting with a keyframe followed by deltas
+        self.groups: deque[list[bytes]] = deque()
+        self.n_frames = 0  # total stored, including frames before max_frames that we'll skip
+        self.queue: queue.Queue[bytes] = queue.Queue(maxsize=max_queue)
+        self.thread: threading.Thread | None = None
+        self._previous: numpy.ndarray | None = None
+
+    def capture(self, surface: Surface):
+        """Queue a copy of the frame's pixels to be compressed and added."""
+        if self.size is None:
+            self.size = surface.get_size()
+            self.thread = threading.Thread(target=self._compress_frames, daemon=True)
+            self.thread.start()
+        elif surface.get_size() != self.size:
+            raise ValueError(f"Frame size {surface.get_size()} doesn't match {self.size}")
+        self.queue.put(pygame.image.tobytes(surface, "RGBA"))
+
+    def flush(self):
+        """Wait until all the captured frames have been compressed."""
+        self.queue.join()
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the compressed frames in bytes."""
+        self.flush()
+        return sum(len(frame) for group in self.groups for frame in group)
+
+    def __len__(self) -> int:
+        self.flush()
+        return min(self.n_frames, self.max_frames) if self.max_frames else self.n_frames
+
+    def __iter__(self) -> Iterator[Surface]:
+        """Decompress the frames one by one, oldest first."""
+        self.flush()
+        skip = self.n_frames - len(self)
+        for group in list(self.groups):
+            pixels = None
+            for frame in group:
+                data = numpy.frombuffer(zlib.decompress(frame), dtype=numpy.uint32)
+                pixels = data if pixels is None else pixels ^ data
+                if skip:
+                    skip -= 1
+                    continue
+                yield pygame.image.frombytes(pixels.tobytes(), self.size, "RGBA")
+
+    def _compress_frames(self):
+        while True:
+            pixels = self.queue.get()
+            try:
+                self._add(pixels)
+            finally:
+                self.queue.task_done()
+
+    def _add(self, pixels: bytes):
+        # view as uint32 so that XOR works on whole pixels
+        pixels = numpy.frombuffer(pixels, dtype=numpy.uint32)
+        if not self.groups or len(self.groups[-1]) == self.keyframe_interval:
+            self.groups.append([zlib.compress(pixels, self.level)])
+        else:
+            self.groups[-1].append(zlib.compress(pixels ^ self._previous, self.level))
+        self._previous = pixels
+        self.n_frames += 1
+
+        # drop the oldest group once we have enough frames without it
+        if self.max_frames and self.n_frames - len(self.groups[0]) >= self.max_frames:
+            self.n_frames -= len(self.groups.popleft())
+
+
 def decorate_draw(func, screenshots):
     @functools.wraps(func)
     def wrapped(self, surface: Surface, debug: bool = False):
-        # normal _draw call
         func(self, surface, debug)
+        # the frame has already been drawn onto the window; copying it is much cheaper than
+        # drawing everything again
+        screenshots.append(surface.copy())
+
+    return wrapped
+
 
-        # also do _draw onto a new screenshot surface which we store
-        screenshot = Surface(surface.get_size()).convert_alpha()
-        func(self, screenshot, debug)
-        screenshots.append(screenshot)
+def decorate_draw_stream(
+    func, sink: "FfmpegStream | SharedMemoryImageWriter | RingBuffer | CompressedFrameStore"
+):
+    @functools.wraps(func)
+    def wrapped(self, surface: Surface, debug: bool = False):
+        func(self, surface, debug)
+        sink.capture(surface)
 
     return wrapped
 
 
-def decorate_main(func, screenshots: deque, output_dir: Path, filename: str, processes: int):
+def decorate_main(
+    func,
+    screenshots: "deque | CompressedFrameStore",
+    output_dir: Path,
+    filename: str,
+    processes: int,
+    image_format: str = "png",
+    png_compression: int = None,
+    chunk_size: int = 1,
+):
+    def save():
+        timings = dict()
+        print("Deleting old images/videos...")
+        with timed("clean", timings):
+            clean_empty_recordings_dir(output_dir)
+        if image_format == "raw":
+            # skip the images entirely, and pipe the frames straight to ffmpeg
+            mp4_file = output_dir / f"{filename}.mp4"
+            print(f"Encoding {len(screenshots)} frames...")
+            with timed("mp4", timings):
+                stream = FfmpegStream(mp4_file)
+                for screenshot in screenshots:
+                    stream.capture(screenshot)
+                stream.close()
+            print(f"Created {mp4_file}")
+            with timed("gif", timings):
+                create_gif(input_file=mp4_file, gif_file=output_dir / f"{filename}.gif")
+        else:
+            print(f"Saving {len(screenshots)} images...")
+            with timed("images", timings):
+                save_images_async(
+                    screenshots,
+                    output_dir,
+                    processes=processes,
+                    image_format=image_format,
+                    png_compression=png_compression,
+                    chunk_size=chunk_size,
+                )
+            print("Creating videos...")
+            create_videos(output_dir, filename, image_format=image_format, timings=timings)
+        print_timings(timings)
+
+    return call_on_exit(func, save)
+
+
+def call_on_exit(func, on_exit: Callable[[], None]):
     @functools.wraps(func)
     def wrapped(*args, **kwargs):
-        """Run the game as normal, but intercept the quit signal and save all the screenshots to
-        file."""
+        """Run the game as normal, but intercept the quit signal and save the recording."""
         try:
             func(*args, **kwargs)
         except SystemExit:
-            print("Deleting old images/videos...")
-            clean_empty_recordings_dir(output_dir)
-            print(f"Saving {len(screenshots)} images...")
-            t1 = time.perf_counter()
-            save_images_async(screenshots, output_dir, processes=processes)
-            t2 = time.perf_counter()
-            print(f"Images saved in {t2-t1}s")
-            print("Creating videos...")
-            create_videos(output_dir, filename)
+            on_exit()
         pygame.quit()
         sys.exit()
 
@@ -133,26 +717,111 @@ def decorate_main(func, screenshots: deque, output_dir: Path, filename: str, pro
 def record(
     cls: Game = None,
     *,
-    n_frames: int,
+    n_frames: int = None,
     output_dir: Path,
     filename="out",
     processes=4,
+    stream: bool = False,
+    encoder: str = "ffmpeg",
+    fps: int = 60,
+    compress: bool = False,
+    image_format: str = "png",
+    png_compression: int = None,
+    chunk_size: int = 1,
 ):
     """
     Patch the Game's ._draw() and .main() methods so that we keep a screenshot of every frame,
-    which we later stitch into videos.
+    which we later stitch into videos. The time taken by each stage of the export is printed at
+    the end, so that the options below can be compared.
+
+    Args:
+        n_frames: only keep the last `n_frames` frames (e.g. `seconds * fps`). Required unless
+            `stream=True`.
+        output_dir: where to save the images/videos
+        filename: name of the video files (without suffix)
+        processes: number of processes used to save the images
+        stream: encode the video while the game is running, by piping the frames to ffmpeg,
+            instead of keeping every frame in memory and saving them all as images when the game
+            quits. If `n_frames` is also given, the last `n_frames` frames are kept in a ring
+            buffer of raw pixels and encoded when the game quits.
+        encoder: when streaming, either "ffmpeg" (pipe the frames to ffmpeg) or one of
+            `IMAGE_FORMATS` (save them as images in `processes` worker processes, and make the
+            videos from those on quit)
+        fps: framerate of the video (streaming only)
+        compress: keep the frames in a `CompressedFrameStore` instead of as Surfaces (not
+            streaming only). This uses a lot less memory, at the cost of some CPU time per frame
+            (spent in a background thread).
+        image_format: when not streaming, one of `IMAGE_FORMATS`, or "raw" to pipe the frames
+            straight to ffmpeg without saving any images
+        png_compression: zlib compression level for PNGs (0-9; default = pygame's default)
+        chunk_size: number of frames handed to an image worker process at a time
     """
     output_dir = output_dir or Path(__file__).parent / "recordings"
-    screenshots = deque(maxlen=n_frames)
+
+    if stream:
+        mp4_file = output_dir / f"{filename}.mp4"
+        if encoder in IMAGE_FORMATS:
+            sink = SharedMemoryImageWriter(
+                output_dir,
+                processes=processes,
+                image_format=encoder,
+                png_compression=png_compression,
+                chunk_size=chunk_size,
+                clean=True,  # on the first frame: just decorating a Game mustn't delete anything
+            )
+        elif encoder == "ffmpeg":
+            # ffmpeg needs the output directory to exist before the first frame arrives
+            output_dir.mkdir(parents=True, exist_ok=True)
+            sink = FfmpegStream(mp4_file, fps=fps)
+        else:
+            raise ValueError(f"Unknown encoder: {encoder}")
+        if n_frames:
+            sink = RingBuffer(n_frames, target=sink)
+
+        def finish():
+            timings = dict()
+            print("Finishing video...")
+            with timed("finish", timings):
+                sink.close()
+            if encoder in IMAGE_FORMATS:
+                create_videos(output_dir, filename, image_format=encoder, timings=timings)
+            else:
+                print(f"Created {mp4_file}")
+                with timed("gif", timings):
+                    create_gif(input_file=mp4_file, gif_file=output_dir / f"{filename}.gif")
+            print_timings(timings)
+
+        def decorate(cls):
+            cls._draw = decorate_draw_stream(cls._draw, sink=sink)
+            cls.main = call_on_exit(cls.main, finish)
+            return cls
+
+        return decorate(cls) if cls else decorate
+
+    if n_frames is None:
+        # every frame would be kept in memory until the game quits
+        raise ValueError("n_frames is required unless stream=True")
+    if image_format not in IMAGE_FORMATS + ("raw",):
+        raise ValueError(f"Unknown image format: {image_format}")
+    if compress:
+        screenshots = CompressedFrameStore(max_frames=n_frames)
+    else:
+        screenshots = deque(maxlen=n_frames)
 
     def decorate(cls):
-        cls._draw = decorate_draw(cls._draw, screenshots=screenshots)
+        if compress:
+            cls._draw = decorate_draw_stream(cls._draw, sink=screenshots)
+        else:
+            cls._draw = decorate_draw(cls._draw, screenshots=screenshots)
         cls.main = decorate_main(
             cls.main,
             screenshots=screenshots,
             output_dir=output_dir,
             filename=filename,
             processes=processes,
+            image_format=image_format,
+            png_compression=png_compression,
+            chunk_size=chunk_size,
         )
         return cls
 
@@ -0,0 +1,323 @@
+"""
+Deterministic input recording and replay.
+
+Instead of recording pixels, record the inputs: every batch of events read by
+`EventQueue.update()` and every tuple of input values read by `InputQueue.read_new_inputs()`,
+plus the random seed. Feeding them back into the same game reproduces the session exactly, so a
+replay file is a few kilobytes, and can be re-rendered at any resolution (or simulated headless)
+later.
+
+The game must be deterministic given its inputs: all input has to come through `EventQueue` and
+`InputQueue`s (not e.g. `pygame.mouse.get_pos()`), and all randomness from `random` or
+`numpy.random`.
+
+Replay files are zlib compressed JSON, so it's safe to open replays from other people. Only the
+event attributes with plain values (numbers, strings, booleans, None, and tuples of those) are
+recorded.
+
+Example:
+    ```
+    @record_inputs(filename="session.replay")
+    class MyGame(Game):
+        ...
+
+    MyGame().main()  # play; the inputs are saved when the game quits
+
+    # later:
+    game = replay(MyGame(), "session.replay")
+    print(game.score)
+    ```
+"""
+
+import functools
+import json
+import random
+import zlib
+from pathlib import Path
+
+import numpy
+import pygame
+from pygame.event import Event
+
+from robingame.input import EventQueue, InputQueue
+from robingame.objects import Game
+from robingame.recording import call_on_exit
+
+REPLAY_FORMAT = "robingame-replay"
+REPLAY_VERSION = 2  # version 1 files were pickles, which aren't safe to load
+
+
+class ReplayDesyncError(Exception):
+    """The game asked for different inputs than the ones that were recorded."""
+
+
+class InputRecorder:
+    """
+    Logs the inputs of a game session, in the order the game reads them.
+
+    While recording, `EventQueue.update` and `InputQueue.read_new_inputs` are patched so that
+    everything they read is also appended to `self.records`.
+    """
+
+    def __init__(self, seed: int = None):
+        """
+        Args:
+            seed: random seed to use for the session (default = pick one at random)
+        """
+        self.seed = random.randrange(2**32) if seed is None else seed
+        self.records: list[tuple] = []
+        self._queue_ids: dict[int, int] = dict()  # id(InputQueue) -> index in order of first use
+        self._last_values: dict[int, tuple] = dict()
+        self._originals = None
+
+    def start(self):
+        """Seed the random number generators and start logging inputs."""
+        seed_everything(self.seed)
+        self._originals = (EventQueue.__dict__["update"], InputQueue.read_new_inputs)
+        original_update, original_read = self._originals
+        recorder = self
+
+        @classmethod
+        def update(cls):
+            original_update.__func__(cls)
+            recorder.records.append(("events", [_encode_event(event) for event in cls.events]))
+
+        @functools.wraps(original_read)
+        def read_new_inputs(queue: InputQueue):
+            original_read(queue)
+            recorder._log_inputs(queue, queue[-1])
+
+        EventQueue.update = update
+        InputQueue.read_new_inputs = read_new_inputs
+
+    def stop(self):
+        """Stop logging inputs and restore the original methods."""
+        if self._originals:
+            EventQueue.update, InputQueue.read_new_inputs = self._originals
+            self._originals = None
+
+    def save(self, filename: str | Path):
+        """Write the recorded inputs to a (zlib compressed) JSON file."""
+        data = dict(
+            format=REPLAY_FORMAT, version=REPLAY_VERSION, seed=self.seed, records=self.records
+        )
+        Path(filename).write_bytes(zlib.compress(json.dumps(data).encode(), 9))
+
+    def _log_inputs(self, queue: InputQueue, values: tuple):
+        queue_id = self._queue_ids.setdefault(id(queue), len(self._queue_ids))
+        values = tuple(values)
+        if self._last_values.get(queue_id) == values:
+            values = None  # most of the time nothing changes, so don't store it again
+        else:
+            self._last_values[queue_id] = values
+        self.records.append(("inputs", queue_id, values))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+class InputReplayer:
+    """
+    Feeds recorded inputs back into `EventQueue` and `InputQueue`s, in the same order.
+
+    QUIT events are left out, so that the replay doesn't exit the program. Once all the records
+    have been used up, `finished` is True and no more inputs are produced.
+    """
+
+    def __init__(self, filename: str | Path):
+        """
+        Args:
+            filename: file written by `InputRecorder.save()`
+        """
+        self.seed, self.records = _load(filename)
+        self.position = 0
+        self._queue_ids: dict[int, int] = dict()
+        self._last_values: dict[int, tuple] = dict()
+        self._originals = None
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.records)
+
+    def start(self):
+        """Seed the random number generators and start replacing inputs with recorded ones."""
+        seed_everything(self.seed)
+        self._originals = (EventQueue.__dict__["update"], InputQueue.read_new_inputs)
+        replayer = self
+
+        @classmethod
+        def update(cls):
+            pygame.event.clear()  # ignore any real events (e.g. from the window)
+            (events,) = replayer._next("events")
+            cls.events = [Event(type, attributes) for type, attributes in events or []]
+            cls.events = [event for event in cls.events if event.type != pygame.QUIT]
+
+        def read_new_inputs(queue: InputQueue):
+            queue_id = replayer._queue_ids.setdefault(id(queue), len(replayer._queue_ids))
+            record = replayer._next("inputs")
+            if record is None:
+                values = queue.get_down()
+            else:
+                recorded_id, values = record
+                if recorded_id != queue_id:
+                    raise ReplayDesyncError(
+                        f"Expected inputs for queue {recorded_id} but queue {queue_id} was read"
+                    )
+                if values is None:
+                    values = replayer._last_values[queue_id]
+                replayer._last_values[queue_id] = values
+            queue.append(values)
+
+        EventQueue.update = update
+        InputQueue.read_new_inputs = read_new_inputs
+
+    def stop(self):
+        """Restore the original methods."""
+        if self._originals:
+            EventQueue.update, InputQueue.read_new_inputs = self._originals
+            self._originals = None
+
+    def _next(self, kind: str) -> tuple | None:
+        if self.finished:
+            return None
+        record = self.records[self.position]
+        if record[0] != kind:
+            raise ReplayDesyncError(
+                f"Expected {record[0]} at position {self.position}, but the game read {kind}"
+            )
+        self.position += 1
+        return record[1:]
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+def _encode_event(event: Event) -> tuple[int, dict]:
+    """The event's type and its plain attributes (which can be stored as JSON)."""
+    return event.type, {name: value for name, value in event.dict.items() if _is_plain(value)}
+
+
+def _is_plain(value) -> bool:
+    """Is `value` a number, string, boolean, None, or a tuple/list of those?"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return True
+    if isinstance(value, (tuple, list)):
+        return all(_is_plain(item) for item in value)
+    return False
+
+
+def _to_tuples(value):
+    """JSON turns tuples (e.g. `event.pos`) into lists; turn them back."""
+    if isinstance(value, list):
+        return tuple(_to_tuples(item) for item in value)
+    return value
+
+
+def _load(filename: str | Path) -> tuple[int, list[tuple]]:
+    """
+    Read and validate a file written by `InputRecorder.save()`.
+
+    Returns:
+        the seed and the records
+
+    Raises:
+        ValueError: if the file isn't a replay, or is from an unsupported version
+    """
+    try:
+        data = json.loads(zlib.decompress(Path(filename).read_bytes()))
+    except (zlib.error, UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise ValueError(f"{filename} is not a replay file") from error
+    if not isinstance(data, dict) or data.get("format") != REPLAY_FORMAT:
+        raise ValueError(f"{filename} is not a replay file")
+    if data.get("version") != REPLAY_VERSION:
+        raise ValueError(f"Unsupported replay version: {data.get('version')}")
+    seed, records = data.get("seed"), data.get("records")
+    if not isinstance(seed, int) or not isinstance(records, list):
+        raise ValueError(f"{filename} is not a valid replay file")
+    return seed, [_decode_record(record, filename) for record in records]
+
+
+def _decode_record(record, filename: str | Path) -> tuple:
+    """Check that a record from a replay file has the right shape, and restore its tuples."""
+    if isinstance(record, list) and len(record) == 2 and record[0] == "events":
+        _, events = record
+        if isinstance(events, list) and all(_is_encoded_event(event) for event in events):
+            return "events", [
+                (type, {name: _to_tuples(value) for name, value in attributes.items()})
+                for type, attributes in events
+            ]
+    if isinstance(record, list) and len(record) == 3 and record[0] == "inputs":
+        _, queue_id, values = record
+        if isinstance(queue_id, int) and (values is None or isinstance(values, list)):
+            if _is_plain(values):
+                return "inputs", queue_id, _to_tuples(values)
+    raise ValueError(f"{filename} is not a valid replay file: bad record {record!r:.100}")
+
+
+def _is_encoded_event(event) -> bool:
+    return (
+        isinstance(event, list)
+        and len(event) == 2
+        and isinstance(event[0], int)
+        and isinstance(event[1], dict)
+        and all(_is_plain(value) for value in event[1].values())
+    )
+
+
+def seed_everything(seed: int):
+    """Seed all the random number generators a game is likely to use."""
+    random.seed(seed)
+    numpy.random.seed(seed)
+
+
+def replay(game: Game, filename: str | Path) -> Game:
+    """
+    Run a game with recorded inputs until they run out. The game should be freshly created, and
+    of the same class as the one that was recorded. Use a headless game to simulate the session
+    as fast as possible, or a normal one to watch it.
+
+    Args:
+        game: the game to run
+        filename: file written by `InputRecorder.save()`
+
+    Returns:
+        the game, in the state it was in at the end of the recording
+    """
+    with InputReplayer(filename) as replayer:
+        while not replayer.finished:
+            game.run(ticks=1)
+    return game
+
+
+def record_inputs(cls: Game = None, *, filename: str | Path):
+    """
+    Patch the Game's .main() method so that its inputs are recorded, and saved to `filename`
+    when the game quits. Like `robingame.recording.record`, but for inputs instead of pixels.
+    """
+    recorder = InputRecorder()
+
+    def decorate(cls):
+        main = cls.main
+
+        @functools.wraps(main)
+        def recording_main(*args, **kwargs):
+            recorder.start()
+            main(*args, **kwargs)
+
+        def save():
+            recorder.stop()
+            recorder.save(filename)
+            print(f"Saved inputs to {filename}")
+
+        cls.main = call_on_exit(recording_main, save)
+        return cls
+
+    return decorate(cls) if cls else decorate
@@ -1,22 +1,39 @@
+from collections import OrderedDict
 from pathlib import Path
+from typing import Callable
 
+import pygame
 from pygame.color import Color
 from pygame.surface import Surface
 
-from robingame.image import load_spritesheet, scale_image, empty_image, load_image_sequence
+from robingame.image import empty_image, load_image_sequence, load_spritesheet, scale_image
 from robingame.text.exceptions import TextError
+from robingame.text.layout import TextLayout
 
 
 class Font:
     """
     Handles loading custom fonts from a spritesheet or image sequence, and rendering text onto a
     surface.
+
+    Rendering is cached at two levels:
+
+    - the glyphs are scaled (and their widths measured) once per scale factor
+    - whole laid-out strings are kept in an LRU cache keyed by `(text, scale, wrap, align)`, so
+      drawing a label that hasn't changed costs a single blit. `cache_size` limits the number of
+      strings kept; set it to 0 to disable the string cache.
+
+    For text that you draw every frame, you can also keep the result of `layout()` yourself and
+    pass it to `render()`.
     """
 
     letters: dict[str:Surface]
     image_size: tuple[int, int]
     xpad: int
     ypad: int
+    cache_size: int = 256  # max number of rendered strings to keep
+    cache_hits: int
+    cache_misses: int
 
     def __init__(
         self,
@@ -57,6 +74,7 @@ class Font:
         self.letters.update({letter: image for letter, image in zip(letters, images)})
         if space_width:
             self.letters[" "] = empty_image((space_width or width, height))
+        self.clear_cache()
 
     @classmethod
     def from_spritesheet(
@@ -161,7 +179,7 @@ class Font:
     def render(
         self,
         surf: Surface,
-        text: str,
+        text: str | TextLayout,
         x: int = 0,
         y: int = 0,
         scale: int = 1,
@@ -173,13 +191,17 @@ class Font:
 
         Args:
             surf: surface on which to render the text
-            text: the string of characters to render in this font
+            text: the string of characters to render in this font, or a `TextLayout` created by
+                `layout()` (in which case `scale`, `wrap` and `align` are ignored)
             x: x-position on the surface
             y: y-position on the surface
             scale: factor by which to scale the text (1 = no scaling)
             wrap: x width at which to wrap text
             align: -1=left, 0=center, 1=right
 
+        Returns:
+            the x position after the last character
+
         Example:
             ```
             test_font.render(
@@ -193,20 +215,46 @@ class Font:
             )
             ```
         """
+        if not isinstance(text, TextLayout):
+            text = self._get_layout(text, scale, wrap, align)
+        return text.draw(surf, x, y)
+
+    def layout(self, text: str, scale: int = 1, wrap: int = 0, align: int = None) -> TextLayout:
+        """
+        Work out the line breaks and the position of every character, without drawing anything.
+        Each character is measured once, so this is linear in the length of the text.
+
+        Args:
+            text: the string of characters to lay out
+            scale: see `render`
+            wrap: see `render`
+            align: see `render`
+
+        Returns:
+            a `TextLayout` which can be drawn repeatedly with `render` or `TextLayout.draw`
+        """
         _, ysize = self.image_size
-        cursor = x
-        for line in text.splitlines():
-            wrapped_lines = self._wrap_words(line, wrap, x, scale) if wrap else [line]
-            for line in wrapped_lines:
-                cursor = self._align_cursor(line, x, align, scale, wrap)
+        glyphs = self._glyphs_at_scale(scale)
+        not_found = glyphs[None]
+        xpad = self.xpad * scale
+        line_height = (ysize + self.ypad) * scale
+        lines = []
+        placements = []
+        cursor = y = 0
+        for paragraph in text.splitlines():
+            if wrap:
+                wrapped_lines = self._break_lines(paragraph, wrap, scale)
+            else:
+                wrapped_lines = [(paragraph, self._printed_width(paragraph, scale))]
+            for line, line_width in wrapped_lines:
+                cursor = self._align_offset(line_width, align, wrap)
+                lines.append((line, cursor, y))
                 for letter in line:
-                    image = self.get(letter)
-                    image = scale_image(image, scale)
-                    surf.blit(image, (cursor, y))
-                    w = image.get_width()
-                    cursor += w + self.xpad * scale
-                y += (ysize + self.ypad) * scale
-        return cursor
+                    image = glyphs.get(letter, not_found)
+                    placements.append((image, (cursor, y)))
+                    cursor += image.get_width() + xpad
+                y += line_height
+        return TextLayout(lines=lines, glyphs=placements, cursor=cursor)
 
     def get(self, letter: str) -> Surface:
         """
@@ -223,47 +271,160 @@ class Font:
         except KeyError:
             return self.not_found
 
-    def _align_cursor(self, line: str, x: int, align: int, scale: int, wrap: int) -> int:
+    @property
+    def cache_info(self) -> dict[str, int]:
+        """Statistics of the rendered string cache."""
+        return dict(
+            hits=self.cache_hits,
+            misses=self.cache_misses,
+            size=len(self._layouts),
+            max_size=self.cache_size,
+        )
+
+    def clear_cache(self):
         """
-        Used for left/right/centered text alignmnent
+        Throw away the scaled glyphs and rendered strings. Call this if you modify `self.letters`.
+        """
+        self._glyphs = dict()
+        self._advances = dict()
+        self._layouts = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _get_layout(self, text: str, scale: int, wrap: int, align: int) -> TextLayout:
+        """
+        Fetch the laid-out text from the cache, or lay it out if it isn't there.
+        """
+        key = (text, scale, wrap, align)
+        try:
+            layout = self._layouts[key]
+        except KeyError:
+            self.cache_misses += 1
+        else:
+            self.cache_hits += 1
+            self._layouts.move_to_end(key)
+            return layout
+
+        layout = self.layout(text, scale, wrap, align)
+        if self.cache_size > 0:
+            self._layouts[key] = layout
+            while len(self._layouts) > self.cache_size:
+                self._layouts.popitem(last=False)
+        return layout
+
+    def _glyphs_at_scale(self, scale: int) -> dict[str | None, Surface]:
+        """
+        All the letters scaled by `scale`, in premultiplied-alpha format. They are built once per
+        scale. The `None` key holds the not-found image.
+        """
+        try:
+            return self._glyphs[scale]
+        except KeyError:
+            pass
+        glyphs = {letter: image for letter, image in self.letters.items()}
+        glyphs[None] = self.not_found
+        for letter, image in glyphs.items():
+            image = scale_image(image, scale)
+            if not image.get_flags() & pygame.SRCALPHA:
+                with_alpha = Surface(image.get_size(), pygame.SRCALPHA)
+                with_alpha.blit(image, (0, 0))
+                image = with_alpha
+            glyphs[letter] = image.premul_alpha()
+        self._glyphs[scale] = glyphs
+        return glyphs
+
+    def _advance_table(self, scale: int) -> dict[str | None, int]:
+        """
+        The printed width of each letter (including `xpad`) at this scale. Built once per scale.
+        The `None` key holds the width of the not-found image.
+        """
+        try:
+            return self._advances[scale]
+        except KeyError:
+            pass
+        advances = {
+            letter: (image.get_width() + self.xpad) * scale
+            for letter, image in self.letters.items()
+        }
+        advances[None] = (self.not_found.get_width() + self.xpad) * scale
+        self._advances[scale] = advances
+        return advances
+
+    def _align_offset(self, line_width: int, align: int, wrap: int) -> int:
+        """
+        Used for left/right/centered text alignmnent. Returns the x offset of a line.
         """
         match align:
             case -1 | None:
-                cursor = x
+                return 0
             case 0:
                 if not wrap:
                     raise TextError("Can't center text without specifying a wrap width.")
-                line_width = self._printed_width(line, scale)
                 slack = wrap - line_width
-                cursor = x + slack // 2
+                return slack // 2
             case 1:
-                line_width = self._printed_width(line, scale)
-                cursor = x + wrap - line_width
+                return wrap - line_width
             case _:
                 raise TextError(f"Bad alignment value: {align}")
-        return cursor
 
-    def _wrap_words(self, text: str, wrap: int, x: int = 0, scale: int = 1) -> list[str]:
+    def _align_cursor(self, line: str, x: int, align: int, scale: int, wrap: int) -> int:
         """
-        Break one long line into multiple lines based on the wrap width.
+        Used for left/right/centered text alignmnent
+        """
+        if align in (-1, None):  # don't bother measuring the line
+            return x
+        return x + self._align_offset(self._printed_width(line, scale), align, wrap)
+
+    def _break_lines(self, text: str, wrap: int, scale: int = 1) -> list[tuple[str, int]]:
+        """
+        Break one long line into multiple lines based on the wrap width, in a single pass. Each
+        word is measured once, and the width of the line is kept as a running total.
+
+        Returns:
+            a list of (line, printed width) tuples
         """
+        advances = self._advance_table(scale)
+        not_found = advances[None]
+        space = advances.get(" ", not_found)
         lines = []
-        line = ""
+        words = []
+        line_width = 0
+        line_length = 0  # number of characters in the line so far
         for word in text.split(" "):
-            new_line = f"{line} {word}" if line else word
-            if self._printed_width(new_line, scale) <= wrap:
-                line = new_line
+            word_width = sum(advances.get(letter, not_found) for letter in word)
+            if line_length:
+                new_width = line_width + space + word_width
+            else:
+                new_width = word_width
+            if new_width <= wrap:
+                if line_length:
+                    words.append(word)
+                    line_length += 1 + len(word)
+                else:
+                    words = [word]
+                    line_length = len(word)
+                line_width = new_width
             else:
-                lines.append(line)
-                line = word
-        lines.append(line)  # last line
+                lines.append((" ".join(words), line_width))
+                words = [word]
+                line_width = word_width
+                line_length = len(word)
+        lines.append((" ".join(words), line_width))  # last line
         return lines
 
+    def _wrap_words(self, text: str, wrap: int, x: int = 0, scale: int = 1) -> list[str]:
+        """
+        Break one long line into multiple lines based on the wrap width.
+        """
+        return [line for line, _ in self._break_lines(text, wrap, scale)]
+
     def _printed_width(self, text: str, scale: int) -> int:
         """
         Calculate how wide a string of text will be when rendered.
         """
-        return sum((self.get(letter).get_width() + self.xpad) * scale for letter in text)
+        advances = self._advance_table(scale)
+        not_found = advances[None]
+        return sum(advances.get(letter, not_found) for letter in text)
 
     def _trim_images(self, images: list[Surface]) -> list[Surface]:
         """
@@ -276,3 +437,56 @@ class Font:
             new = image.subsurface((x, y, w, h))
             trimmed.append(new)
         return trimmed
+
+
+class LazyFont(Font):
+    """
+    A Font that isn't loaded until it's first used.
+
+    Loading a font from a spritesheet takes a while, so fonts that are defined at import time should
+    be LazyFonts. The first time anything that needs the font's images is accessed (e.g. `render`,
+    `layout`, `get`, `letters`), `loader` is called, and the LazyFont takes over the attributes of
+    the Font it returns. Until then it's an empty shell, but it is a Font, and attributes set on it
+    (e.g. `xpad` or `cache_size`) are kept when it's loaded.
+
+    Example:
+        ```
+        my_font = LazyFont(lambda: Font.from_spritesheet(...))  # nothing is loaded yet
+        my_font.render(surface, "Hello")  # loads the font, then renders
+        ```
+    """
+
+    def __init__(self, loader: Callable[[], Font]):
+        """
+        Args:
+            loader: function that creates the Font
+        """
+        # Font.__init__ isn't called; the attributes it sets are copied from the loaded font
+        self._loader = loader
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self) -> "LazyFont":
+        """Load the font if it hasn't been loaded yet, and return it."""
+        if not self._loaded:
+            attributes = vars(self)
+            for name, value in vars(self._loader()).items():
+                attributes.setdefault(name, value)  # attributes set on the handle take precedence
+            self._loaded = True
+        return self
+
+    def __getattr__(self, name: str):
+        # only called for attributes that haven't been set, i.e. the Font's, before it's loaded
+        if name.startswith("__") or name in ("_loader", "_loaded") or self._loaded:
+            # e.g. copy/pickle probing, an instance that hasn't been through __init__, or an
+            # attribute that the loaded font doesn't have either
+            raise AttributeError(name)
+        self.load()
+        return getattr(self, name)
+
+    def __repr__(self) -> str:
+        status = "loaded" if self.loaded else "not loaded"
+        return f"<{self.__class__.__name__} {status}>"
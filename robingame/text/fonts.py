@@ -1,116 +1,186 @@
+"""
+The fonts that come with robingame, and a registry for adding your own.
+
+Fonts are registered by name with a function that loads them, and aren't loaded until they're
+first used, so importing this module is cheap.
+
+Example:
+    ```
+    from robingame.text import fonts
+
+    fonts.register("title", lambda: Font.from_spritesheet("title.png", ...))
+    fonts.get("title").render(surface, "My Game")
+    fonts.cellphone_black.render(surface, "Hello")  # built in fonts are attributes too
+    ```
+"""
+
 import string
+from functools import partial
 from pathlib import Path
+from typing import Callable
 
-from robingame.image import init_display
-from robingame.text.font import Font
-
-window = init_display()
+from robingame.text.exceptions import TextError
+from robingame.text.font import Font, LazyFont
 
 assets = Path(__file__).parent / "assets"
 
-test_font = Font.from_spritesheet(
-    filename=assets / "test_font.png",
-    image_size=(16, 16),
-    letters=(
-        string.ascii_uppercase
-        + string.ascii_lowercase
-        + r"1234567890-=!@#$%^&*()_+[]\;',./{}|:\"<>?~`"
+registry: dict[str, LazyFont] = dict()
+
+
+def register(name: str, loader: Callable[[], Font]) -> LazyFont:
+    """
+    Register a font under `name`. The font isn't loaded until it's first used.
+
+    Args:
+        name: name to look the font up with, in `get()`
+        loader: function that creates the Font, e.g. `partial(Font.from_spritesheet, ...)`
+
+    Returns:
+        a handle that can be used just like the Font
+    """
+    registry[name] = font = LazyFont(loader)
+    return font
+
+
+def get(name: str) -> LazyFont:
+    """Look up a registered font by name."""
+    try:
+        return registry[name]
+    except KeyError:
+        raise TextError(f"No font registered with the name {name!r}")
+
+
+test_font = register(
+    "test_font",
+    partial(
+        Font.from_spritesheet,
+        filename=assets / "test_font.png",
+        image_size=(16, 16),
+        letters=(
+            string.ascii_uppercase
+            + string.ascii_lowercase
+            + r"1234567890-=!@#$%^&*()_+[]\;',./{}|:\"<>?~`"
+        ),
+        trim=True,
+        xpad=1,
+        space_width=8,
     ),
-    trim=True,
-    xpad=1,
-    space_width=8,
 )
 
-cellphone_black = Font.from_spritesheet(
-    filename=assets / "cellphone-black.png",
-    image_size=(7, 9),
-    letters=(
-        """!"#$%&'()*+,-./0123456789:;<=>?@"""
-        + string.ascii_uppercase
-        + r"[\]^_`"
-        + string.ascii_lowercase
-        + r"{|}~"
+cellphone_black = register(
+    "cellphone_black",
+    partial(
+        Font.from_spritesheet,
+        filename=assets / "cellphone-black.png",
+        image_size=(7, 9),
+        letters=(
+            """!"#$%&'()*+,-./0123456789:;<=>?@"""
+            + string.ascii_uppercase
+            + r"[\]^_`"
+            + string.ascii_lowercase
+            + r"{|}~"
+        ),
+        xpad=1,
+        colorkey=-1,
+        trim=True,
+        space_width=4,
     ),
-    xpad=1,
-    colorkey=-1,
-    trim=True,
-    space_width=4,
 )
-cellphone_white = Font.from_spritesheet(
-    filename=assets / "cellphone-white.png",
-    image_size=(7, 9),
-    letters=(
-        r"""!"#$%&'()*+,-./0123456789:;<=>?@"""
-        + string.ascii_uppercase
-        + r"[\]^_`"
-        + string.ascii_lowercase
-        + r"{|}~"
+cellphone_white = register(
+    "cellphone_white",
+    partial(
+        Font.from_spritesheet,
+        filename=assets / "cellphone-white.png",
+        image_size=(7, 9),
+        letters=(
+            r"""!"#$%&'()*+,-./0123456789:;<=>?@"""
+            + string.ascii_uppercase
+            + r"[\]^_`"
+            + string.ascii_lowercase
+            + r"{|}~"
+        ),
+        xpad=1,
+        colorkey=-1,
+        trim=True,
+        space_width=4,
     ),
-    xpad=1,
-    colorkey=-1,
-    trim=True,
-    space_width=4,
 )
-cellphone_white_mono = Font.from_spritesheet(
-    filename=assets / "cellphone-white.png",
-    image_size=(7, 9),
-    letters=(
-        r"""!"#$%&'()*+,-./0123456789:;<=>?@"""
-        + string.ascii_uppercase
-        + r"[\]^_`"
-        + string.ascii_lowercase
-        + r"{|}~"
+cellphone_white_mono = register(
+    "cellphone_white_mono",
+    partial(
+        Font.from_spritesheet,
+        filename=assets / "cellphone-white.png",
+        image_size=(7, 9),
+        letters=(
+            r"""!"#$%&'()*+,-./0123456789:;<=>?@"""
+            + string.ascii_uppercase
+            + r"[\]^_`"
+            + string.ascii_lowercase
+            + r"{|}~"
+        ),
+        colorkey=-1,
     ),
-    colorkey=-1,
 )
-chunky_retro = Font.from_spritesheet(
-    filename=assets / "chunky_retro.png",
-    image_size=(20, 20),
-    letters=(
-        r"""!"#$%&'()*+,-."""
-        r"/0123456789:;<="
-        r">?@ABCDEFGHIJKL"
-        r"MNOPQRSTUVWXYZ["
-        r"\]^_abcdefghij"
-        r"klmnopqrstuvwxy"
-        r"z{|}~çÜÉÂÄÀ ÇÊ"
-        r"ËÈÏÎÌÄ ÉÆæÔÖÒÛÙ"
+chunky_retro = register(
+    "chunky_retro",
+    partial(
+        Font.from_spritesheet,
+        filename=assets / "chunky_retro.png",
+        image_size=(20, 20),
+        letters=(
+            r"""!"#$%&'()*+,-."""
+            r"/0123456789:;<="
+            r">?@ABCDEFGHIJKL"
+            r"MNOPQRSTUVWXYZ["
+            r"\]^_abcdefghij"
+            r"klmnopqrstuvwxy"
+            r"z{|}~çÜÉÂÄÀ ÇÊ"
+            r"ËÈÏÎÌÄ ÉÆæÔÖÒÛÙ"
+        ),
+        space_width=12,
+        trim=True,
+        xpad=-1,
     ),
-    space_width=12,
-    trim=True,
-    xpad=-1,
 )
-sharp_retro = Font.from_spritesheet(
-    filename=assets / "sharp_retro.png",
-    image_size=(8, 16),
-    letters=(
-        r"""!"#$%'()*+,-./"""
-        + "0123456789:;<=>?@"
-        + string.ascii_uppercase
-        + "[\\]^_`"
-        + string.ascii_lowercase
-        + "{|}~"
+sharp_retro = register(
+    "sharp_retro",
+    partial(
+        Font.from_spritesheet,
+        filename=assets / "sharp_retro.png",
+        image_size=(8, 16),
+        letters=(
+            r"""!"#$%'()*+,-./"""
+            + "0123456789:;<=>?@"
+            + string.ascii_uppercase
+            + "[\\]^_`"
+            + string.ascii_lowercase
+            + "{|}~"
+        ),
+        trim=True,
+        xpad=1,
+        space_width=6,
     ),
-    trim=True,
-    xpad=1,
-    space_width=6,
 )
 
-tiny_white = Font.from_spritesheet(
-    filename=assets / "tiny.png",
-    image_size=(8, 12),
-    letters=(
-        string.ascii_uppercase
-        + string.ascii_lowercase
-        + "ÄËÏÖÜŸÁÉÍÓÚÝÀÈÌÒÙÂÊÎÔÛ"
-        + "äëïöüÿáéíóúýàèìòùâêîôû"
-        + "ÃÑÕãñõ"
-        + "1234567890"
-        + ".,-!?:;'"
-        + '"`&+_/#%=()[]{}*<>@^|~$'
-        + "\\"
+tiny_white = register(
+    "tiny_white",
+    partial(
+        Font.from_spritesheet,
+        filename=assets / "tiny.png",
+        image_size=(8, 12),
+        letters=(
+            string.ascii_uppercase
+            + string.ascii_lowercase
+            + "ÄËÏÖÜŸÁÉÍÓÚÝÀÈÌÒÙÂÊÎÔÛ"
+            + "äëïöüÿáéíóúýàèìòùâêîôû"
+            + "ÃÑÕãñõ"
+            + "1234567890"
+            + ".,-!?:;'"
+            + '"`&+_/#%=()[]{}*<>@^|~$'
+            + "\\"
+        ),
+        trim=True,
+        xpad=1,
+        space_width=4,
     ),
-    trim=True,
-    xpad=1,
-    space_width=4,
 )
@@ -2,13 +2,12 @@ import random
 import enum
 from collections import namedtuple
 from math import sin
-from typing import TYPE_CHECKING, Tuple, Any
+from typing import TYPE_CHECKING, Tuple, Any, Iterable
 
 import numpy
 import pygame
 from pygame.surface import Surface
 
-
 if TYPE_CHECKING:
     from robingame.objects.entity import Entity
 
@@ -57,32 +56,41 @@ def un_overlap(movable_object, immovable_object):
 # need these helper functions because pygame.mask.Mask methods aren't actually
 # implemented as they are described in the docs...
 def maskFromSurface(surface, threshold=127):
-    # return pygame.mask.from_surface(surface, threshold)
-
-    mask = pygame.mask.Mask(surface.get_size())
+    """
+    Create a Mask of the solid pixels of a surface. If the surface has a colorkey, every pixel
+    that isn't the colorkey is solid; otherwise every pixel with alpha > threshold is solid.
+    """
+    width, height = surface.get_size()
+    if not (width and height):
+        return pygame.mask.Mask((width, height))
+    alpha = pygame.surfarray.array_alpha(surface)
     key = surface.get_colorkey()
     if key:
-        for y in range(surface.get_height()):
-            for x in range(surface.get_width()):
-                if surface.get_at((x, y)) != key:
-                    mask.set_at((x, y), 1)
+        rgb = pygame.surfarray.array3d(surface)
+        solid = (rgb != key[:3]).any(axis=2) | (alpha != key[3])
     else:
-        for y in range(surface.get_height()):
-            for x in range(surface.get_width()):
-                if surface.get_at((x, y))[3] > threshold:
-                    mask.set_at((x, y), 1)
-    return mask
+        solid = alpha > threshold
+    return mask_from_array(solid)
+
+
+def mask_from_array(array: numpy.ndarray) -> pygame.mask.Mask:
+    """
+    Convert a boolean array of shape (width, height) to a Mask. This goes via the alpha channel
+    of a temporary surface, so that pygame does the per-pixel work.
+    """
+    width, height = array.shape
+    surface = Surface((width, height), pygame.SRCALPHA)
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    alpha[...] = numpy.where(array, 255, 0)
+    del alpha  # unlock the surface
+    return pygame.mask.from_surface(surface, 127)
 
 
 def mask_to_surface(mask, set_color=None):
     set_color = set_color if set_color else pygame.color.THECOLORS["magenta"]
     width, height = mask.get_size()
-    surface = pygame.Surface((width, height)).convert_alpha()
-    surface.fill((0, 0, 0, 0))
-    for y in range(height):
-        for x in range(width):
-            if mask.get_at((x, y)):
-                surface.set_at((x, y), set_color)
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    mask.to_surface(surface, setcolor=set_color, unsetcolor=None)
     return surface
 
 
@@ -102,8 +110,7 @@ def draw_arrow(surface, origin, angle_deg, color=None, length=50):
 
 def draw_rect(surface, color, rect, width=0):
     # make a surface with exactly the same dimensions as the screen
-    surface_with_alpha = pygame.Surface((surface.get_width(), surface.get_height())).convert_alpha()
-    surface_with_alpha.fill((0, 0, 0, 0))
+    surface_with_alpha = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
     # pygame.draw *does* respect alpha values when you're not plotting to screen
     pygame.draw.rect(surface_with_alpha, color, rect, width)
     # now blit the whole surface to the screen
@@ -113,6 +120,30 @@ def draw_rect(surface, color, rect, width=0):
     #  decorator for pygame's draw functions? Or a wrapper around the whole pygame.draw module?
 
 
+def merge_rects(rects: Iterable[pygame.Rect]) -> list[pygame.Rect]:
+    """
+    Merge overlapping rects into their union until none of the rects overlap. Empty rects are
+    dropped.
+
+    Args:
+        rects: the rects to merge (they are not modified)
+
+    Returns:
+        a list of non-overlapping rects that covers all the input rects
+    """
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        rect.normalize()
+        if not rect:
+            continue
+        # absorbing a rect can make this one overlap rects we've already checked, so keep going
+        while (index := rect.collidelist(merged)) != -1:
+            rect.union_ip(merged.pop(index))
+        merged.append(rect)
+    return merged
+
+
 def rotation_matrix(angle_deg):
     angle_rad = numpy.deg2rad(angle_deg)
     rotation_matrix = numpy.array(
@@ -0,0 +1,13 @@
+import pygame
+from pygame import Surface
+
+
+def assert_same_pixels(surface1: Surface, surface2: Surface):
+    assert surface1.get_size() == surface2.get_size()
+    assert pygame.image.tobytes(surface1, "RGBA") == pygame.image.tobytes(surface2, "RGBA")
+
+
+def assert_same_images(images1, images2):
+    assert len(images1) == len(images2)
+    for image1, image2 in zip(images1, images2):
+        assert_same_pixels(image1, image2)
@@ -0,0 +1,113 @@
+import pygame
+import pytest
+from pygame import Color, Rect, Surface
+
+from robingame.image import FrameAnimation, TextureAtlas
+from robingame.text import fonts
+from tests.helpers import assert_same_pixels
+
+
+def make_images(sizes: list[tuple[int, int]]) -> list[Surface]:
+    images = []
+    for ii, size in enumerate(sizes):
+        image = Surface(size, pygame.SRCALPHA)
+        image.fill(Color(ii * 5, 255 - ii * 5, 100, 200 + ii))
+        images.append(image)
+    return images
+
+
+def test_add_packs_images_into_pages_without_overlap():
+    sizes = [(10, 20), (30, 5), (25, 25), (8, 8), (40, 12), (12, 40)] * 5
+    images = make_images(sizes)
+    atlas = TextureAtlas(page_size=(64, 64))
+    views = atlas.add("things", images)
+
+    assert len(views) == len(images)
+    for image, view in zip(images, views):
+        assert_same_pixels(image, view)
+        assert view.get_parent() in atlas.pages
+    assert 1 < len(atlas.pages) < len(images)
+
+    for page in range(len(atlas.pages)):
+        rects = [Rect(x, y, w, h) for p, x, y, w, h in atlas.index["things"] if p == page]
+        for ii, rect in enumerate(rects):
+            assert atlas.pages[page].get_rect().contains(rect)
+            padded = rect.inflate(2, 2)  # 1px of padding on each side
+            assert padded.collidelist(rects[ii + 1 :]) == -1
+
+
+def test_add_keeps_packing_the_same_page():
+    atlas = TextureAtlas(page_size=(64, 64))
+    first = atlas.add("first", make_images([(10, 10)]))
+    second = atlas.add("second", make_images([(10, 10)]))
+    assert len(atlas.pages) == 1
+    assert first[0].get_parent() is second[0].get_parent()
+    with pytest.raises(ValueError):
+        atlas.add("first", make_images([(10, 10)]))
+
+
+def test_images_bigger_than_a_page_get_their_own_page():
+    atlas = TextureAtlas(page_size=(32, 32))
+    small1, big, small2 = atlas.add("mixed", make_images([(10, 10), (100, 50), (10, 10)]))
+    assert big.get_parent().get_size() == (100, 50)
+    assert small1.get_parent() is small2.get_parent()
+    assert len(atlas.pages) == 2
+
+
+def test_add_dict():
+    images = dict(zip("abc", make_images([(3, 4), (5, 6), (7, 8)])))
+    atlas = TextureAtlas()
+    views = atlas.add("letters", images)
+    assert list(views) == ["a", "b", "c"]
+    for letter in "abc":
+        assert_same_pixels(images[letter], views[letter])
+
+
+def test_add_animation():
+    animation = FrameAnimation(make_images([(16, 16)] * 4), colormap={(0, 255, 100): (1, 2, 3)})
+    originals = [frame.copy() for frame in animation]
+    atlas = TextureAtlas()
+    assert atlas.add_animation("anim", animation) is animation
+    for original, frame in zip(originals, animation):
+        assert frame.get_parent() is atlas.pages[0]
+        assert_same_pixels(original, frame)
+    assert animation.get_mask(0).count() == 16 * 16
+
+
+def test_add_font():
+    font = fonts.test_font
+    expected = Surface((200, 40))
+    font.render(expected, "Hello World", scale=2)
+    letters = dict(font.letters)
+    try:
+        TextureAtlas().add_font("test_font", font)
+        assert all(font.letters[letter].get_parent() for letter in letters if letter != " ")
+        assert font.cache_info["size"] == 0  # the cache was cleared
+        actual = Surface((200, 40))
+        font.render(actual, "Hello World", scale=2)
+        assert_same_pixels(expected, actual)
+    finally:
+        font.letters.update(letters)
+        font.clear_cache()
+
+
+def test_save_and_load(tmp_path):
+    atlas = TextureAtlas(page_size=(32, 32))
+    images = make_images([(10, 10), (20, 20), (30, 15), (5, 25)])
+    atlas.add("list", images)
+    atlas.add("dict", dict(x=images[0]))
+    atlas.save(tmp_path / "atlas.json")
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "atlas.json",
+        "atlas_0.png",
+        "atlas_1.png",
+    ]
+
+    loaded = TextureAtlas.load(tmp_path / "atlas.json")
+    assert loaded.page_size == (32, 32)
+    for image, view in zip(images, loaded.get("list")):
+        assert_same_pixels(image, view)
+    assert_same_pixels(images[0], loaded.get("dict")["x"])
+
+    loaded.add("more", make_images([(10, 10)]))  # goes on a new page
+    assert len(loaded.pages) == 3
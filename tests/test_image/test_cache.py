@@ -0,0 +1,146 @@
+import shutil
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pygame
+import pytest
+from pygame import Color, Surface
+
+from robingame.image import AssetCache, FrameAnimation
+from robingame.image.manipulation import convert_alpha
+from tests.helpers import assert_same_images
+
+mocks_folder = Path(__file__).parent.parent.absolute() / "mocks"
+SPRITESHEET = mocks_folder / "123_spritesheet.png"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AssetCache(tmp_path / "cache")
+
+
+def test_key_normalises_colors(cache):
+    key = cache.key(SPRITESHEET, colormap={"red": (0, 0, 255)}, colorkey=None)
+    assert key == cache.key(SPRITESHEET, colorkey=None, colormap={"red": Color("blue")})
+    assert key == cache.key(SPRITESHEET, colorkey=None, colormap={(255, 0, 0, 255): Color("blue")})
+    assert key != cache.key(SPRITESHEET, colorkey=None, colormap={"red": "green"})
+    assert key != cache.key(SPRITESHEET, colorkey=-1, colormap={"red": "blue"})
+
+
+def test_key_depends_on_file_contents(cache, tmp_path):
+    copy = tmp_path / "copy.png"
+    shutil.copy(SPRITESHEET, copy)
+    key = cache.key(copy, scale=2)
+    assert key == cache.key(SPRITESHEET, scale=2)  # same contents, different name
+    pygame.image.save(Surface((3, 3)), copy)
+    assert key != cache.key(copy, scale=2)
+
+
+def test_save_and_load(cache):
+    images = []
+    for size, color in [((3, 2), Color(10, 20, 30, 40)), ((1, 5), Color("red"))]:
+        image = Surface(size, pygame.SRCALPHA)
+        image.fill(color)
+        images.append(image)
+    opaque = Surface((2, 2))  # no per-pixel alpha
+    opaque.fill(Color("blue"))
+    images.append(opaque)
+
+    assert cache.load("abc") is None
+    cache.save("abc", images)
+    loaded = cache.load("abc")
+    assert [image.get_size() for image in loaded] == [(3, 2), (1, 5), (2, 2)]
+    assert loaded[0].get_at((0, 0)) == Color(10, 20, 30, 40)
+    assert loaded[1].get_at((0, 4)) == Color("red")
+    assert loaded[2].get_at((1, 1)) == Color("blue")
+
+    loaded[0].fill(Color("green"))  # copy-on-write: doesn't change the file
+    assert cache.load("abc")[0].get_at((0, 0)) == Color(10, 20, 30, 40)
+
+    cache.save("empty", [])
+    assert cache.load("empty") == []
+
+    cache.clear()
+    assert cache.load("abc") is None
+    assert not list(cache.directory.iterdir())
+
+
+def test_loaded_images_have_the_converted_pixel_format(cache):
+    image = Surface((4, 4), pygame.SRCALPHA)
+    image.fill(Color(10, 20, 30, 40))
+    cache.save("abc", [image])
+    (loaded,) = cache.load("abc")
+    assert loaded.get_masks() == convert_alpha(Surface((1, 1))).get_masks()
+    assert loaded.get_at((3, 3)) == Color(10, 20, 30, 40)
+
+    pygame.display.set_mode((10, 10))
+    try:
+        (loaded,) = cache.load("abc")
+        assert loaded.get_masks() == image.convert_alpha().get_masks()
+    finally:
+        pygame.display.quit()
+
+
+def test_concurrent_saves_of_the_same_entry(cache):
+    images = [Surface((50, 50), pygame.SRCALPHA) for _ in range(4)]
+    errors = []
+
+    def save():
+        try:
+            for _ in range(20):
+                cache.save("abc", images)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(cache.load("abc")) == 4
+
+
+def test_get(cache):
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return [Surface((2, 2), pygame.SRCALPHA)]
+
+    first = cache.get("key", factory)
+    second = cache.get("key", factory)
+    assert_same_images(first, second)
+    assert calls == [1]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_frame_animation_from_spritesheet_uses_cache(cache):
+    kwargs = dict(
+        filename=SPRITESHEET,
+        image_size=(64, 64),
+        scale=0.5,
+        flip_x=True,
+        colormap={(0, 0, 0): (255, 0, 0)},
+    )
+    uncached = FrameAnimation.from_spritesheet(**kwargs)
+    first = FrameAnimation.from_spritesheet(**kwargs, cache=cache)
+    with patch("robingame.image.loading.load_spritesheet") as load_spritesheet:
+        second = FrameAnimation.from_spritesheet(**kwargs, cache=cache, masks=True)
+    load_spritesheet.assert_not_called()
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert isinstance(second, FrameAnimation)
+    assert_same_images(uncached, first)
+    assert_same_images(uncached, second)
+    assert second.masks[0].get_size() == (32, 32)
+
+    FrameAnimation.from_spritesheet(**dict(kwargs, scale=0.25), cache=cache)
+    assert cache.misses == 2
+
+
+def test_frame_animation_disk_cache(cache, monkeypatch):
+    monkeypatch.setattr(FrameAnimation, "disk_cache", cache)
+    FrameAnimation.from_spritesheet(filename=SPRITESHEET, image_size=(64, 64))
+    FrameAnimation.from_spritesheet(filename=SPRITESHEET, image_size=(64, 64))
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -5,7 +5,6 @@ import pytest
 from pygame import Surface, Color
 from redbreast.testing import parametrize, testparams
 
-
 mocks_folder = Path(__file__).parent.parent.absolute() / "mocks"
 
 
@@ -180,3 +179,21 @@ def test_loop():
     assert animation.loop(3) == 0  # continues from the beginning
     assert animation.loop(4) == 1
     assert animation.loop(5) == 2
+
+
+def test_masks_are_cached_per_frame(original):
+    mask = original.get_mask(0)
+    assert mask.count() == 4  # no colorkey, and all pixels are opaque
+    assert original.get_mask(0) is mask
+    assert original.get_mask(-1) is mask
+    assert original.masks == [mask]
+
+    original.flip_in_place(x=True, y=False)  # replaces the frame, so the mask is recomputed
+    assert original.get_mask(0) is not mask
+
+
+def test_masks_computed_at_load_time():
+    filename = mocks_folder / "123_spritesheet.png"
+    animation = FrameAnimation.from_spritesheet(filename=filename, image_size=(64, 64), masks=True)
+    assert len(animation._masks) == 3
+    assert all(0 < mask.count() < 64 * 64 for mask in animation.masks)
@@ -0,0 +1,115 @@
+import threading
+import time
+from concurrent.futures import Future
+from unittest.mock import patch
+from pathlib import Path
+
+import pytest
+
+from robingame.image import AssetCache, AssetLoader, FrameAnimation, loading
+from tests.helpers import assert_same_images
+
+mocks_folder = Path(__file__).parent.parent.absolute() / "mocks"
+SPRITESHEET = mocks_folder / "123_spritesheet.png"
+SERIES = mocks_folder / "123_series*.png"
+
+
+@pytest.fixture(params=[False, True], ids=["threads", "processes"])
+def loader(request):
+    with AssetLoader(max_workers=2, processes=request.param) as loader:
+        yield loader
+
+
+def test_image(loader):
+    future = loader.image(SPRITESHEET)
+    assert isinstance(future, Future)
+    assert_same_images([future.result()], [loading.load_image(SPRITESHEET)])
+
+
+def test_image_sequence(loader):
+    images = loader.image_sequence(SERIES).result()
+    assert_same_images(images, loading.load_image_sequence(SERIES))
+    assert len(loader.image_sequence(SERIES, num_images=2).result()) == 2
+
+
+def test_image_sequence_not_found(loader):
+    with pytest.raises(FileNotFoundError):
+        loader.image_sequence("foo/bar*.png")
+
+
+def test_animation(loader):
+    kwargs = dict(image_size=(64, 64), scale=2, flip_x=True, colormap={(0, 0, 0): (255, 0, 0)})
+    animation = loader.animation(SPRITESHEET, masks=True, **kwargs).result()
+    assert isinstance(animation, FrameAnimation)
+    assert len(animation._masks) == len(animation)
+    assert_same_images(animation, FrameAnimation.from_spritesheet(SPRITESHEET, **kwargs))
+
+
+def test_animation_subclass_and_cache(tmp_path):
+    class Subclass(FrameAnimation):
+        pass
+
+    cache = AssetCache(tmp_path)
+    with AssetLoader() as loader:
+        animation = loader.animation(SPRITESHEET, (64, 64), cache=cache, cls=Subclass)
+        assert isinstance(animation.result(), Subclass)
+    assert cache.misses == 1
+
+
+def test_results_are_in_submission_order(loader):
+    loader.image_sequence(SERIES)
+    loader.image(SPRITESHEET)
+    loader.animation(SPRITESHEET, (64, 64))
+    sequence, image, animation = loader.results()
+    assert len(sequence) == 3
+    assert image.get_size() == (192, 64)
+    assert len(animation) == 3
+
+
+def test_errors_are_raised_by_the_future(loader):
+    future = loader.image(mocks_folder / "does_not_exist.png")
+    with pytest.raises(FileNotFoundError):
+        future.result()
+    assert loader.finished
+
+
+def test_progress():
+    release = threading.Event()
+    with AssetLoader(max_workers=1) as loader:
+        assert loader.progress == 1
+        loader._count(loader._submit(release.wait))
+        loader.image_sequence(SERIES)
+        assert loader.total == 4
+        assert loader.progress < 1
+        assert not loader.finished
+        release.set()
+        progress = list(loader.iter_progress())
+    assert progress == sorted(progress)
+    assert progress[-1] == 1
+    assert loader.finished
+
+
+def test_iter_progress_with_no_jobs():
+    assert list(AssetLoader().iter_progress()) == [1]
+
+
+def test_image_sequence_is_sorted(loader):
+    files = sorted(str(path) for path in mocks_folder.glob("123_series*.png"))
+    with patch("robingame.image.loading.glob.glob", return_value=files[::-1]):
+        assert loading.find_image_sequence(SERIES) == files
+        images = loader.image_sequence(SERIES).result()
+    assert_same_images(images, [loading.load_image(file) for file in files])
+
+
+class SlowAnimation(FrameAnimation):
+    def __init__(self, *args, **kwargs):
+        time.sleep(0.1)
+        super().__init__(*args, **kwargs)
+
+
+def test_finished_means_the_results_are_ready(loader):
+    futures = [loader.animation(SPRITESHEET, (64, 64), cls=SlowAnimation)]
+    futures.append(loader.image_sequence(SERIES))
+    while not loader.finished:
+        time.sleep(0.001)
+    assert all(future.done() for future in futures)
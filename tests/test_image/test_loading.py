@@ -102,3 +102,36 @@ def test_load_image_with_global_transparency():
     # corner pixels should be fully transparent
     for corner_pixel in [(3, 0), (0, 3)]:
         assert image.get_at(corner_pixel) == (0, 0, 0, 0)
+
+
+def test_init_display_falls_back_to_dummy_driver(monkeypatch):
+    pygame.display.quit()
+    monkeypatch.delenv("SDL_VIDEODRIVER", raising=False)
+    real_init = pygame.display.init
+    attempts = []
+
+    def init():
+        attempts.append(loading.os.environ.get("SDL_VIDEODRIVER"))
+        if len(attempts) == 1:
+            raise pygame.error("No available video device")
+        real_init()
+
+    with patch("pygame.display.init", init):
+        window = loading.init_display()
+    assert attempts == [None, "dummy"]
+    assert window.get_size() == (1, 1)
+    assert pygame.display.get_driver() == "dummy"
+
+
+@pytest.mark.parametrize("colorkey", [None, -1])
+@pytest.mark.parametrize("filename", ["123_spritesheet.png", "per_pixel_alpha.png"])
+def test_load_image_does_not_need_a_display(filename, colorkey):
+    pygame.display.quit()
+    headless = loading.load_image(mocks_folder / filename, colorkey=colorkey)
+    assert not pygame.display.get_init()  # didn't open a window
+    assert headless.get_flags() & pygame.SRCALPHA
+
+    loading.init_display()
+    with_display = loading.load_image(mocks_folder / filename, colorkey=colorkey)
+    assert pygame.image.tobytes(headless, "RGBA") == pygame.image.tobytes(with_display, "RGBA")
+    pygame.display.quit()
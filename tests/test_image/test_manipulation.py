@@ -1,5 +1,7 @@
 from pathlib import Path
 
+import numpy
+import pygame
 import pytest
 from pygame import Surface, Color
 
@@ -129,3 +131,151 @@ def test_pad_alpha_error():
     with pytest.raises(Exception) as e:
         manipulation.pad_alpha((0,))
     assert str(e.value) == "bogus colour, man"
+
+
+def recolor_image_per_pixel(surface: Surface, color_mapping: dict) -> Surface:
+    """The original implementation of recolor_image, which uses get_at/set_at on every pixel."""
+    color_mapping = {
+        manipulation.pad_alpha(k): manipulation.pad_alpha(v) for k, v in color_mapping.items()
+    }
+    new_surface = surface.copy()
+    for x in range(surface.get_width()):
+        for y in range(surface.get_height()):
+            color = surface.get_at((x, y))[:]
+            new_color = color_mapping.get(color)
+            if new_color:
+                new_surface.set_at((x, y), Color(*new_color))
+            else:
+                new_surface.set_at((x, y), Color(*color))
+    return new_surface
+
+
+PALETTE = [(0, 0, 0, 0), (255, 0, 0, 255), (0, 255, 0, 255), (0, 0, 255, 128), (10, 20, 30, 255)]
+COLORMAP = {
+    (255, 0, 0): (1, 2, 3),
+    (0, 0, 255, 128): (4, 5, 6, 7),
+    (10, 20, 30, 255): (0, 0, 0, 0),
+    (99, 99, 99): (1, 1, 1),  # not in the image
+}
+
+
+@pytest.mark.parametrize(
+    "make_surface",
+    [
+        lambda size: Surface(size, pygame.SRCALPHA),
+        lambda size: Surface(size),
+        lambda size: Surface(size, depth=24),
+        lambda size: Surface(size, depth=16),
+    ],
+)
+def test_recolor_image_matches_per_pixel_implementation(make_surface):
+    rng = numpy.random.default_rng(42)
+    surface = make_surface((13, 7))
+    for x in range(13):
+        for y in range(7):
+            surface.set_at((x, y), PALETTE[rng.integers(len(PALETTE))])
+
+    expected = recolor_image_per_pixel(surface, COLORMAP)
+    actual = manipulation.recolor_image(surface, COLORMAP)
+    for x in range(13):
+        for y in range(7):
+            assert actual.get_at((x, y)) == expected.get_at((x, y))
+
+
+def test_recolor_image_preserves_colorkey():
+    image = Surface((2, 2))
+    image.fill(Color("white"))
+    image.set_colorkey(Color("white"))
+    new_image = manipulation.recolor_image(image, color_mapping={(255, 0, 0): (0, 255, 0)})
+    assert new_image.get_colorkey() == Color("white")
+
+
+def brighten_image_per_pixel(image: Surface, amount: int) -> Surface:
+    """The original implementation of brighten_image, which uses get_at/set_at on every pixel."""
+    new_image = image.copy()
+    for x in range(image.get_width()):
+        for y in range(image.get_height()):
+            new_color = manipulation.brighten_color(image.get_at((x, y))[:], amount)
+            new_image.set_at((x, y), Color(*new_color))
+    return new_image
+
+
+@pytest.mark.parametrize("amount", [-300, -50, -1, 0, 1, 20, 128, 300])
+@pytest.mark.parametrize(
+    "make_surface",
+    [
+        lambda size: Surface(size, pygame.SRCALPHA),
+        lambda size: Surface(size),
+        lambda size: Surface(size, depth=24),
+    ],
+)
+def test_brighten_image_matches_per_pixel_implementation(amount, make_surface):
+    rng = numpy.random.default_rng(0)
+    image = make_surface((9, 5))
+    if not image.get_flags() & pygame.SRCALPHA:
+        image.set_colorkey((10, 20, 30))
+    for x in range(9):
+        for y in range(5):
+            image.set_at((x, y), PALETTE[rng.integers(len(PALETTE))])
+
+    expected = brighten_image_per_pixel(image, amount)
+    actual = manipulation.brighten_image(image, amount)
+    assert actual is not image
+    assert actual.get_colorkey() == expected.get_colorkey()
+    for x in range(9):
+        for y in range(5):
+            assert actual.get_at((x, y)) == expected.get_at((x, y))
+
+
+def test_brighten_image_in_place():
+    image = Surface((2, 2), pygame.SRCALPHA)
+    image.fill((100, 100, 100, 50))
+    result = manipulation.brighten_image(image, 20, in_place=True)
+    assert result is image
+    assert image.get_at((0, 0)) == (120, 120, 120, 50)
+
+
+def colorkeyed_surface():
+    surface = Surface((5, 3))
+    surface.fill(Color(1, 2, 3))
+    surface.set_at((1, 1), Color(9, 9, 9))
+    surface.set_colorkey(Color(9, 9, 9))
+    return surface
+
+
+def colorkeyed_alpha_surface():
+    surface = Surface((5, 3), pygame.SRCALPHA)
+    surface.fill(Color(1, 2, 3, 50))
+    surface.set_at((1, 1), Color(9, 9, 9, 200))
+    surface.set_colorkey(Color(9, 9, 9))
+    return surface
+
+
+def palette_surface():
+    surface = Surface((4, 4), depth=8)
+    surface.set_palette([(ii, ii, ii) for ii in range(256)])
+    surface.fill(7)
+    surface.set_at((0, 0), 8)
+    surface.set_colorkey(7)
+    return surface
+
+
+@pytest.mark.parametrize(
+    "make_surface",
+    [
+        lambda: Surface((5, 3)),
+        lambda: Surface((0, 3)),
+        colorkeyed_surface,
+        colorkeyed_alpha_surface,
+        palette_surface,
+    ],
+)
+def test_convert_alpha_without_display_matches_convert_alpha(make_surface):
+    pygame.display.quit()
+    headless = manipulation.convert_alpha(make_surface())
+    assert headless.get_flags() & pygame.SRCALPHA
+
+    loading.init_display()
+    expected = make_surface().convert_alpha()
+    assert pygame.image.tobytes(headless, "RGBA") == pygame.image.tobytes(expected, "RGBA")
+    pygame.display.quit()
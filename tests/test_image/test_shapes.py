@@ -0,0 +1,75 @@
+import pytest
+from pygame import Color, Surface
+
+from robingame.image import shapes
+from robingame.image.shapes import SurfaceCache
+from robingame.utils import circle_surf
+
+
+def test_circle_matches_circle_surf():
+    cache = SurfaceCache()
+    expected = circle_surf(5, Color("red"))
+    actual = shapes.circle(5, Color("red"), cache=cache)
+    assert actual.get_size() == expected.get_size()
+    assert actual.get_colorkey() == expected.get_colorkey()
+    for x in range(10):
+        for y in range(10):
+            assert actual.get_at((x, y)) == expected.get_at((x, y))
+
+
+def test_hits_and_misses():
+    cache = SurfaceCache()
+    a = shapes.circle(5, Color("red"), cache=cache)
+    b = shapes.circle(5, (255, 0, 0), cache=cache)  # same colour, different type
+    c = shapes.circle(6, Color("red"), cache=cache)
+    assert a is b
+    assert a is not c
+    assert cache.hits == 1
+    assert cache.misses == 2
+    assert len(cache) == 2
+
+
+def test_lru_eviction_respects_byte_budget():
+    one_square = SurfaceCache.surface_bytes(Surface((10, 10)))
+    cache = SurfaceCache(max_bytes=2 * one_square)
+    shapes.rect((10, 10), "red", cache=cache)
+    shapes.rect((10, 10), "green", cache=cache)
+    shapes.rect((10, 10), "red", cache=cache)  # red is now the most recently used
+    shapes.rect((10, 10), "blue", cache=cache)  # should evict green
+
+    assert cache.evictions == 1
+    assert cache.bytes == 2 * one_square
+    keys = [key[2] for key in cache.entries]
+    assert keys == [tuple(Color("red")), tuple(Color("blue"))]
+
+
+def test_surface_bigger_than_budget_is_not_stored():
+    cache = SurfaceCache(max_bytes=10)
+    surf = shapes.rect((10, 10), "red", cache=cache)
+    assert surf.get_size() == (10, 10)
+    assert len(cache) == 0
+    assert cache.bytes == 0
+
+
+def test_disabled_cache_always_calls_factory():
+    cache = SurfaceCache(enabled=False)
+    a = shapes.circle(5, "red", cache=cache)
+    b = shapes.circle(5, "red", cache=cache)
+    assert a is not b
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize("border_radius", [0, 3])
+def test_rect(border_radius):
+    surf = shapes.rect((10, 6), (0, 255, 0, 128), border_radius=border_radius)
+    assert surf.get_size() == (10, 6)
+    assert surf.get_at((5, 3)) == (0, 255, 0, 128)
+    expected_corner = (0, 0, 0, 0) if border_radius else (0, 255, 0, 128)
+    assert surf.get_at((0, 0)) == expected_corner
+
+
+def test_arrow_is_centered_on_origin():
+    surf = shapes.arrow(0, "white", length=20)
+    assert surf.get_size() == (44, 44)
+    assert surf.get_at((22, 22)) == Color("white")  # origin
+    assert surf.get_at((10, 22)) == (0, 0, 0, 0)  # pointing to the right, so nothing here
@@ -0,0 +1,237 @@
+import os
+import time
+from unittest.mock import patch
+
+import pygame
+import pytest
+from pygame import Color, Rect, Surface
+
+from robingame.objects import Entity, Game, Group
+from tests.helpers import assert_same_pixels
+
+
+class Box(Entity):
+    def __init__(self, x, y, color="red"):
+        super().__init__()
+        self.rect = Rect(x, y, 20, 20)
+        self.color = Color(color)
+
+    def draw(self, surface, debug=False):
+        surface.fill(self.color, self.rect)
+
+    def move(self, dx, dy):
+        old_rect = self.rect.copy()
+        self.rect.move_ip(dx, dy)
+        self.mark_dirty(old_rect, self.rect)
+
+
+class DirtyGame(Game):
+    dirty_rect_mode = True
+    window_width = 200
+    window_height = 200
+
+    def __init__(self):
+        super().__init__()
+        self.boxes = Group()
+        self.child_groups = [self.boxes]
+
+
+@pytest.fixture
+def game():
+    game = DirtyGame()
+    yield game
+    pygame.quit()
+
+
+def draw(game) -> list:
+    """Draw a frame and return the args passed to pygame.display.update"""
+    with patch("pygame.display.update") as update:
+        game._draw(game.window, debug=game.debug)
+    (args,) = update.call_args_list
+    return list(args.args)
+
+
+def full_redraw(game) -> Surface:
+    surface = Surface(game.window.get_size())
+    surface.fill(game.screen_color)
+    game.draw(surface)
+    return surface
+
+
+def test_dirty_rect_mode_only_updates_changed_regions(game):
+    box1, box2 = Box(10, 10), Box(100, 100, "blue")
+    game.boxes.add(box1, box2)
+    assert draw(game) == []  # first frame is a full redraw
+
+    assert draw(game) == [[]]  # nothing changed: nothing to do
+
+    box1.move(5, 0)
+    assert draw(game) == [[Rect(10, 10, 25, 20)]]
+    assert_same_pixels(game.window, full_redraw(game))
+
+    box2.kill()
+    assert draw(game) == [[Rect(100, 100, 20, 20)]]
+    assert_same_pixels(game.window, full_redraw(game))
+
+
+def test_dirty_rect_mode_redraws_overlapping_entities(game):
+    below, above = Box(10, 10), Box(20, 20, "blue")
+    game.boxes.add(below, above)
+    draw(game)
+
+    above.move(50, 50)  # uncovers part of `below`, which didn't mark itself dirty
+    draw(game)
+    assert_same_pixels(game.window, full_redraw(game))
+    assert game.window.get_at((25, 25)) == Color("red")
+
+
+def test_dirty_rect_mode_falls_back_to_full_redraw(game):
+    game.boxes.add(Box(10, 10))
+    draw(game)
+
+    game.mark_dirty(Rect(0, 0, 150, 150))  # more than half the screen
+    assert draw(game) == []
+
+    game.redraw()
+    assert draw(game) == []
+
+    game.fps_tracker.update()
+    game.debug = True
+    assert draw(game) == []
+    game.debug = False
+    assert draw(game) == []  # erase the debug stuff
+    assert draw(game) == [[]]
+
+
+def test_dirty_rect_mode_redraws_many_regions_in_one_pass(game):
+    boxes = [Box(x, y) for x in (0, 50, 100) for y in (0, 50, 100)]
+    game.boxes.add(*boxes)
+    draw(game)
+
+    game.dirty_rect_max_regions = len(boxes) - 1
+    for box in boxes:
+        box.move(1, 1)
+    with patch.object(game, "draw", wraps=game.draw) as game_draw:
+        assert draw(game) == [[Rect(0, 0, 121, 121)]]  # bounding box of the 9 regions
+    game_draw.assert_called_once()
+    assert_same_pixels(game.window, full_redraw(game))
+
+    for box in boxes[:-1]:
+        box.move(1, 1)
+    with patch.object(game, "draw", wraps=game.draw) as game_draw:
+        assert len(draw(game)[0]) == len(boxes) - 1  # few enough to draw separately
+    assert game_draw.call_count == len(boxes) - 1
+
+
+def test_dirty_rects_are_discarded_when_not_in_dirty_rect_mode(game):
+    game.dirty_rect_mode = False
+    box = Box(10, 10)
+    game.boxes.add(box)
+    box.move(5, 5)
+    assert game.boxes.dirty_rects
+    assert draw(game) == []
+    assert not game.boxes.dirty_rects
+
+
+def test_game_dirty_rects_are_discarded_when_not_in_dirty_rect_mode(game):
+    game.dirty_rect_mode = False
+    for _ in range(3):
+        game.mark_dirty(Rect(0, 0, 10, 10))
+        draw(game)
+    assert game.pop_dirty_rects() == []
+
+
+def test_entities_can_be_in_plain_pygame_groups(game):
+    box = Box(10, 10)
+    game.boxes.add(box)
+    pygame.sprite.Group(box)
+    box.move(5, 5)
+    assert Rect(15, 15, 20, 20) in game.boxes.dirty_rects
+
+
+class CountingGame(Game):
+    fps = 0  # don't sleep
+    update_hz = 4  # 0.25s steps, so the float arithmetic is exact
+    max_updates_per_frame = 3
+
+    def __init__(self):
+        super().__init__()
+        self.updates = 0
+
+    def update(self):
+        super().update()
+        self.updates += 1
+
+
+@pytest.fixture
+def counting_game():
+    game = CountingGame()
+    yield game
+    pygame.quit()
+
+
+@pytest.mark.parametrize(
+    "frame_times, expected_updates, expected_interpolation",
+    [
+        ([0], 1, 0),  # always update before the first frame
+        ([0, 0.125], 1, 0.5),  # half a step: no update yet
+        ([0, 0.125, 0.25], 2, 0),
+        ([0, 0.625], 3, 0.5),  # slow frame: catch up
+        ([0, 0.625, 0.75], 4, 0),
+        ([0, 100], 4, 0),  # really slow frame: give up catching up
+    ],
+)
+def test_fixed_update(counting_game, frame_times, expected_updates, expected_interpolation):
+    with patch("robingame.objects.game.time") as mock_time:
+        mock_time.perf_counter.side_effect = frame_times
+        for _ in frame_times:
+            counting_game._fixed_update()
+    assert counting_game.updates == expected_updates
+    assert counting_game.interpolation == pytest.approx(expected_interpolation, abs=1e-6)
+    assert CountingGame.interpolation == 1.0  # not shared between games
+    assert not hasattr(Entity, "alpha")
+
+
+class HeadlessGame(CountingGame):
+    headless = True
+    fps = 1  # should be ignored
+    update_hz = 1  # should be ignored
+
+    def draw(self, surface, debug=False):
+        super().draw(surface, debug)
+        self.draws += 1
+
+    def __init__(self):
+        super().__init__()
+        self.draws = 0
+
+
+@pytest.mark.parametrize("headless_draw, expected_draws", [(False, 0), (True, 100)])
+def test_headless_run(headless_draw, expected_draws):
+    game = type("TestGame", (HeadlessGame,), dict(headless_draw=headless_draw))()
+    assert game.window is not pygame.display.get_surface()
+    assert game.window.get_size() == (game.window_width, game.window_height)
+
+    with patch("pygame.display.update") as update:
+        t1 = time.perf_counter()
+        game.run(ticks=100)
+        t2 = time.perf_counter()
+    assert t2 - t1 < 1  # not capped at 1 fps
+    assert game.updates == 100
+    assert game.draws == expected_draws
+    update.assert_not_called()
+    pygame.quit()
+
+
+def test_headless_mode_does_not_change_the_environment(monkeypatch):
+    pygame.quit()
+    monkeypatch.delenv("SDL_VIDEODRIVER", raising=False)
+    HeadlessGame()
+    assert pygame.display.get_driver() == "dummy"
+    assert "SDL_VIDEODRIVER" not in os.environ
+
+    pygame.quit()
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")  # chosen by the user: left alone
+    HeadlessGame()
+    assert os.environ["SDL_VIDEODRIVER"] == "dummy"
+    pygame.quit()
@@ -0,0 +1,99 @@
+import csv
+from unittest.mock import patch
+
+import pygame
+import pytest
+from pygame import Color
+
+from robingame.objects import FpsTracker, Game
+
+
+def run_frames(tracker: FpsTracker, frames: list[dict[str, float]]):
+    """
+    Simulate frames with the given phase durations (in seconds), each followed by 1s of
+    untracked time.
+    """
+    clock = [0.0]
+
+    def perf_counter():
+        return clock[0]
+
+    with patch("robingame.objects.helpers.time") as mock_time:
+        mock_time.perf_counter = perf_counter
+        tracker.update()
+        for phases in frames:
+            for phase, seconds in phases.items():
+                with tracker.phase(phase):
+                    clock[0] += seconds
+            clock[0] += 1
+            tracker.update()
+
+
+def test_fps_tracker_records_phases():
+    tracker = FpsTracker()
+    run_frames(tracker, [dict(input=1, update=2), dict(draw=3, present=4), dict(update=5)])
+    assert list(tracker.frame_times) == [4, 8, 6]
+    assert list(tracker.phase_times["input"]) == [1, 0, 0]
+    assert list(tracker.phase_times["update"]) == [2, 0, 5]
+    assert list(tracker.phase_times["draw"]) == [0, 3, 0]
+    assert list(tracker.phase_times["present"]) == [0, 4, 0]
+
+
+def test_fps_tracker_stats():
+    tracker = FpsTracker()
+    run_frames(tracker, [dict(update=n / 1000) for n in range(100)])
+    stats = tracker.stats()
+    assert set(stats) == {"frame", "input", "update", "draw", "present"}
+    assert stats["update"]["p50"] == pytest.approx(49.5)
+    assert stats["update"]["p99"] == pytest.approx(98.01)
+    assert stats["update"]["worst"] == pytest.approx(99)
+    assert stats["frame"]["worst"] == pytest.approx(1099)
+    assert stats["draw"] == dict(p50=0, p95=0, p99=0, worst=0)
+
+
+def test_fps_tracker_stats_no_frames():
+    assert FpsTracker().stats()["frame"] == dict(p50=0, p95=0, p99=0, worst=0)
+
+
+def test_fps_tracker_export_csv(tmp_path):
+    tracker = FpsTracker()
+    run_frames(tracker, [dict(input=0.001, draw=0.002), dict(present=0.003)])
+    tracker.export_csv(tmp_path / "frames.csv")
+    with open(tmp_path / "frames.csv") as file:
+        rows = list(csv.reader(file))
+    assert rows == [
+        ["frame", "frame_ms", "input_ms", "update_ms", "draw_ms", "present_ms"],
+        ["0", "1003.0000", "1.0000", "0.0000", "2.0000", "0.0000"],
+        ["1", "1003.0000", "0.0000", "0.0000", "0.0000", "3.0000"],
+    ]
+
+
+def test_fps_tracker_graph():
+    tracker = FpsTracker()
+    tracker.graph_max_ms = 4000
+    run_frames(tracker, [dict(input=0.5, update=1.5)])
+    graph = tracker.draw_graph()
+    width, height = graph.get_size()
+    assert graph.get_size() == tracker.graph_size
+    x = width - 1  # newest frame is on the right
+    assert graph.get_at((x, height - 1)) == Color("purple")  # 0.5s of input
+    assert graph.get_at((x, height - 10)) == Color("dodgerblue")  # 1.5s of update
+    assert graph.get_at((x, height - 25)) == Color("grey")  # the untracked second
+    assert graph.get_at((x, 0)) == Color("white")
+    assert graph.get_at((0, height - 1)) == Color("white")  # no data for older frames
+
+
+class TimedGame(Game):
+    headless = True
+    headless_draw = True
+
+
+def test_game_times_frame_phases():
+    game = TimedGame()
+    game.run(ticks=5)
+    tracker = game.fps_tracker
+    assert len(tracker.frame_times) == 4
+    for phase in ["input", "update", "draw"]:
+        assert all(seconds > 0 for seconds in tracker.phase_times[phase])
+    assert all(seconds == 0 for seconds in tracker.phase_times["present"])  # headless
+    pygame.quit()
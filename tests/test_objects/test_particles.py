@@ -0,0 +1,117 @@
+import numpy
+import pygame
+import pytest
+from pygame import Color, Surface
+
+from robingame.objects import Particle, ParticleSystem
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(x=10, y=20),
+        dict(x=10, y=20, u=3, v=-5, gravity=0.5),
+        dict(x=10, y=20, u=3, v=-5, gravity=0.5, friction=0.1),
+        dict(x=0, y=0, u=-1, v=2, radius=5, decay=0.3, friction=0.05, gravity=0.2),
+    ],
+)
+def test_particle_system_matches_particle_physics(kwargs):
+    particle = Particle(color=Color("white"), **kwargs)
+    system = ParticleSystem()
+    system.emit(**kwargs)
+    for _ in range(10):
+        particle.update()
+        system.update()
+        if particle.death_condition:
+            assert system.count == 0
+            break
+        assert system.count == 1
+        for name in ["x", "y", "u", "v", "radius"]:
+            assert system.arrays[name][0] == pytest.approx(getattr(particle, name))
+
+
+def test_emit_broadcasts_arguments():
+    system = ParticleSystem()
+    system.emit(x=1, y=2, u=[1, 2, 3], color=Color("red"))
+    assert system.count == 3
+    assert list(system.arrays["x"][:3]) == [1, 1, 1]
+    assert list(system.arrays["u"][:3]) == [1, 2, 3]
+    assert (system.colors[:3] == (255, 0, 0, 255)).all()
+
+    system.emit(x=[0, 0], y=0, color=[Color("blue"), (0, 255, 0)])
+    assert system.count == 5
+    assert tuple(system.colors[3]) == (0, 0, 255, 255)
+    assert tuple(system.colors[4]) == (0, 255, 0, 255)
+
+
+def test_buffers_grow_beyond_initial_capacity():
+    system = ParticleSystem()
+    n = system.initial_capacity * 3 + 1
+    system.emit(x=numpy.arange(n), y=0)
+    assert system.count == n
+    assert system.capacity >= n
+    assert list(system.arrays["x"][:n]) == list(range(n))
+
+
+def test_dead_particles_are_removed_in_bulk():
+    system = ParticleSystem()
+    system.emit(x=numpy.arange(6), y=0, radius=[1, 5, 1, 5, 1, 5], decay=1)
+    system.update()
+    assert system.count == 3
+    assert list(system.arrays["x"][:3]) == [1, 3, 5]
+    assert list(system.arrays["radius"][:3]) == [4, 4, 4]
+
+
+def test_draw():
+    surface = Surface((50, 50))
+    system = ParticleSystem()
+    system.emit(x=25, y=25, radius=5, color=Color("white"))
+    system.draw(surface, debug=True)
+    assert surface.get_at((25, 25)) == Color("white")
+
+
+def test_batched_draw_matches_individual_particles():
+    kwargs = [
+        dict(x=10.7, y=12.2, radius=4.4, color=Color("red")),
+        dict(x=20, y=30.5, radius=6.5, color=Color("blue")),
+        dict(x=30.2, y=31, radius=5, color=Color("red")),
+        dict(x=31, y=33, radius=4.4, color=Color("red")),
+    ]
+    expected = Surface((50, 50))
+    for kw in kwargs:
+        Particle(**kw).draw(expected)
+
+    actual = Surface((50, 50))
+    system = ParticleSystem()
+    for kw in kwargs:
+        system.emit(**kw)
+    system.draw(actual)
+
+    for x in range(50):
+        for y in range(50):
+            assert actual.get_at((x, y)) == expected.get_at((x, y))
+
+
+class FblitsSurface(Surface):
+    """Stands in for a pygame-ce Surface, which has `fblits`."""
+
+    calls = 0
+
+    def fblits(self, blit_sequence, special_flags=0):
+        self.calls += 1
+        for sprite, position in blit_sequence:
+            self.blit(sprite, position, special_flags=special_flags)
+
+
+def test_draw_uses_fblits_where_available():
+    system = ParticleSystem()
+    system.emit(x=[10, 25, 40], y=25, radius=[3, 5, 3], color=[Color("red"), "blue", "red"])
+
+    expected = Surface((50, 50))
+    assert not hasattr(expected, "fblits")
+    system.draw(expected)
+
+    actual = FblitsSurface((50, 50))
+    system.draw(actual)
+    assert actual.calls == 1  # all the particles in one call
+    assert pygame.image.tobytes(actual, "RGB") == pygame.image.tobytes(expected, "RGB")
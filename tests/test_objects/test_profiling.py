@@ -0,0 +1,137 @@
+import json
+from unittest.mock import patch
+
+import pygame
+import pytest
+from pygame import Surface
+
+from robingame.objects import Entity, Game, Group, Profiler, profiler
+
+
+class Fast(Entity):
+    pass
+
+
+class Slow(Entity):
+    pass
+
+
+@pytest.fixture
+def enabled_profiler():
+    profiler.reset()
+    profiler.enabled = True
+    yield profiler
+    profiler.enabled = False
+    profiler.reset()
+
+
+def test_profiler_nested_sections():
+    prof = Profiler(window=2, enabled=True)
+    clock = iter([0, 1, 3, 4, 10, 11, 15, 16])
+    with patch("robingame.objects.profiling.time.perf_counter", lambda: next(clock)):
+        with prof.section("update"):  # 0 -> 4
+            with prof.section("Slow"):  # 1 -> 3
+                pass
+        prof.end_frame()
+        with prof.section("update"):  # 10 -> 16
+            with prof.section("Slow"):  # 11 -> 15
+                pass
+        prof.end_frame()
+
+    assert prof.mean_times() == {("update",): 5, ("update", "Slow"): 3}
+    stats = {stat["path"]: stat for stat in prof.stats()}
+    assert list(stats) == ["update", "update/Slow"]  # slowest first
+    assert stats["update"]["mean_ms"] == 5000
+    assert stats["update"]["max_ms"] == 6000
+    assert stats["update"]["self_ms"] == 2000
+    assert stats["update/Slow"]["calls"] == 1
+
+
+def test_profiler_rolling_window():
+    prof = Profiler(window=2, enabled=True)
+    for name in ["a", "b", "c"]:
+        prof.start(name)
+        prof.stop()
+        prof.end_frame()
+    assert set(prof.mean_times()) == {("b",), ("c",)}
+
+
+def test_disabled_profiler_records_nothing():
+    prof = Profiler()
+    with prof.section("update"):
+        pass
+    prof.end_frame()
+    assert prof.mean_times() == {}
+
+
+def test_group_profiles_members_by_class(enabled_profiler):
+    group = Group(Fast(), Fast(), Slow(), name="enemies")
+    with profiler.section("update"):
+        group.update()
+    group.draw(Surface((10, 10)))
+    profiler.end_frame()
+
+    stats = {stat["path"]: stat["calls"] for stat in profiler.stats()}
+    assert stats == {
+        "update": 1,
+        "update/enemies": 1,
+        "update/enemies/Fast": 2,
+        "update/enemies/Slow": 1,
+        "enemies": 1,
+        "enemies/Fast": 2,
+        "enemies/Slow": 1,
+    }
+
+
+class ProfiledGame(Game):
+    headless = True
+    headless_draw = True
+    profile = True
+    debug = True
+
+    def __init__(self):
+        super().__init__()
+        self.scenes = Group(Slow(), name="scenes")
+        self.child_groups = [self.scenes]
+
+
+def test_game_profiling(enabled_profiler, tmp_path):
+    game = ProfiledGame()
+    game.fps_tracker.update()
+    game.run(ticks=5)
+
+    paths = {stat["path"] for stat in profiler.stats()}
+    assert {"input", "update", "update/scenes/Slow", "draw", "draw/scenes/Slow"} <= paths
+
+    profiler.dump(tmp_path / "profile.json")
+    data = json.loads((tmp_path / "profile.json").read_text())
+    assert data["frames"] == 5
+    assert {section["path"] for section in data["sections"]} == paths
+
+    # the flame graph is drawn at the bottom of the screen
+    surface = Surface(game.window.get_size())
+    game.profiler_overlay.draw(surface, debug=True)
+    bottom_row = surface.get_height() - game.profiler_overlay.margin - 2
+    assert surface.get_at((surface.get_width() // 2, bottom_row)) != (0, 0, 0, 255)
+    pygame.quit()
+
+
+class Broken(Entity):
+    def update(self):
+        raise ValueError("oops")
+
+    def draw(self, surface, debug=False):
+        raise ValueError("oops")
+
+
+def test_exceptions_leave_the_profiler_balanced(enabled_profiler):
+    group = Group(Fast(), Broken(), name="things")
+    with pytest.raises(ValueError):
+        group.update()
+    with pytest.raises(ValueError):
+        group.draw(Surface((10, 10)))
+    assert enabled_profiler._stack == []
+
+    Group(Fast(), name="others").update()
+    enabled_profiler.end_frame()
+    assert ("others", "Fast") in enabled_profiler.mean_times()  # not nested under "things"
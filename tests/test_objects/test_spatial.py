@@ -0,0 +1,86 @@
+import itertools
+import random
+
+import pytest
+from pygame import Rect
+
+from robingame.objects import Entity, SpatialGroup, SpatialHash
+from robingame.utils import touching
+
+
+class Box(Entity):
+    def __init__(self, x, y, width=10, height=10):
+        super().__init__()
+        self.rect = Rect(x, y, width, height)
+
+    @property
+    def touchbox(self):
+        return self.rect.inflate(2, 2)
+
+
+def brute_force_collisions(entities):
+    return {
+        (a, b) if id(a) < id(b) else (b, a)
+        for a, b in itertools.combinations(entities, 2)
+        if a.rect.colliderect(b.rect)
+    }
+
+
+@pytest.mark.parametrize("cell_size", [8, 32, 100])
+def test_collisions_match_brute_force(cell_size):
+    random.seed(0)
+    group = SpatialGroup(cell_size=cell_size)
+    boxes = [
+        Box(random.randint(-200, 200), random.randint(-200, 200), *random.choices(range(30), k=2))
+        for _ in range(200)
+    ]
+    group.add(*boxes)
+    assert set(group.collisions()) == brute_force_collisions(boxes)
+
+    # move everything around for a few frames and make sure the index keeps up
+    for _ in range(3):
+        for box in boxes:
+            box.rect.move_ip(random.randint(-50, 50), random.randint(-50, 50))
+        group.update()
+        assert set(group.collisions()) == brute_force_collisions(boxes)
+
+
+def test_killed_entities_are_removed_from_index():
+    a, b = Box(0, 0), Box(5, 5)
+    group = SpatialGroup(a, b)
+    assert len(group.index) == 2
+    assert group.collisions() in ([(a, b)], [(b, a)])
+
+    b.kill()
+    assert b not in group.index
+    assert group.collisions() == []
+    assert all(b not in entities for entities in group.index.cells.values())
+
+
+def test_collide_with_narrow_phase():
+    player = Box(0, 0)
+    near = Box(10, 0)  # not overlapping, but within the touchbox
+    far = Box(100, 100)
+    walls = SpatialGroup(near, far, rect_attribute="touchbox")
+    assert walls.collide(player) == []
+    assert walls.collide(player, narrow=touching) == [near]
+
+
+def test_move_only_touches_grid_when_cells_change():
+    index = SpatialHash(cell_size=10)
+    box = Box(1, 1, 5, 5)
+    index.insert(box)
+    assert set(index.cells) == {(0, 0)}
+
+    box.rect.move_ip(2, 2)  # same cell
+    index.move(box)
+    assert set(index.cells) == {(0, 0)}
+
+    box.rect.move_ip(5, 0)  # now spans two cells
+    index.move(box)
+    assert set(index.cells) == {(0, 0), (1, 0)}
+    assert index.query(Rect(15, 0, 1, 1)) == {box}
+
+    index.remove(box)
+    assert len(index) == 0
+    assert not index.cells
@@ -0,0 +1,348 @@
+import sys
+import threading
+import zlib
+from collections import deque
+from unittest.mock import ANY, patch
+
+import pygame
+import pytest
+from pygame import Color, Surface
+
+from robingame.objects import Game
+from robingame.recording import (
+    CompressedFrameStore,
+    FfmpegStream,
+    RingBuffer,
+    SharedMemoryImageWriter,
+    decorate_draw,
+    encode_png,
+    encode_tga,
+    record,
+    save_image_async,
+    save_images_async,
+    timed,
+)
+
+
+class CatStream(FfmpegStream):
+    """Instead of running ffmpeg, copy the raw frames straight into the output file."""
+
+    def command(self, size):
+        script = "import shutil, sys; shutil.copyfileobj(sys.stdin.buffer, open(sys.argv[1], 'wb'))"
+        return [sys.executable, "-c", script, str(self.filename)]
+
+
+class ShortGame(Game):
+    """Runs for 5 frames, drawing a different colour each time."""
+
+    headless = True
+    headless_draw = True
+    window_width = 8
+    window_height = 6
+
+    def update(self):
+        super().update()
+        self.running = self.tick < 5
+
+    def draw(self, surface, debug=False):
+        surface.fill(Color(self.tick * 40, 0, 0))
+
+
+def make_frames(n, size=(4, 3)):
+    frames = []
+    for ii in range(n):
+        frame = Surface(size)
+        frame.fill(Color(ii, 2 * ii, 3 * ii))
+        frames.append(frame)
+    return frames
+
+
+def test_ffmpeg_stream_writes_raw_frames_in_order(tmp_path):
+    frames = make_frames(50)
+    stream = CatStream(tmp_path / "out.raw", max_queue=2)
+    for frame in frames:
+        stream.capture(frame)
+    stream.close()
+    assert stream.frames == 50
+    expected = b"".join(pygame.image.tobytes(frame, "RGBA") for frame in frames)
+    assert (tmp_path / "out.raw").read_bytes() == expected
+
+
+def test_ffmpeg_stream_rejects_frames_of_a_different_size(tmp_path):
+    stream = CatStream(tmp_path / "out.raw")
+    stream.capture(Surface((4, 3)))
+    with pytest.raises(ValueError):
+        stream.capture(Surface((3, 4)))
+    stream.close()
+
+
+def test_ring_buffer_keeps_last_n_frames(tmp_path):
+    frames = make_frames(10)
+    buffer = RingBuffer(3, target=CatStream(tmp_path / "out.raw"))
+    for frame in frames:
+        buffer.capture(frame)
+    assert len(buffer.frames) == 3
+    buffer.close()
+    expected = b"".join(pygame.image.tobytes(frame, "RGBA") for frame in frames[-3:])
+    assert (tmp_path / "out.raw").read_bytes() == expected
+
+
+@pytest.mark.parametrize("n_frames, expected_frames", [(None, 5), (2, 2)])
+def test_record_stream(tmp_path, n_frames, expected_frames):
+    with (
+        patch("robingame.recording.FfmpegStream", CatStream),
+        patch("robingame.recording.create_gif") as create_gif,
+    ):
+        game = record(ShortGame, n_frames=n_frames, output_dir=tmp_path, stream=True)()
+        with pytest.raises(SystemExit):
+            game.main()
+
+    frame_bytes = 8 * 6 * 4
+    assert (tmp_path / "out.mp4").stat().st_size == expected_frames * frame_bytes
+    create_gif.assert_called_once_with(
+        input_file=tmp_path / "out.mp4", gif_file=tmp_path / "out.gif"
+    )
+
+
+def test_decorate_draw_copies_the_window_instead_of_drawing_twice():
+    calls = []
+
+    def _draw(game, surface, debug=False):
+        calls.append(surface)
+        surface.fill(Color("red"))
+
+    screenshots = deque()
+    window = Surface((4, 3))
+    decorate_draw(_draw, screenshots)(None, window)
+    assert calls == [window]
+    (screenshot,) = screenshots
+    assert screenshot is not window
+    assert pygame.image.tobytes(screenshot, "RGBA") == pygame.image.tobytes(window, "RGBA")
+
+    window.fill(Color("blue"))  # next frame shouldn't affect the stored one
+    assert screenshot.get_at((0, 0)) == Color("red")
+
+
+@pytest.mark.parametrize(
+    "use_write, image_format, png_compression, chunk_size",
+    [
+        (False, "png", None, 1),
+        (True, "png", None, 1),
+        (False, "png", 1, 2),
+        (False, "bmp", None, 5),  # chunks bigger than the number of slots
+        (True, "tga", None, 3),
+    ],
+)
+def test_shared_memory_image_writer(tmp_path, use_write, image_format, png_compression, chunk_size):
+    frames = make_frames(20)
+    writer = SharedMemoryImageWriter(
+        tmp_path,
+        n_slots=3,
+        processes=2,
+        image_format=image_format,
+        png_compression=png_compression,
+        chunk_size=chunk_size,
+    )
+    for frame in frames:
+        if use_write:
+            pixels = bytearray(pygame.image.tobytes(frame, "RGBA"))
+            pixels[3::4] = b"\xff" * (len(pixels) // 4)  # opaque, like frames from the display
+            writer.write(bytes(pixels), frame.get_size())
+        else:
+            writer.capture(frame)
+    writer.close()
+    assert writer.shm is None
+    assert [worker.exitcode for worker in writer.workers] == [0, 0]  # closed their memory cleanly
+    for ii, frame in enumerate(frames):
+        saved = pygame.image.load(tmp_path / f"{ii}.{image_format}")
+        assert pygame.image.tobytes(saved, "RGB") == pygame.image.tobytes(frame, "RGB")
+
+
+def test_shared_memory_image_writer_copies_transparent_frames_exactly(tmp_path):
+    opaque = Surface((4, 3), pygame.SRCALPHA)
+    opaque.fill(Color(200, 100, 50, 255))
+    translucent = Surface((4, 3), pygame.SRCALPHA)
+    translucent.fill(Color(10, 20, 30, 128))
+    writer = SharedMemoryImageWriter(tmp_path, n_slots=1, processes=1, image_format="tga")
+    writer.capture(opaque)
+    writer.capture(translucent)  # reuses the first frame's slot
+    writer.close()
+    saved = pygame.image.load(tmp_path / "1.tga")
+    assert saved.get_at((0, 0))[:3] == (10, 20, 30)  # not mixed with the previous frame
+
+
+def test_shared_memory_image_writer_raises_if_the_workers_die(tmp_path):
+    writer = SharedMemoryImageWriter(tmp_path, n_slots=1, processes=1)
+    writer.poll_interval = 0.01
+    frames = make_frames(3)
+    writer.capture(frames[0])
+    (worker,) = writer.workers
+    worker.kill()
+    worker.join()
+    with pytest.raises(RuntimeError):
+        for frame in frames[1:]:  # the first frame's slot may or may not have been freed
+            writer.capture(frame)
+    writer.close()
+
+
+def test_shared_memory_image_writer_rejects_unknown_formats(tmp_path):
+    with pytest.raises(ValueError):
+        SharedMemoryImageWriter(tmp_path, image_format="jpg")
+
+
+@pytest.mark.parametrize("level", [0, 1, 9])
+def test_encode_png(tmp_path, level):
+    (frame,) = moving_frames(1)
+    pixels = pygame.image.tobytes(frame, "RGBA")
+    (tmp_path / "frame.png").write_bytes(encode_png(pixels, frame.get_size(), level=level))
+    saved = pygame.image.load(tmp_path / "frame.png")
+    assert saved.get_size() == frame.get_size()
+    assert pygame.image.tobytes(saved, "RGB") == pygame.image.tobytes(frame, "RGB")
+
+
+def test_encode_tga(tmp_path):
+    (frame,) = moving_frames(1)
+    pixels = pygame.image.tobytes(frame, "RGBA")
+    (tmp_path / "frame.tga").write_bytes(encode_tga(pixels, frame.get_size()))
+    saved = pygame.image.load(tmp_path / "frame.tga")
+    assert pygame.image.tobytes(saved, "RGB") == pygame.image.tobytes(frame, "RGB")
+
+
+def test_encode_png_compression_levels():
+    (frame,) = moving_frames(1, size=(320, 240))
+    pixels = pygame.image.tobytes(frame, "RGBA")
+    sizes = [len(encode_png(pixels, frame.get_size(), level=level)) for level in [0, 1, 9]]
+    assert sizes[0] > sizes[1] >= sizes[2]
+
+
+def test_timed():
+    timings = dict()
+    with patch("robingame.recording.time") as mock_time:
+        mock_time.perf_counter.side_effect = [0, 2, 10, 11]
+        with timed("images", timings):
+            pass
+        with timed("images", timings):
+            pass
+    assert timings == dict(images=3)
+
+
+def test_save_images_async(tmp_path):
+    frames = make_frames(5)
+    files = save_images_async(frames, tmp_path, processes=2)
+    assert files == [tmp_path / f"{ii}.png" for ii in range(5)]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [f"{ii}.png" for ii in range(5)]
+
+
+def test_save_image_async(tmp_path):
+    (frame,) = moving_frames(1)
+    save_image_async(7, pygame.image.tobytes(frame, "RGBA"), frame.get_size(), tmp_path)
+    saved = pygame.image.load(tmp_path / "7.png")
+    assert pygame.image.tobytes(saved, "RGBA") == pygame.image.tobytes(frame, "RGBA")
+
+
+def test_record_stream_png(tmp_path):
+    (tmp_path / "old.png").touch()
+    with patch("robingame.recording.create_videos") as create_videos:
+        game = record(ShortGame, output_dir=tmp_path, stream=True, encoder="png", processes=2)()
+        assert (tmp_path / "old.png").exists()  # nothing is deleted until we start recording
+        with pytest.raises(SystemExit):
+            game.main()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [f"{ii}.png" for ii in range(5)]
+    create_videos.assert_called_once_with(tmp_path, "out", image_format="png", timings=ANY)
+
+
+def test_record_raw(tmp_path):
+    with (
+        patch("robingame.recording.FfmpegStream", CatStream),
+        patch("robingame.recording.create_videos") as create_videos,
+        patch("robingame.recording.create_gif") as create_gif,
+    ):
+        game = record(ShortGame, n_frames=3, output_dir=tmp_path, image_format="raw")()
+        with pytest.raises(SystemExit):
+            game.main()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["out.mp4"]  # no images
+    assert (tmp_path / "out.mp4").stat().st_size == 3 * 8 * 6 * 4
+    create_videos.assert_not_called()
+    create_gif.assert_called_once_with(
+        input_file=tmp_path / "out.mp4", gif_file=tmp_path / "out.gif"
+    )
+
+
+def test_record_rejects_unknown_formats(tmp_path):
+    with pytest.raises(ValueError):
+        record(Game, n_frames=3, output_dir=tmp_path, image_format="jpg")
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_record_requires_n_frames_unless_streaming(tmp_path, compress):
+    with pytest.raises(ValueError, match="n_frames is required"):
+        record(Game, output_dir=tmp_path, compress=compress)
+
+
+def moving_frames(n, size=(64, 48)):
+    frames = []
+    for ii in range(n):
+        frame = Surface(size, pygame.SRCALPHA)
+        frame.fill(Color("darkblue"))
+        pygame.draw.circle(frame, Color("yellow"), (ii * 3, 20), 10)
+        frames.append(frame)
+    return frames
+
+
+@pytest.mark.parametrize(
+    "max_frames, keyframe_interval, n_frames",
+    [
+        (None, 4, 10),
+        (5, 4, 10),  # drops whole groups, and skips the start of the oldest group
+        (8, 4, 8),  # exactly full
+        (3, 1, 10),  # every frame is a keyframe
+        (20, 60, 10),
+    ],
+)
+def test_compressed_frame_store(max_frames, keyframe_interval, n_frames):
+    frames = moving_frames(n_frames)
+    store = CompressedFrameStore(max_frames=max_frames, keyframe_interval=keyframe_interval)
+    for frame in frames:
+        store.capture(frame)
+
+    expected = frames[-max_frames:] if max_frames else frames
+    assert len(store) == len(expected)
+    decoded = list(store)
+    assert len(decoded) == len(expected)
+    for surface, frame in zip(decoded, expected):
+        assert pygame.image.tobytes(surface, "RGBA") == pygame.image.tobytes(frame, "RGBA")
+    if max_frames:
+        assert store.n_frames < max_frames + keyframe_interval  # memory is bounded
+
+
+def test_compressed_frame_store_is_small():
+    frames = moving_frames(30, size=(320, 240))
+    store = CompressedFrameStore()
+    for frame in frames:
+        store.capture(frame)
+    raw_bytes = sum(len(pygame.image.tobytes(frame, "RGBA")) for frame in frames)
+    assert store.nbytes < raw_bytes / 50
+
+
+def test_compressed_frame_store_rejects_frames_of_a_different_size():
+    store = CompressedFrameStore()
+    store.capture(Surface((4, 3)))
+    with pytest.raises(ValueError):
+        store.capture(Surface((3, 4)))
+
+
+def test_compressed_frame_store_compresses_in_the_background():
+    threads = set()
+    compress = zlib.compress
+
+    def record_thread(*args):
+        threads.add(threading.current_thread())
+        return compress(*args)
+
+    store = CompressedFrameStore()
+    with patch("robingame.recording.zlib.compress", record_thread):
+        for frame in moving_frames(5):
+            store.capture(frame)
+        assert len(store) == 5
+    assert threads == {store.thread}
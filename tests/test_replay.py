@@ -0,0 +1,179 @@
+import json
+import pickle
+import random
+import zlib
+
+import pygame
+import pytest
+
+from robingame.input import EventQueue, InputQueue
+from robingame.objects import Game
+from robingame.replay import (
+    REPLAY_FORMAT,
+    REPLAY_VERSION,
+    InputRecorder,
+    InputReplayer,
+    ReplayDesyncError,
+    replay,
+)
+
+ORIGINAL_METHODS = (EventQueue.__dict__["update"], InputQueue.read_new_inputs)
+
+SCRIPT = {3: (1, 0), 4: (1, 0), 5: (0, 1), 9: (1, 1)}  # tick -> buttons held down
+
+
+class ScriptedInput(InputQueue):
+    """Plays back a fixed script of button presses. Stands in for a keyboard."""
+
+    def __init__(self, game):
+        super().__init__()
+        self.game = game
+
+    def get_new_values(self):
+        return SCRIPT.get(self.game.ticks, (0, 0))
+
+
+class ReplayGame(Game):
+    headless = True
+
+    def __init__(self):
+        super().__init__()
+        self.input = ScriptedInput(self)
+        self.ticks = 0
+        self.score = 0
+        self.log = []
+
+    def read_inputs(self):
+        super().read_inputs()
+        self.input.read_new_inputs()
+
+    def update(self):
+        super().update()
+        if self.input.is_pressed(0):
+            self.score += random.randint(1, 100)
+        if self.input.is_down(1):
+            self.score *= 2
+        clicks = [e.pos for e in EventQueue.events if e.type == pygame.MOUSEBUTTONDOWN]
+        self.log.append((self.ticks, tuple(self.input.get_down()), clicks))
+        self.ticks += 1
+
+
+@pytest.fixture
+def recording(tmp_path):
+    game = ReplayGame()
+    with InputRecorder(seed=123) as recorder:
+        for tick in range(12):
+            if tick == 7:
+                pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(5, 6), button=1))
+            game.run(ticks=1)
+    recorder.save(tmp_path / "session.replay")
+    yield game, tmp_path / "session.replay"
+    pygame.quit()
+
+
+def test_replay_reproduces_the_session(recording):
+    recorded, filename = recording
+    assert recorded.log[7][2] == [(5, 6)]
+
+    global SCRIPT
+    original_script, SCRIPT = SCRIPT, {}  # the "keyboard" is idle during the replay
+    try:
+        replayed = replay(ReplayGame(), filename)
+    finally:
+        SCRIPT = original_script
+    assert replayed.log == recorded.log
+    assert replayed.score == recorded.score
+    assert (EventQueue.__dict__["update"], InputQueue.read_new_inputs) == ORIGINAL_METHODS
+
+
+def test_replay_file_is_compact(recording):
+    _, filename = recording
+    replayer = InputReplayer(filename)
+    assert replayer.seed == 123
+    unchanged = [
+        record for record in replayer.records if record[0] == "inputs" and record[2] is None
+    ]
+    assert len(unchanged) > 0  # repeated inputs aren't stored again
+    assert filename.stat().st_size < 1000
+
+
+def test_replay_desync(recording):
+    _, filename = recording
+
+    class OtherGame(ReplayGame):
+        def read_inputs(self):
+            self.input.read_new_inputs()  # reads the inputs before the events
+            super(ReplayGame, self).read_inputs()
+
+    with pytest.raises(ReplayDesyncError):
+        replay(OtherGame(), filename)
+    assert (EventQueue.__dict__["update"], InputQueue.read_new_inputs) == ORIGINAL_METHODS
+
+
+def test_replay_skips_quit_events(tmp_path):
+    game = ReplayGame()
+    with InputRecorder() as recorder:
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+        with pytest.raises(SystemExit):
+            game.run(ticks=1)
+    recorder.save(tmp_path / "quit.replay")
+
+    replayed = replay(ReplayGame(), tmp_path / "quit.replay")  # doesn't exit
+    assert replayed.ticks == 1
+    pygame.quit()
+
+
+def test_replay_file_is_json(recording):
+    _, filename = recording
+    data = json.loads(zlib.decompress(filename.read_bytes()))
+    assert data["format"] == REPLAY_FORMAT
+    assert data["version"] == REPLAY_VERSION
+
+
+def test_replay_only_records_plain_event_attributes(tmp_path):
+    game = ReplayGame()
+    with InputRecorder() as recorder:
+        pygame.event.post(pygame.event.Event(pygame.USEREVENT, pos=(1, 2), thing=object()))
+        game.run(ticks=1)
+    recorder.save(tmp_path / "user.replay")
+
+    (events,) = InputReplayer(tmp_path / "user.replay").records[0][1:]
+    assert (pygame.USEREVENT, dict(pos=(1, 2))) in events
+    pygame.quit()
+
+
+class Exploit:
+    def __reduce__(self):
+        return exec, ("raise RuntimeError('pwned')",)
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        zlib.compress(pickle.dumps(dict(version=1, seed=1, records=[Exploit()]))),
+        zlib.compress(json.dumps(dict(format=REPLAY_FORMAT, version=1, seed=1)).encode()),
+        zlib.compress(json.dumps(dict(version=REPLAY_VERSION, seed=1, records=[])).encode()),
+        zlib.compress(
+            json.dumps(
+                dict(format=REPLAY_FORMAT, version=REPLAY_VERSION, seed=1, records=[["foo"]])
+            ).encode()
+        ),
+        zlib.compress(
+            json.dumps(
+                dict(
+                    format=REPLAY_FORMAT,
+                    version=REPLAY_VERSION,
+                    seed=1,
+                    records=[["events", [[1, {"pos": {"x": 1}}]]]],
+                )
+            ).encode()
+        ),
+        b"not even zlib",
+    ],
+    ids=["pickle", "old version", "no format", "bad record", "bad attribute", "garbage"],
+)
+def test_replay_rejects_invalid_files(tmp_path, contents):
+    filename = tmp_path / "bad.replay"
+    filename.write_bytes(contents)
+    with pytest.raises(ValueError):
+        InputReplayer(filename)
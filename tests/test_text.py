@@ -1,8 +1,15 @@
+import subprocess
+import sys
 from pathlib import Path
 
+import pygame
+import pytest
 from pygame.surface import Surface
 
-from robingame.text.font import Font
+from robingame.image import convert_alpha, scale_image
+from robingame.text import fonts
+from robingame.text.exceptions import TextError
+from robingame.text.font import Font, LazyFont
 
 TESTFONT = Path(__file__).parent.parent / "robingame/text/assets/test_font.png"
 assert TESTFONT.exists()
@@ -27,9 +34,213 @@ def test_render_respects_trimmed_character_size():
     assert x == 0
     assert y == 2  # from the top of the image
 
-    surf = Surface((100, 100)).convert_alpha()
+    surf = convert_alpha(Surface((100, 100)))
     surf.fill((0, 0, 0, 0))
     assert surf.get_bounding_rect() == (0, 0, 0, 0)
 
     font.render(surf, "AAA")
     assert surf.get_bounding_rect() == (0, 2, w * 3, h)
+
+
+def printed_width_naive(font: Font, text: str, scale: int) -> int:
+    return sum((font.get(letter).get_width() + font.xpad) * scale for letter in text)
+
+
+def wrap_words_naive(font: Font, text: str, wrap: int, scale: int = 1) -> list[str]:
+    """The original implementation of Font._wrap_words, which re-measures the line every word."""
+    lines = []
+    line = ""
+    for word in text.split(" "):
+        new_line = f"{line} {word}" if line else word
+        if printed_width_naive(font, new_line, scale) <= wrap:
+            line = new_line
+        else:
+            lines.append(line)
+            line = word
+    lines.append(line)
+    return lines
+
+
+def align_cursor_naive(font: Font, line: str, x: int, align: int, scale: int, wrap: int) -> int:
+    match align:
+        case -1 | None:
+            return x
+        case 0:
+            return x + (wrap - printed_width_naive(font, line, scale)) // 2
+        case 1:
+            return x + wrap - printed_width_naive(font, line, scale)
+
+
+def render_uncached(font: Font, surf, text, x=0, y=0, scale=1, wrap=0, align=None) -> int:
+    """The original implementation of Font.render, which blits every glyph onto the surface."""
+    _, ysize = font.image_size
+    cursor = x
+    for line in text.splitlines():
+        wrapped_lines = wrap_words_naive(font, line, wrap, scale) if wrap else [line]
+        for line in wrapped_lines:
+            cursor = align_cursor_naive(font, line, x, align, scale, wrap)
+            for letter in line:
+                image = scale_image(font.get(letter), scale)
+                surf.blit(image, (cursor, y))
+                cursor += image.get_width() + font.xpad * scale
+            y += (ysize + font.ypad) * scale
+    return cursor
+
+
+@pytest.mark.parametrize(
+    "font_name",
+    [
+        "test_font",
+        "cellphone_black",
+        "cellphone_white",
+        "cellphone_white_mono",
+        "chunky_retro",
+        "sharp_retro",
+        "tiny_white",
+    ],
+)
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(x=3, y=4),
+        dict(x=3, y=4, scale=2),
+        dict(x=10, y=0, wrap=120, align=-1),
+        dict(x=10, y=0, wrap=120, align=0),
+        dict(x=10, y=0, wrap=120, align=1, scale=2),
+    ],
+)
+def test_cached_render_matches_uncached_render(font_name, kwargs):
+    font = getattr(fonts, font_name)
+    text = "Hello, world! ÄÖ {}~\nThe quick brown fox jumps over the lazy dog. €"
+    background = Surface((300, 300))
+    background.fill((40, 80, 120))
+    expected = background.copy()
+
+    expected_cursor = render_uncached(font, expected, text, **kwargs)
+    for _ in range(2):  # second time comes from the cache
+        actual = background.copy()
+        actual_cursor = font.render(actual, text, **kwargs)
+        assert actual_cursor == expected_cursor
+        # semi-transparent pixels may differ by 1 because of rounding in the premultiplied blend
+        difference = pygame.surfarray.array3d(actual).astype(int) - pygame.surfarray.array3d(
+            expected
+        )
+        assert abs(difference).max() <= 1
+
+
+def test_render_cache_statistics_and_lru_limit():
+    font = Font.from_spritesheet(filename=TESTFONT, image_size=(16, 16), letters="AB")
+    font.cache_size = 2
+    surf = Surface((100, 100))
+    font.render(surf, "A")
+    font.render(surf, "A")
+    font.render(surf, "B")
+    font.render(surf, "A", scale=2)  # evicts "A", which was used least recently
+    assert font.cache_info == dict(hits=1, misses=3, size=2, max_size=2)
+    assert list(font._layouts) == [("B", 1, 0, None), ("A", 2, 0, None)]
+
+    font.cache_size = 0
+    font.clear_cache()
+    font.render(surf, "A")
+    assert font.cache_info == dict(hits=0, misses=1, size=0, max_size=0)
+
+
+def test_render_empty_string_returns_x():
+    font = Font.from_spritesheet(filename=TESTFONT, image_size=(16, 16), letters="A")
+    assert font.render(Surface((10, 10)), "", x=7) == 7
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        " ",
+        "  leading spaces",
+        "trailing spaces  ",
+        "double  spaces  in   here",
+        "Averyveryveryveryverylongwordthatdoesntfit at the start",
+        "short words a b c d e f g h i j k l m n o p q r s t u v w x y z",
+    ],
+)
+@pytest.mark.parametrize("wrap", [1, 40, 100])
+@pytest.mark.parametrize("scale", [1, 2])
+def test_wrap_words_matches_naive_implementation(text, wrap, scale):
+    font = fonts.test_font
+    assert font._wrap_words(text, wrap, scale=scale) == wrap_words_naive(font, text, wrap, scale)
+    lines = font._break_lines(text, wrap, scale)
+    for line, width in lines:
+        assert width == printed_width_naive(font, line, scale)
+
+
+def test_layout_can_be_rendered_repeatedly():
+    font = Font.from_spritesheet(filename=TESTFONT, image_size=(16, 16), letters="AB")
+    layout = font.layout("AB\nBA", scale=2, wrap=100, align=1)
+    assert [line for line, _, _ in layout.lines] == ["AB", "BA"]
+    assert layout.rect.right == 100
+
+    expected = Surface((200, 100))
+    font.render(expected, "AB\nBA", x=5, y=6, scale=2, wrap=100, align=1)
+    for _ in range(2):
+        surf = Surface((200, 100))
+        cursor = font.render(surf, layout, x=5, y=6)
+        assert cursor == 105
+        assert pygame.image.tobytes(surf, "RGB") == pygame.image.tobytes(expected, "RGB")
+
+
+def test_lazy_font_loads_on_first_use():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return Font.from_spritesheet(filename=TESTFONT, image_size=(16, 16), letters="AB")
+
+    font = LazyFont(loader)
+    assert not font.loaded
+    assert not calls
+    assert font.get("A").get_size() == (16, 16)
+    assert font.loaded
+    font.render(Surface((50, 20)), "AB")
+    assert font.layout("AB").rect.width == 32
+    assert calls == [1]
+    assert isinstance(font, Font)
+
+
+def test_lazy_font_keeps_attributes_set_before_loading():
+    font = LazyFont(
+        lambda: Font.from_spritesheet(filename=TESTFONT, image_size=(16, 16), letters="AB", xpad=1)
+    )
+    font.xpad = 10
+    font.cache_size = 0
+    assert not font.loaded
+    assert font.layout("AB").rect.width == 16 + 10 + 16
+    assert font.xpad == 10
+    assert font.cache_info["size"] == 0
+
+    font.xpad = 2  # and after loading
+    font.clear_cache()
+    assert font.layout("AB").rect.width == 16 + 2 + 16
+
+
+def test_font_registry():
+    font = fonts.register("test_registry", lambda: fonts.test_font.load())
+    try:
+        assert fonts.get("test_registry") is font
+        assert not font.loaded
+        assert font.load() is font
+        assert font.letters is fonts.test_font.letters
+    finally:
+        del fonts.registry["test_registry"]
+    with pytest.raises(TextError):
+        fonts.get("test_registry")
+
+
+def test_importing_robingame_does_not_load_fonts_or_open_a_window():
+    code = (
+        "import pygame\n"
+        "import robingame.objects\n"
+        "from robingame.text import fonts\n"
+        "assert fonts.registry\n"
+        "assert not any(font.loaded for font in fonts.registry.values())\n"
+        "assert not pygame.display.get_init()\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
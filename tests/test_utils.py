@@ -1,6 +1,16 @@
+import numpy
+import pygame
 import pytest
+from pygame import Color, Surface
 
-from robingame.utils import count_edges, SparseMatrix, unzip
+from robingame.utils import (
+    count_edges,
+    SparseMatrix,
+    unzip,
+    maskFromSurface,
+    mask_to_surface,
+    merge_rects,
+)
 
 
 @pytest.mark.parametrize(
@@ -82,3 +92,78 @@ def test_sparse_matrix_copy():
     c = m.copy()
     assert isinstance(c, SparseMatrix)
     assert c[(1, 1)] is True
+
+
+def mask_from_surface_per_pixel(surface, threshold=127):
+    """The original implementation of maskFromSurface, which uses get_at on every pixel."""
+    mask = pygame.mask.Mask(surface.get_size())
+    key = surface.get_colorkey()
+    for y in range(surface.get_height()):
+        for x in range(surface.get_width()):
+            if key:
+                solid = surface.get_at((x, y)) != key
+            else:
+                solid = surface.get_at((x, y))[3] > threshold
+            if solid:
+                mask.set_at((x, y), 1)
+    return mask
+
+
+def random_surface(flags=0, colorkey=None):
+    rng = numpy.random.default_rng(1)
+    surface = Surface((11, 7), flags)
+    palette = [(0, 0, 0, 0), (255, 0, 0, 255), (0, 255, 0, 127), (0, 0, 255, 128), (1, 2, 3, 200)]
+    for x in range(11):
+        for y in range(7):
+            surface.set_at((x, y), palette[rng.integers(len(palette))])
+    if colorkey:
+        surface.set_colorkey(colorkey)
+    return surface
+
+
+@pytest.mark.parametrize(
+    "surface",
+    [
+        random_surface(pygame.SRCALPHA),
+        random_surface(colorkey=(255, 0, 0)),
+        random_surface(colorkey=(0, 0, 0)),
+    ],
+)
+@pytest.mark.parametrize("threshold", [0, 127, 128])
+def test_mask_from_surface_matches_per_pixel_implementation(surface, threshold):
+    expected = mask_from_surface_per_pixel(surface, threshold)
+    actual = maskFromSurface(surface, threshold)
+    assert actual.get_size() == expected.get_size()
+    assert actual.count() > 0
+    assert actual.overlap_area(expected, (0, 0)) == expected.count() == actual.count()
+
+
+def test_mask_to_surface(font_init):
+    pygame.display.set_mode((1, 1))
+    mask = pygame.mask.Mask((3, 2))
+    mask.set_at((1, 0))
+    mask.set_at((2, 1))
+    surface = mask_to_surface(mask, set_color=Color("green"))
+    for x in range(3):
+        for y in range(2):
+            expected = Color("green") if mask.get_at((x, y)) else (0, 0, 0, 0)
+            assert surface.get_at((x, y)) == expected
+
+
+@pytest.mark.parametrize(
+    "rects, expected",
+    [
+        ([], []),
+        ([(0, 0, 10, 10)], [(0, 0, 10, 10)]),
+        ([(0, 0, 10, 10), (20, 20, 10, 10)], [(0, 0, 10, 10), (20, 20, 10, 10)]),
+        ([(0, 0, 10, 10), (5, 5, 10, 10)], [(0, 0, 15, 15)]),
+        ([(0, 0, 10, 10), (0, 0, 0, 0)], [(0, 0, 10, 10)]),  # empty rects are dropped
+        # the third rect joins the first two, whose union then overlaps the last one
+        ([(0, 0, 5, 5), (20, 0, 5, 5), (4, 0, 17, 1), (10, 4, 2, 2)], [(0, 0, 25, 6)]),
+    ],
+)
+def test_merge_rects(rects, expected):
+    rects = [pygame.Rect(rect) for rect in rects]
+    originals = [rect.copy() for rect in rects]
+    assert merge_rects(rects) == expected
+    assert rects == originals